@@ -57,9 +57,11 @@ const Unregistered = ({ navigation }) => {
       // Map backend data to frontend format
       const mapped = guardians
         .map((g) => {
-          // Use photo_url from serializer, fallback to photo field
+          // Prefer the resized thumbnail, then photo_url, then the raw photo field
           let photoUri = null;
-          if (g.photo_url) {
+          if (g.photo_thumb_url) {
+            photoUri = g.photo_thumb_url;
+          } else if (g.photo_url) {
             photoUri = g.photo_url;
           } else if (g.photo) {
             photoUri = g.photo.startsWith("http") ? g.photo : `${BACKEND_URL}${g.photo}`;
@@ -0,0 +1,178 @@
+"""
+Request batching for the mobile client.
+
+POST /api/batch/ with
+
+    {"requests": [
+        {"method": "GET", "path": "/api/parents/parent/12/"},
+        {"method": "GET", "path": "/api/parents/events/", "params": {"teacher_id": "{0.teacher}"}},
+        {"method": "GET", "path": "/api/parents/notifications/", "params": {"parent": "{0.id}"}}
+    ]}
+
+runs the sub-requests in order, in this process, against the normal
+URLconf, as the user who made the batch request, and returns
+{"results": [{"status", "took_ms", "body"}, ...], "took_ms"}. A "{N.a.b}"
+placeholder in a path or string param is replaced with field a.b of result
+N's body, so dependent requests still need only one round trip. Requests
+after a failed dependency get status 424.
+"""
+import gzip
+import json
+import logging
+import re
+import time
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+DEFAULT_MAX_REQUESTS = 20
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+API_PREFIX = '/api/'
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER_RE = re.compile(r'\{(\d+)((?:\.[\w-]+)*)\}')
+
+
+class DependencyError(Exception):
+    pass
+
+
+def _lookup(results, index, dotted):
+    if index >= len(results) or not 200 <= results[index]['status'] < 300:
+        raise DependencyError(f'request {index} has no successful result')
+    value = results[index]['body']
+    for key in filter(None, dotted.split('.')):
+        try:
+            value = value[int(key)] if isinstance(value, list) else value[key]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise DependencyError(f'request {index} result has no {dotted.lstrip(".")}')
+    return value
+
+
+def _substitute(value, results):
+    """Replace {N.a.b} placeholders in a string with values from earlier results."""
+    if not isinstance(value, str):
+        return value
+    whole = _PLACEHOLDER_RE.fullmatch(value)
+    if whole:
+        # A bare placeholder keeps the referenced value's type (ids stay ints in JSON bodies)
+        return _lookup(results, int(whole.group(1)), whole.group(2))
+    return _PLACEHOLDER_RE.sub(lambda m: str(_lookup(results, int(m.group(1)), m.group(2))), value)
+
+
+def _sub_request(request, method, path, params, body):
+    """A Django request for one sub-request, carrying the batch request's headers and user."""
+    payload = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        key: value for key, value in request.META.items()
+        # Sub-responses are embedded in the batch body, which is compressed as a whole
+        if not key.startswith('wsgi.') and key not in ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_ACCEPT_ENCODING')
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': urlencode(params, doseq=True),
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(payload),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub = WSGIRequest(environ)
+    if request.user and request.user.is_authenticated:
+        # Authenticated once for the whole batch; DRF views pick this up as the request user
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+    return sub
+
+
+def _body(response):
+    data = getattr(response, 'data', None)
+    if data is not None:
+        return data
+    content = b'' if response.streaming else response.content
+    if response.get('Content-Encoding') == 'gzip':
+        content = gzip.decompress(content)
+    if response.get('Content-Type', '').startswith('application/json') and content:
+        return json.loads(content)
+    return content.decode(errors='replace') if content else None
+
+
+def dispatch(request, spec, results):
+    """Run one sub-request and return its result entry."""
+    if not isinstance(spec, dict):
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'Each request must be an object'}}
+    method = str(spec.get('method', 'GET')).upper()
+    if method not in METHODS:
+        return {'status': status.HTTP_405_METHOD_NOT_ALLOWED, 'body': {'error': f'Method {method} not allowed'}}
+
+    try:
+        path = _substitute(str(spec.get('path', '')), results)
+        params = {key: _substitute(value, results) for key, value in (spec.get('params') or {}).items()}
+        body = spec.get('body')
+        if isinstance(body, dict):
+            body = {key: _substitute(value, results) for key, value in body.items()}
+    except DependencyError as e:
+        return {'status': status.HTTP_424_FAILED_DEPENDENCY, 'body': {'error': str(e)}}
+    except AttributeError:
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': 'params must be an object'}}
+
+    path = path.split('?', 1)[0]
+    if not path.startswith(API_PREFIX) or path.rstrip('/') == request.path.rstrip('/'):
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'error': f'Path not allowed: {path}'}}
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND, 'body': {'error': f'No endpoint at {path}'}}
+
+    try:
+        response = match.func(_sub_request(request, method, path, params, body), *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+    except Http404 as e:
+        return {'status': status.HTTP_404_NOT_FOUND, 'body': {'error': str(e) or 'Not found'}}
+    except Exception:
+        # Logged here, not echoed: the message may carry SQL or other internals
+        logger.exception('Batch sub-request %s %s failed', method, path)
+        return {'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'body': {'error': 'Internal server error'}}
+    return {'status': response.status_code, 'body': _body(response)}
+
+
+class BatchView(APIView):
+    """
+    Run several API requests in one round trip (see module docstring).
+    Each sub-request is still subject to its own view's permissions.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        requests = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(requests, list) or not requests:
+            return Response({"error": "requests must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        max_requests = getattr(settings, 'BATCH_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)
+        if len(requests) > max_requests:
+            return Response(
+                {"error": f"At most {max_requests} requests per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        started = time.perf_counter()
+        results = []
+        for spec in requests:
+            sub_started = time.perf_counter()
+            result = dispatch(request, spec, results)
+            result['took_ms'] = round((time.perf_counter() - sub_started) * 1000, 2)
+            results.append(result)
+        return Response({
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
@@ -0,0 +1,76 @@
+"""
+Hot cache keys read through a short per-process tier.
+
+Version keys (guardian/verification.py, teacher/roster.py, parents/timetable.py,
+parents/ics.py), the LRN map and QR identities must live in the shared cache
+so writes on one worker reach the others, but they are read on nearly every
+scan or feed request. Reading them here goes to the per-process 'local'
+LocMem cache first and only falls through to the shared one (Redis, or the
+database table without REDIS_URL) when the local copy has expired, at most
+every LOCAL_CACHE_TIMEOUT seconds per key. The price is the bound on
+staleness: a write made on another worker is seen here within
+LOCAL_CACHE_TIMEOUT seconds; writes made by this worker are seen at once.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.checks import Warning, register
+
+local = caches['local']
+
+
+def _local_timeout():
+    return getattr(settings, 'LOCAL_CACHE_TIMEOUT', 2)
+
+
+def get(key):
+    value = local.get(key)
+    if value is None:
+        value = cache.get(key)
+        if value is not None:
+            local.set(key, value, _local_timeout())
+    return value
+
+
+def set(key, value, timeout):
+    cache.set(key, value, timeout)
+    local.set(key, value, _local_timeout())
+
+
+def delete(*keys):
+    cache.delete_many(keys)
+    local.delete_many(keys)
+
+
+def version(key, timeout=None):
+    """The shared version stored under `key`, created on first use."""
+    value = get(key)
+    if value is None:
+        value = time.time_ns()
+        cache.add(key, value, timeout)
+        value = cache.get(key, value)
+        local.set(key, value, _local_timeout())
+    return value
+
+
+def bump(key, timeout=None):
+    """Give `key` a new version, dropping everything cached under the old one."""
+    set(key, time.time_ns(), timeout)
+
+
+def clear():
+    cache.clear()
+    local.clear()
+
+
+@register('caches', deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if not settings.CACHES['default']['BACKEND'].endswith('DatabaseCache'):
+        return []
+    return [Warning(
+        'The shared cache is the database (REDIS_URL is not set).',
+        hint='Scan verification, QR resolution and roster state read it when their per-process copy '
+             'expires; set REDIS_URL in production.',
+        id='backend.W001',
+    )]
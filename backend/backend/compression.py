@@ -0,0 +1,96 @@
+"""
+Compression for API responses.
+
+Attendance lists, rosters and guardian lists are large, repetitive JSON.
+This middleware compresses responses under API_COMPRESSION_PATH_PREFIXES
+that are at least API_COMPRESSION_MIN_SIZE bytes, choosing brotli when the
+client accepts it and the `brotli` package is installed, gzip otherwise.
+Responses that are streamed, already encoded (the gzipped roster snapshot)
+or of another content type are passed through untouched.
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_PATH_PREFIXES = ('/api/',)
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack', 'text/')
+BROTLI_QUALITY = 5  # close to gzip's CPU cost, noticeably smaller output
+
+_ENCODING_RE = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """{encoding: q} from an Accept-Encoding header; q=0 marks an encoding the client refuses."""
+    accepted = {}
+    for part in (header or '').lower().split(','):
+        match = _ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1)] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None for a request's Accept-Encoding."""
+    accepted = accepted_encodings(header)
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best = None
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get('*', 0))
+        if quality and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    return compress_string(content)
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'API_COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+        self.prefixes = tuple(getattr(settings, 'API_COMPRESSION_PATH_PREFIXES', DEFAULT_PATH_PREFIXES))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path.startswith(self.prefixes):
+            return response
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        # Cacheable either way, so caches must key on Accept-Encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Different bytes for the same resource: weaken the validator
+            response['ETag'] = 'W/' + etag
+        return response
@@ -37,6 +37,7 @@ SECRET_KEY = os.environ.get('SECRET_KEY')
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware", 
+    'backend.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.common.CommonMiddleware', 
@@ -57,7 +58,7 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 STORAGES ={
      "default":{
-          "BACKEND": "django.core.files.storage.FileSystemStorage",
+          "BACKEND": "backend.storage.HashedFileSystemStorage",
      },
 
      "staticfiles":{
@@ -65,6 +66,10 @@ STORAGES ={
      }
 }
 
+# Optional front-proxy offload for media files (see backend/media.py)
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX') or None
+MEDIA_SENDFILE_HEADER = os.environ.get('MEDIA_SENDFILE_HEADER') or None
+
 DATABASES = {
     'default': dj_database_url.config(
         default=os.environ['DATABASE_URL'],  # This should be the environment variable name
@@ -0,0 +1,174 @@
+"""
+Production media view (replaces django.conf.urls.static for MEDIA_URL).
+
+- Content-hashed names (see backend.storage) are served with a one-year
+  `Cache-Control: immutable`; legacy names get a short max-age.
+- ETag / Last-Modified with 304 responses for conditional requests.
+- Single-range `Range: bytes=...` requests answered with 206.
+- Compressed files (.gz, .br, ...) are served as the archive type, like
+  FileResponse does, never with Content-Encoding: the client downloads the
+  file itself instead of transparently unpacking it.
+- When a front proxy is configured, the file body is handed off with
+  X-Accel-Redirect (nginx) or X-Sendfile (Apache/lighttpd) so the worker
+  only checks headers and returns immediately.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .storage import is_hashed_name
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+# mimetypes encoding -> Content-Type (same table as django.http.FileResponse)
+ENCODED_TYPES = {
+    'bzip2': 'application/x-bzip',
+    'gzip': 'application/gzip',
+    'xz': 'application/x-xz',
+    'br': 'application/x-brotli',
+    'compress': 'application/x-compress',
+}
+
+
+def _cache_control(path):
+    if is_hashed_name(path):
+        max_age = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60 * 24 * 365)
+        return f'public, max-age={max_age}, immutable'
+    max_age = getattr(settings, 'MEDIA_CACHE_MAX_AGE_MUTABLE', 60 * 60)
+    return f'public, max-age={max_age}'
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    weak_stripped = [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+    return '*' in candidates or etag in weak_stripped
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        return _etag_matches(if_none_match, etag)
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and int(mtime) <= since
+
+
+def _parse_range(header, size):
+    """Return (start, end) inclusive for a single satisfiable byte range, None if absent, or False."""
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multi-range or unknown unit: send the full file
+    first, last = match.groups()
+    if first == '' and last == '':
+        return False
+    if first == '':
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _offload_response(path, full_path, content_type):
+    """Hand the body off to the front proxy if one is configured."""
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None)
+    sendfile_header = getattr(settings, 'MEDIA_SENDFILE_HEADER', None)
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{path}"
+        return response
+    if sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        response[sendfile_header] = full_path
+        return response
+    return None
+
+
+def serve_media(request, path):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+
+    stat = os.stat(full_path)
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = ENCODED_TYPES.get(encoding) or content_type or 'application/octet-stream'
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': _cache_control(path),
+        'Accept-Ranges': 'bytes',
+    }
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    offloaded = _offload_response(path, full_path, content_type)
+    if offloaded is not None:
+        # The proxy handles Range itself once it has the file.
+        for key, value in headers.items():
+            offloaded[key] = value
+        return offloaded
+
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range or if_range == etag:
+        byte_range = _parse_range(request.META.get('HTTP_RANGE'), stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _read_range(full_path, start, length), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = str(length)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(stat.st_size)
+
+    for key, value in headers.items():
+        response[key] = value
+    return response
@@ -0,0 +1,65 @@
+"""
+MessagePack renderer/parser for the mobile client.
+
+Enabled in REST_FRAMEWORK settings only when the optional `msgpack`
+package is installed. Clients opt in with `Accept: application/msgpack`
+(and may send `Content-Type: application/msgpack` bodies); everyone else
+keeps getting JSON.
+"""
+import datetime
+import decimal
+import uuid
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+MEDIA_TYPE = 'application/msgpack'
+
+
+def _default(value):
+    # Same text forms DRF's JSON encoder uses for values serializers leave as objects
+    if isinstance(value, datetime.datetime):
+        text = value.isoformat()
+        return text[:-6] + 'Z' if text.endswith('+00:00') else text
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, '__iter__'):
+        return list(value)
+    raise TypeError(f'Cannot serialize {type(value).__name__} to MessagePack')
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MEDIA_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        max_size = getattr(settings, 'DATA_UPLOAD_MAX_MEMORY_SIZE', None)
+        try:
+            body = stream.read() if max_size is None else stream.read(max_size + 1)
+            if max_size is not None and len(body) > max_size:
+                raise ParseError('MessagePack body too large')
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+            raise ParseError(f'MessagePack parse error - {e}')
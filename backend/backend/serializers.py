@@ -0,0 +1,92 @@
+"""
+Sparse fieldsets for API responses.
+
+A list screen that only needs `id,name` can ask for
+`?fields=id,name` (or drop a few with `?omit=password,qr_code_data`).
+Fields that are not returned are removed from the serializer, so their
+SerializerMethodFields are never called, and `sparse_queryset` trims the
+query to the columns the remaining fields read.
+
+Serializers declare the columns their method fields use in
+`Meta.field_sources`; a method field without an entry there disables
+column trimming (its needs are unknown), never the output filtering.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def _split(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    ModelSerializer mixin: keep only `fields` / drop `omit`, passed as
+    kwargs or, for GET requests, read from ?fields= / ?omit= on the request
+    in the serializer context.
+    """
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is None and omit is None:
+            fields, omit = self.requested_fields(self.context.get('request'))
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    @staticmethod
+    def requested_fields(request):
+        """(fields, omit) sets from the request's query string, or (None, None)."""
+        if request is None or request.method not in READ_METHODS:
+            return None, None
+        params = getattr(request, 'query_params', request.GET)
+        return _split(params.get('fields')), _split(params.get('omit'))
+
+    @classmethod
+    def returns_field(cls, request, name):
+        """Whether a response to `request` includes field `name`."""
+        fields, omit = cls.requested_fields(request)
+        return (fields is None or name in fields) and name not in (omit or ())
+
+    @classmethod
+    def sparse_queryset(cls, queryset, request):
+        """
+        `queryset.only()` the columns needed by the fields this request
+        returns; unchanged when every field is returned or when a returned
+        field's columns are unknown.
+        """
+        fields, omit = cls.requested_fields(request)
+        if fields is None and omit is None:
+            return queryset
+        serializer = cls(context={'request': request})
+        model = queryset.model
+        field_sources = getattr(serializer.Meta, 'field_sources', {})
+        select_related = queryset.query.select_related
+        if select_related is True:
+            return queryset
+
+        columns = {model._meta.pk.name}
+        # Relations fetched with select_related must stay loaded
+        columns.update(select_related or ())
+        for name, field in serializer.fields.items():
+            if name in field_sources:
+                columns.update(field_sources[name])
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+                return queryset
+            attribute = field.source.split('.')[0]
+            if attribute.startswith('get_') and attribute.endswith('_display'):
+                attribute = attribute[len('get_'):-len('_display')]
+            try:
+                model_field = model._meta.get_field(attribute)
+            except FieldDoesNotExist:
+                return queryset  # a property or method: could read anything
+            if model_field.concrete:
+                columns.add(attribute)
+        return queryset.only(*columns)
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
     'teacher',
      'parents',
      'guardian',
+     'search',
      'corsheaders',
 ]
 
@@ -52,6 +55,7 @@ MIDDLEWARE = [
      'whitenoise.middleware.WhiteNoiseMiddleware',
      'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'backend.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -90,6 +94,36 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+
+# Cache shared by every worker process. The version keys and invalidations in
+# guardian/verification.py, teacher/roster.py, parents/qr.py, timetable.py and
+# ics.py only reach other workers through it, so it must not be per-process
+# (LocMem). Set REDIS_URL in production (needs the `redis` package); without it
+# the database table created by `manage.py createcachetable` is used, and
+# `manage.py check --deploy` (run by build.sh) warns with backend.W001.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+# Per-process tier in front of the shared cache for the keys read on every
+# scan (backend/cache.py): another worker's write is seen within this many seconds
+CACHES['local'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'local-tier',
+}
+LOCAL_CACHE_TIMEOUT = 2
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -142,4 +176,68 @@ CORS_ALLOWED_ORIGINS = [
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Resized copies of uploaded avatars/guardian photos (see backend/thumbnails.py).
+# Built after each upload commits and stored under MEDIA_ROOT/thumbs/; run
+# `manage.py generate_thumbnails` once for uploads made before a size existed.
+IMAGE_THUMBNAIL_SIZES = (64, 256, 1024)
+IMAGE_THUMBNAIL_FORMAT = 'WEBP'
+
+# Uploads are stored under content-hashed names (backend/storage.py) so that
+# backend.media can serve them as immutable.
+STORAGES = {
+    "default": {
+        "BACKEND": "backend.storage.HashedFileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
+# Media caching / offload (backend/media.py)
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365  # content-hashed names
+MEDIA_CACHE_MAX_AGE_MUTABLE = 60 * 60  # files uploaded before hashing was enabled
+# Set one of these when a front proxy can serve MEDIA_ROOT directly:
+# nginx `internal` location prefix, e.g. '/protected-media/'
+MEDIA_ACCEL_REDIRECT_PREFIX = None
+# Apache mod_xsendfile / lighttpd header name, e.g. 'X-Sendfile'
+MEDIA_SENDFILE_HEADER = None
+# Typeahead search (search/backends.py). The backend is chosen from the
+# database vendor (SQLite FTS5 / PostgreSQL tsvector+pg_trgm); set a dotted
+# class path here to override it.
+SEARCH_BACKEND = None
+# Latency budget checked by `manage.py bench_search`
+SEARCH_TYPEAHEAD_P95_MS = 50
+# gzip/brotli for API responses (backend/compression.py); brotli needs the
+# optional `brotli` package, otherwise gzip is used.
+API_COMPRESSION_MIN_SIZE = 1024
+API_COMPRESSION_PATH_PREFIXES = ('/api/',)
+
+# Largest number of sub-requests accepted by POST /api/batch/ (backend/batch.py)
+BATCH_MAX_REQUESTS = 20
+# Largest number of operations accepted by the .../bulk/ endpoints (teacher/bulk.py)
+BULK_MAX_OPERATIONS = 500
+
+# Days `manage.py generate_absences` (teacher/absences.py) never marks anyone
+# absent on, besides weekends: ISO dates, e.g. ('2026-12-25', '2027-01-01').
+SCHOOL_HOLIDAYS = ()
+# Weekdays with classes, Monday = 0
+SCHOOL_DAYS = (0, 1, 2, 3, 4)
+
+# MessagePack for the mobile client (backend/renderers.py), enabled when the
+# optional `msgpack` package is installed. JSON stays the default.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('backend.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('backend.renderers.MessagePackParser')
@@ -0,0 +1,170 @@
+"""
+File storage for user uploads.
+
+Uploaded files are renamed to the SHA-256 of their content so a URL always
+refers to the same bytes. That lets backend.media serve them with
+`Cache-Control: immutable`; a changed avatar simply gets a new URL.
+
+Because the name is the content, saving bytes that are already stored just
+returns the existing name: re-uploaded avatars and re-registered guardian
+photos share one blob. Blobs are never deleted when a row changes; instead
+`sweep_orphans()` (run by `manage.py sweep_media`) counts references from
+every FileField in the project and removes blobs nobody points at any more.
+"""
+import hashlib
+import os
+import re
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+
+from .thumbnails import THUMBNAIL_DIR
+
+HASH_LENGTH = 32
+HASHED_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{%d}(?:_\d+)?\.[A-Za-z0-9]+$' % HASH_LENGTH)
+
+
+def content_hash(content):
+    """SHA-256 hex digest of a File, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def is_hashed_name(name):
+    """True if `name` (or the upload it was derived from) is content-addressed."""
+    return bool(HASHED_NAME_RE.search(name.replace('\\', '/')))
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names uploads `<upload_to>/<sha256[:32]><ext>` and
+    stores identical content only once per directory.
+    Derivatives under thumbs/ keep the name they were given since they are
+    already derived from a hashed original.
+    """
+
+    def hashed_name(self, name, content):
+        directory, filename = os.path.split(name)
+        _, extension = os.path.splitext(filename)
+        hashed = f"{content_hash(content)[:HASH_LENGTH]}{extension.lower()}"
+        return os.path.join(directory, hashed) if directory else hashed
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if name.replace('\\', '/').startswith(f'{THUMBNAIL_DIR}/'):
+            return super().save(name, content, max_length=max_length)
+        name = self.hashed_name(name, content)
+        try:
+            # Same bytes already stored: share the existing blob. Touching it
+            # restarts the sweep's grace period, so a blob that was an orphan
+            # is not deleted under the row about to reference it.
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            return super().save(name, content, max_length=max_length)
+
+
+def file_fields():
+    """Yield (model, field) for every FileField/ImageField in the project."""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField) and field.concrete:
+                yield model, field
+
+
+def collect_references(chunk_size=2000):
+    """Reference count per stored name across all FileField columns."""
+    references = Counter()
+    for model, field in file_fields():
+        names = (
+            model._default_manager.exclude(**{f'{field.attname}__isnull': True})
+            .exclude(**{field.attname: ''})
+            .values_list(field.attname, flat=True)
+        )
+        for name in names.iterator(chunk_size=chunk_size):
+            references[name] += 1
+    return references
+
+
+def is_referenced(name):
+    """True if any FileField row points at `name` right now."""
+    return any(
+        model._default_manager.filter(**{field.attname: name}).exists() for model, field in file_fields()
+    )
+
+
+def _walk(storage, directory=''):
+    subdirs, files = storage.listdir(directory)
+    for filename in files:
+        yield f'{directory}/{filename}' if directory else filename
+    for subdir in subdirs:
+        yield from _walk(storage, f'{directory}/{subdir}' if directory else subdir)
+
+
+def _thumbnail_source_stem(name):
+    """thumbs/<dir>/<stem>_<size>.<ext> -> <dir>/<stem>"""
+    stem, _ = os.path.splitext(name[len(THUMBNAIL_DIR) + 1:])
+    return stem.rsplit('_', 1)[0]
+
+
+def sweep_orphans(storage, grace_seconds=24 * 60 * 60, dry_run=False):
+    """
+    Delete stored files with a reference count of zero.
+
+    Files newer than `grace_seconds` are kept so uploads whose row has not
+    been committed yet are not swept, and each original is looked up again
+    right before it is deleted in case a new row started sharing it during
+    the walk. Thumbnails are removed together with their original. Returns a
+    stats dict for reporting.
+    """
+    references = collect_references()
+    referenced_stems = {os.path.splitext(name)[0] for name in references}
+    cutoff = time.time() - grace_seconds
+    stats = {
+        'scanned': 0,
+        'referenced': len(references),
+        'shared_blobs': sum(1 for count in references.values() if count > 1),
+        'shared_references': sum(count - 1 for count in references.values() if count > 1),
+        'orphans': 0,
+        'bytes_reclaimed': 0,
+        'deleted': [],
+    }
+    for name in _walk(storage):
+        stats['scanned'] += 1
+        if name.startswith(f'{THUMBNAIL_DIR}/'):
+            if _thumbnail_source_stem(name) in referenced_stems:
+                continue
+        elif references.get(name):
+            continue
+        path = storage.path(name)
+        try:
+            if os.path.getmtime(path) > cutoff:
+                continue
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        if not name.startswith(f'{THUMBNAIL_DIR}/'):
+            try:
+                if is_referenced(name) or os.path.getmtime(path) > cutoff:
+                    continue  # re-shared by an upload since the references were counted
+            except OSError:
+                continue
+        stats['orphans'] += 1
+        stats['bytes_reclaimed'] += size
+        stats['deleted'].append(name)
+        if not dry_run:
+            storage.delete(name)
+    return stats
@@ -0,0 +1,355 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from parents.models import ParentEvent, ParentGuardian, Student
+from teacher.models import Attendance
+from teacher.tests import make_teacher
+
+from . import cache as tiered, compression
+from .compression import CompressionMiddleware, choose_encoding
+from .storage import HashedFileSystemStorage, sweep_orphans
+from .thumbnails import get_sizes, get_thumbnail_url, thumbnail_name
+
+
+class DedupSweepTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.storage = HashedFileSystemStorage(location=self.root)
+
+    def test_dedup_hit_restarts_grace_period(self):
+        name = self.storage.save('avatars/a.png', ContentFile(b'same bytes'))
+        old = time.time() - 3 * 24 * 60 * 60
+        os.utime(self.storage.path(name), (old, old))
+
+        self.assertEqual(self.storage.save('avatars/b.png', ContentFile(b'same bytes')), name)
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), old)
+        # Nothing references it yet, but it was just re-shared: the sweep keeps it
+        stats = sweep_orphans(self.storage, grace_seconds=60 * 60)
+        self.assertEqual(stats['deleted'], [])
+        self.assertTrue(self.storage.exists(name))
+
+    def test_old_orphan_is_swept(self):
+        name = self.storage.save('avatars/a.png', ContentFile(b'orphan'))
+        old = time.time() - 3 * 24 * 60 * 60
+        os.utime(self.storage.path(name), (old, old))
+        self.assertEqual(sweep_orphans(self.storage, grace_seconds=60 * 60)['deleted'], [name])
+        self.assertFalse(self.storage.exists(name))
+
+    def test_dedup_onto_swept_blob_stores_it_again(self):
+        name = self.storage.save('avatars/a.png', ContentFile(b'gone'))
+        os.remove(self.storage.path(name))
+        self.assertEqual(self.storage.save('avatars/b.png', ContentFile(b'gone')), name)
+        self.assertTrue(self.storage.exists(name))
+
+
+class ThumbnailTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        media_root = override_settings(MEDIA_ROOT=root)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        teacher = make_teacher()
+        student = Student.objects.create(lrn='1001', name='Ana Cruz', teacher=teacher, section='Rose')
+        self.parents = [
+            ParentGuardian.objects.create(student=student, teacher=teacher, name=name, role=role)
+            for name, role in (('Maria Cruz', 'Parent1'), ('Jose Cruz', 'Parent2'))
+        ]
+
+    def _png(self, color):
+        buffer = BytesIO()
+        Image.new('RGB', (300, 200), color).save(buffer, format='PNG')
+        return ContentFile(buffer.getvalue(), name='avatar.png')
+
+    def _upload(self, parent, color):
+        with self.captureOnCommitCallbacks(execute=True):
+            parent.avatar = self._png(color)
+            parent.save()
+        return parent.avatar.name
+
+    def _thumbs(self, name):
+        return [default_storage.exists(thumbnail_name(name, size)) for size in get_sizes()]
+
+    def test_upload_builds_thumbnails_and_lists_only_read_them(self):
+        name = self._upload(self.parents[0], 'red')
+        self.assertEqual(self._thumbs(name), [True] * len(get_sizes()))
+        with mock.patch('backend.thumbnails.generate_thumbnails') as generate:
+            url = get_thumbnail_url(self.parents[0].avatar, 64)
+        generate.assert_not_called()
+        self.assertEqual(url, default_storage.url(thumbnail_name(name, 64)))
+
+    def test_missing_thumbnail_falls_back_to_original(self):
+        name = default_storage.save('parent_avatars/legacy.png', self._png('blue'))
+        ParentGuardian.objects.filter(pk=self.parents[0].pk).update(avatar=name)
+        self.parents[0].refresh_from_db()
+        self.assertEqual(get_thumbnail_url(self.parents[0].avatar, 64), self.parents[0].avatar.url)
+        self.assertFalse(any(self._thumbs(name)))
+
+    def test_replacing_or_deleting_drops_unshared_thumbnails(self):
+        old = self._upload(self.parents[0], 'red')
+        new = self._upload(self.parents[0], 'green')
+        self.assertFalse(any(self._thumbs(old)))
+        self.assertTrue(all(self._thumbs(new)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parents[0].delete()
+        self.assertFalse(any(self._thumbs(new)))
+
+    def test_shared_original_keeps_its_thumbnails(self):
+        name = self._upload(self.parents[0], 'red')
+        self.assertEqual(self._upload(self.parents[1], 'red'), name)
+        self._upload(self.parents[0], 'green')
+        self.assertTrue(all(self._thumbs(name)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.parents[1].delete()
+        self.assertFalse(any(self._thumbs(name)))
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        tiered.clear()
+
+    def test_reads_come_from_the_local_tier(self):
+        version = tiered.version('test:version')
+        with mock.patch.object(cache, 'get') as shared_get:
+            self.assertEqual(tiered.version('test:version'), version)
+        shared_get.assert_not_called()
+
+    def test_other_workers_bump_is_seen_once_the_local_copy_expires(self):
+        version = tiered.version('test:version')
+        # Another worker bumps the shared key; this one keeps its copy until it expires
+        cache.set('test:version', version + 1, None)
+        self.assertEqual(tiered.version('test:version'), version)
+        tiered.local.delete('test:version')
+        self.assertEqual(tiered.version('test:version'), version + 1)
+
+    def test_own_writes_are_seen_at_once(self):
+        version = tiered.version('test:version')
+        tiered.bump('test:version')
+        self.assertNotEqual(tiered.version('test:version'), version)
+        tiered.set('test:key', 'a', None)
+        tiered.delete('test:key')
+        self.assertIsNone(tiered.get('test:key'))
+
+    @override_settings(
+        CACHES={**settings.CACHES, 'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache'}}
+    )
+    def test_database_cache_warns_on_deploy_check(self):
+        self.assertEqual([message.id for message in tiered.check_shared_cache(None)], ['backend.W001'])
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher()
+        self.client.force_login(self.teacher.user)
+
+    def _batch(self, requests):
+        response = self.client.post('/api/batch/', {'requests': requests}, content_type='application/json')
+        return response.status_code, response.json()
+
+    def test_placeholders_use_earlier_results(self):
+        code, body = self._batch([
+            {'method': 'POST', 'path': '/api/attendance/bulk/', 'body': {'operations': [
+                {'op': 'create', 'data': {'student_name': 'Ana Cruz', 'date': '2026-10-19'}},
+            ]}},
+            {'method': 'GET', 'path': '/api/attendance/{0.results.0.id}/'},
+            {
+                'method': 'PATCH', 'path': '/api/attendance/{0.results.0.id}/',
+                'body': {'student_name': '{1.student_name} Jr.'},
+            },
+        ])
+        self.assertEqual(code, 200)
+        self.assertEqual([result['status'] for result in body['results']], [200, 200, 200])
+        self.assertEqual(body['results'][1]['body']['student_name'], 'Ana Cruz')
+        self.assertEqual(Attendance.objects.get().student_name, 'Ana Cruz Jr.')
+
+    def test_failed_dependency(self):
+        _, body = self._batch([
+            {'method': 'GET', 'path': '/api/attendance/999999/'},
+            {'method': 'GET', 'path': '/api/attendance/{0.id}/'},
+            {'method': 'GET', 'path': '/api/roster/state/', 'params': {'date': '{2.date}'}},
+        ])
+        self.assertEqual([result['status'] for result in body['results']], [404, 424, 424])
+
+    def test_nested_batch_and_foreign_paths_are_rejected(self):
+        _, body = self._batch([
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}},
+            {'method': 'GET', 'path': '/admin/'},
+            {'method': 'TRACE', 'path': '/api/roster/state/'},
+        ])
+        self.assertEqual([result['status'] for result in body['results']], [400, 400, 405])
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_size_limit(self):
+        code, _ = self._batch([{'method': 'GET', 'path': '/api/roster/state/'}] * 3)
+        self.assertEqual(code, 400)
+
+    def test_each_view_checks_its_own_permissions(self):
+        other = Attendance.objects.create(
+            teacher=make_teacher('teacher2', section='Lily'), student_name='Ben Reyes', date='2026-10-19'
+        )
+        _, body = self._batch([{'method': 'DELETE', 'path': f'/api/attendance/{other.pk}/'}])
+        self.assertEqual(body['results'][0]['status'], 404)
+        self.assertTrue(Attendance.objects.filter(pk=other.pk).exists())
+
+        self.client.logout()
+        _, body = self._batch([{'method': 'GET', 'path': '/api/roster/state/'}])
+        self.assertIn(body['results'][0]['status'], (401, 403))
+
+    def test_crash_is_logged_not_echoed(self):
+        def boom(request):
+            raise RuntimeError('UNIQUE constraint failed: secret_table.column')
+
+        with mock.patch('backend.batch.resolve', return_value=mock.Mock(func=boom, args=(), kwargs={})), \
+                self.assertLogs('backend.batch', 'ERROR'):
+            _, body = self._batch([{'method': 'GET', 'path': '/api/roster/state/'}])
+        result = body['results'][0]
+        self.assertEqual((result['status'], result['body']), (500, {'error': 'Internal server error'}))
+
+
+class CompressionTests(TestCase):
+    body = json.dumps([{'student_name': 'Ana Cruz', 'status': 'Present'}] * 100).encode()
+
+    def _run(self, accept=None, response=None, path='/api/attendance/'):
+        if response is None:
+            response = HttpResponse(self.body, content_type='application/json')
+        headers = {'HTTP_ACCEPT_ENCODING': accept} if accept is not None else {}
+        return CompressionMiddleware(lambda request: response)(RequestFactory().get(path, **headers))
+
+    def test_quality_values_pick_the_encoding(self):
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('gzip;q=0.5, br;q=0.4'), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0, *;q=0.1'), 'gzip')
+        self.assertEqual(choose_encoding('gzip;q=0'), None)
+        self.assertEqual(choose_encoding('identity'), None)
+        self.assertEqual(choose_encoding(None), None)
+        with mock.patch('backend.compression.brotli', None):
+            self.assertEqual(choose_encoding('br'), None)
+
+    def test_gzip(self):
+        response = self._run('gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @skipIf(compression.brotli is None, 'brotli is not installed')
+    def test_brotli_preferred_at_equal_quality(self):
+        response = self._run('gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), self.body)
+
+    def test_small_responses_are_left_alone(self):
+        response = self._run('gzip', HttpResponse(b'{"ok": true}', content_type='application/json'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_encoded_streamed_and_foreign_responses_pass_through(self):
+        encoded = HttpResponse(gzip.compress(self.body), content_type='application/json')
+        encoded['Content-Encoding'] = 'gzip'
+        self.assertEqual(self._run('br, gzip', encoded).content, gzip.compress(self.body))
+        streamed = self._run('gzip', StreamingHttpResponse(iter([self.body]), content_type='application/json'))
+        self.assertFalse(streamed.has_header('Content-Encoding'))
+        image = self._run('gzip', HttpResponse(self.body, content_type='image/png'))
+        self.assertFalse(image.has_header('Content-Encoding'))
+        self.assertFalse(self._run('gzip', path='/admin/').has_header('Content-Encoding'))
+
+    def test_strong_etag_is_weakened(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = '"abc"'
+        self.assertEqual(self._run('gzip', response)['ETag'], 'W/"abc"')
+        plain = HttpResponse(self.body, content_type='application/json')
+        plain['ETag'] = '"abc"'
+        self.assertEqual(self._run('identity', plain)['ETag'], '"abc"')
+
+    def test_calendar_feed_revalidates_with_the_weakened_etag(self):
+        teacher = make_teacher()
+        Student.objects.create(lrn='1001', name='Ana Cruz', teacher=teacher, section='Rose')
+        for day in range(1, 40):
+            ParentEvent.objects.create(
+                teacher=teacher, title=f'Event {day}', event_type='event',
+                scheduled_at=timezone.now() + timedelta(days=day),
+            )
+        self.client.force_login(teacher.user)
+        url = self.client.get('/api/parents/calendar/', {'lrn': '1001'}).json()['url']
+        first = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertTrue(first['ETag'].startswith('W/'))
+        again = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+
+class MediaServeTests(TestCase):
+    data = bytes(range(100))
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        media_root = override_settings(MEDIA_ROOT=root)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        with open(os.path.join(root, 'doc.bin'), 'wb') as fh:
+            fh.write(self.data)
+        with open(os.path.join(root, 'report.csv.gz'), 'wb') as fh:
+            fh.write(gzip.compress(b'a,b\n'))
+
+    def _get(self, path='doc.bin', **headers):
+        response = self.client.get(f'/media/{path}', **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_full_file(self):
+        response, body = self._get()
+        self.assertEqual((response.status_code, body), (200, self.data))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_ranges(self):
+        response, body = self._get(HTTP_RANGE='bytes=-4')
+        self.assertEqual((response.status_code, body), (206, self.data[-4:]))
+        self.assertEqual(response['Content-Range'], 'bytes 96-99/100')
+        response, body = self._get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual((body, response['Content-Length']), (self.data[10:20], '10'))
+        response, body = self._get(HTTP_RANGE='bytes=90-500')
+        self.assertEqual((body, response['Content-Range']), (self.data[90:], 'bytes 90-99/100'))
+
+    def test_unsatisfiable_start(self):
+        response, _ = self._get(HTTP_RANGE='bytes=100-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */100'))
+
+    def test_if_range_mismatch_sends_the_full_body(self):
+        etag = self._get()[0]['ETag']
+        response, body = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, body), (200, self.data))
+        response, body = self._get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual((response.status_code, body), (206, self.data[:10]))
+
+    def test_weak_if_none_match(self):
+        etag = self._get()[0]['ETag']
+        response, _ = self._get(HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_compressed_file_is_served_as_an_archive(self):
+        response, body = self._get('report.csv.gz')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(gzip.decompress(body), b'a,b\n')
+
+    def test_path_traversal_is_404(self):
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
@@ -0,0 +1,180 @@
+"""
+Resized derivatives for uploaded images (parent avatars, guardian photos).
+
+Originals are stored at camera resolution. List screens and the admin only
+need small versions, so each image gets a fixed set of size variants that are
+kept on disk next to the other media files:
+
+    parent_avatars/jane.jpg  ->  thumbs/parent_avatars/jane_64.webp
+                                 thumbs/parent_avatars/jane_256.webp
+                                 thumbs/parent_avatars/jane_1024.webp
+
+Variants are built once, after the upload's transaction commits, by the
+receivers `track_thumbnails` connects for a model (see the apps' ready()).
+Serializers only look them up, so a list never decodes an image; uploads made
+before a variant existed fall back to the original until
+`manage.py generate_thumbnails` fills them in. When a photo is replaced or its
+row deleted, the old variants go as soon as no other row shares the original;
+the original itself is left to `manage.py sweep_media`.
+"""
+import logging
+import os
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (64, 256, 1024)
+THUMBNAIL_DIR = 'thumbs'
+
+
+def get_sizes():
+    return tuple(getattr(settings, 'IMAGE_THUMBNAIL_SIZES', DEFAULT_SIZES))
+
+
+def get_format():
+    """Output format for derivatives; falls back to JPEG if Pillow lacks WebP."""
+    fmt = str(getattr(settings, 'IMAGE_THUMBNAIL_FORMAT', 'WEBP')).upper()
+    if fmt == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return fmt
+
+
+def thumbnail_name(source_name, size):
+    """Storage name of the `size` px derivative of `source_name`."""
+    stem, _ = os.path.splitext(source_name)
+    extension = 'webp' if get_format() == 'WEBP' else 'jpg'
+    return f"{THUMBNAIL_DIR}/{stem}_{size}.{extension}"
+
+
+def _render(image, size, fmt):
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.LANCZOS)
+    if fmt == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    if fmt == 'WEBP':
+        variant.save(buffer, format=fmt, quality=80, method=4)
+    else:
+        variant.save(buffer, format=fmt, quality=80, optimize=True)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(field_file, sizes=None):
+    """
+    Create every missing size variant for an ImageField file.
+    The source is decoded once and each variant is written through the same
+    storage as the original. Returns {size: storage name}.
+    """
+    storage = field_file.storage
+    fmt = get_format()
+    sizes = sizes or get_sizes()
+    missing = {size: thumbnail_name(field_file.name, size) for size in sizes}
+    missing = {size: name for size, name in missing.items() if not storage.exists(name)}
+    if not missing:
+        return {size: thumbnail_name(field_file.name, size) for size in sizes}
+
+    with storage.open(field_file.name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+        image.load()
+
+    for size, name in missing.items():
+        storage.save(name, ContentFile(_render(image, size, fmt)))
+    return {size: thumbnail_name(field_file.name, size) for size in sizes}
+
+
+def delete_thumbnails(storage, source_name):
+    """Remove all derivatives of `source_name` (used when the original goes away)."""
+    deleted = []
+    for size in get_sizes():
+        name = thumbnail_name(source_name, size)
+        if storage.exists(name):
+            storage.delete(name)
+            deleted.append(name)
+    return deleted
+
+
+def _image_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.ImageField)]
+
+
+def _build(field_file):
+    try:
+        generate_thumbnails(field_file)
+    except Exception:
+        logger.exception('Could not build thumbnails for %s', field_file.name)
+
+
+def _drop_if_unshared(storage, source_name):
+    from .storage import is_referenced  # storage imports THUMBNAIL_DIR from here
+
+    if not is_referenced(source_name):
+        delete_thumbnails(storage, source_name)
+
+
+def _remember_previous(sender, instance, update_fields=None, **kwargs):
+    fields = [field for field in _image_fields(sender) if update_fields is None or field.name in update_fields]
+    if instance._state.adding or not fields:
+        instance._previous_images = {}
+        return
+    row = sender._default_manager.filter(pk=instance.pk).values(*(field.attname for field in fields)).first()
+    instance._previous_images = row or {}
+
+
+def _thumbnail_saved(sender, instance, update_fields=None, **kwargs):
+    previous = getattr(instance, '_previous_images', {})
+    for field in _image_fields(sender):
+        if update_fields is not None and field.name not in update_fields:
+            continue
+        field_file = getattr(instance, field.attname)
+        old_name = previous.get(field.attname)
+        if old_name and old_name != field_file.name:
+            transaction.on_commit(partial(_drop_if_unshared, field.storage, old_name))
+        if field_file and old_name != field_file.name:
+            transaction.on_commit(partial(_build, field_file))
+
+
+def _thumbnail_deleted(sender, instance, **kwargs):
+    for field in _image_fields(sender):
+        field_file = getattr(instance, field.attname)
+        if field_file:
+            transaction.on_commit(partial(_drop_if_unshared, field.storage, field_file.name))
+
+
+def track_thumbnails(*model_classes):
+    """Build variants when an ImageField of these models gets a new file and drop the old ones."""
+    for model in model_classes:
+        pre_save.connect(_remember_previous, sender=model, dispatch_uid=f'thumbnails.pre_save.{model._meta.label}')
+        post_save.connect(_thumbnail_saved, sender=model, dispatch_uid=f'thumbnails.post_save.{model._meta.label}')
+        post_delete.connect(
+            _thumbnail_deleted, sender=model, dispatch_uid=f'thumbnails.post_delete.{model._meta.label}',
+        )
+
+
+def get_thumbnail_url(field_file, size, request=None):
+    """
+    Public URL of the `size` px derivative. Never builds one: if it does not
+    exist (a legacy upload, or one that is not a decodable image) the URL of
+    the original image is returned instead.
+    """
+    if not field_file:
+        return None
+    storage = field_file.storage
+    name = thumbnail_name(field_file.name, size)
+    try:
+        url = storage.url(name) if storage.exists(name) else field_file.url
+    except Exception:
+        logger.exception('Could not look up %spx thumbnail for %s', size, field_file.name)
+        return None
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
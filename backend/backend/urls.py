@@ -14,25 +14,33 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from backend.batch import BatchView
+from backend.media import serve_media
 from parents.views import ParentNotificationListCreateView, ParentEventListCreateView, ParentScheduleListCreateView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/batch/', BatchView.as_view(), name='batch'),
     path('api/', include('teacher.urls')),
     path('api/guardian/', include('guardian.urls')),
     path('api/parents/', include('parents.urls')),  # ✅ ADD THIS
+    path('api/search/', include('search.urls')),
     path('api/notifications/', ParentNotificationListCreateView.as_view(), name='notifications'),
     path('api/events/', ParentEventListCreateView.as_view(), name='events'),
     path('api/schedule/', ParentScheduleListCreateView.as_view(), name='schedule'),
 ]
 
-# Serve media files in all environments (needed for Render ephemeral filesystem workaround)
+# Serve media files in all environments (needed for Render ephemeral filesystem workaround).
+# backend.media adds immutable caching, ETag/304, Range and X-Accel-Redirect/X-Sendfile offload.
 # Note: For production, consider using S3/cloud storage instead
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+]
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
@@ -4,6 +4,12 @@ set -o errexit
 pip install -r requirements.txt
 python manage.py collectstatic --no-input
 python manage.py migrate
+# Table behind the shared cache when REDIS_URL is not set (no-op if it exists)
+python manage.py createcachetable
+# Deployment warnings in the build log, e.g. backend.W001 when REDIS_URL is not set
+python manage.py check --deploy
+# Thumbnails for photos uploaded before a size existed (skips ones already built)
+python manage.py generate_thumbnails
 # Try the standard createsuperuser first (keeps Render's default behavior).
 # If it fails (for example because the user already exists), run the idempotent
 # script which handles existing users gracefully.
@@ -1,7 +1,12 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from backend.thumbnails import get_thumbnail_url
+from teacher.snapshot import record_changes
 from .models import Guardian
+from .verification import invalidate_teacher
 
 @admin.register(Guardian)
 class GuardianAdmin(admin.ModelAdmin):
@@ -75,7 +80,7 @@ class GuardianAdmin(admin.ModelAdmin):
         if obj.photo:
             return format_html(
                 '<img src="{}" style="width: 40px; height: 40px; object-fit: cover; border-radius: 50%;" />',
-                obj.photo.url
+                get_thumbnail_url(obj.photo, 64)
             )
         return format_html('<span style="color: #999;">No photo</span>')
     photo_thumbnail.short_description = 'Photo'
@@ -185,17 +190,27 @@ class GuardianAdmin(admin.ModelAdmin):
     
     actions = ['mark_as_allowed', 'mark_as_declined', 'mark_as_pending']
     
+    def _set_status(self, request, queryset, status):
+        # update() sends no post_save, so do what the Guardian receivers would
+        with transaction.atomic():
+            rows = list(queryset.values_list('pk', 'teacher_id'))
+            teacher_ids = {teacher_id for _, teacher_id in rows}
+            # updated_at moves so the parent app's delta sync picks the change up
+            updated = queryset.update(status=status, updated_at=timezone.now())
+            # Offline scanners pick the change up from the roster log
+            record_changes(Guardian, rows)
+            for teacher_id in teacher_ids:
+                transaction.on_commit(lambda teacher_id=teacher_id: invalidate_teacher(teacher_id))
+        self.message_user(request, f'{updated} guardian(s) marked as {status}.')
+
     def mark_as_allowed(self, request, queryset):
-        updated = queryset.update(status='allowed')
-        self.message_user(request, f'{updated} guardian(s) marked as allowed.')
+        self._set_status(request, queryset, 'allowed')
     mark_as_allowed.short_description = 'Mark selected as Allowed'
     
     def mark_as_declined(self, request, queryset):
-        updated = queryset.update(status='declined')
-        self.message_user(request, f'{updated} guardian(s) marked as declined.')
+        self._set_status(request, queryset, 'declined')
     mark_as_declined.short_description = 'Mark selected as Declined'
     
     def mark_as_pending(self, request, queryset):
-        updated = queryset.update(status='pending')
-        self.message_user(request, f'{updated} guardian(s) marked as pending.')
+        self._set_status(request, queryset, 'pending')
     mark_as_pending.short_description = 'Mark selected as Pending'
\ No newline at end of file
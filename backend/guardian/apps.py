@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class GuardianConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'guardian'
+
+    def ready(self):
+        from backend.thumbnails import track_thumbnails
+
+        from . import verification  # noqa: F401  (keeps the pickup allow-list current)
+        from .models import Guardian
+
+        track_thumbnails(Guardian)  # builds photo thumbnails on upload, drops replaced ones
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+
+from guardian.matching import StudentNameIndex
+from guardian.models import Guardian
+from parents.models import Student
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Link guardians that have no student FK to the Student named in student_name, and report "
+        "names that match several students (or none) so they can be fixed by hand."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report matches without saving them.')
+
+    def handle(self, *args, **options):
+        students = list(Student.objects.values_list('lrn', 'teacher_id', 'name'))
+        index = StudentNameIndex(students)
+        names = {lrn: name for lrn, _, name in students}
+
+        pks = list(Guardian.objects.filter(student__isnull=True).order_by('pk').values_list('pk', flat=True))
+        linked, ambiguous, unmatched = 0, [], []
+        for start in range(0, len(pks), BATCH_SIZE):
+            rows = list(
+                Guardian.objects.filter(pk__in=pks[start:start + BATCH_SIZE])
+                .only('pk', 'name', 'teacher_id', 'student_name')
+            )
+            updated = []
+            for guardian in rows:
+                candidates = index.candidates(guardian.teacher_id, guardian.student_name)
+                if len(candidates) == 1:
+                    guardian.student_id = candidates[0]
+                    updated.append(guardian)
+                elif candidates:
+                    ambiguous.append((guardian, candidates))
+                else:
+                    unmatched.append(guardian)
+            if not options['dry_run']:
+                Guardian.objects.bulk_update(updated, ['student'])
+            linked += len(updated)
+
+        for guardian, candidates in ambiguous:
+            choices = ', '.join(f"{lrn} ({names[lrn]})" for lrn in candidates)
+            self.stdout.write(
+                f"  ambiguous: guardian #{guardian.pk} {guardian.name!r} for {guardian.student_name!r} -> {choices}"
+            )
+        for guardian in unmatched:
+            self.stdout.write(
+                f"  no match:  guardian #{guardian.pk} {guardian.name!r} for {guardian.student_name!r}"
+            )
+
+        action = 'Would link' if options['dry_run'] else 'Linked'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {linked} of {len(pks)} unlinked guardian(s); "
+            f"{len(ambiguous)} ambiguous, {len(unmatched)} without a matching student."
+        ))
@@ -0,0 +1,39 @@
+"""
+Match the free-text `Guardian.student_name` typed by a teacher to a Student.
+
+Used when a guardian is saved without a student, by the backfill migration
+and by `manage.py backfill_guardian_students`. Only plain values are passed
+in, so the migration can use it with historical models.
+"""
+
+
+def name_key(name):
+    """Case- and whitespace-insensitive form of a student name."""
+    return ' '.join((name or '').split()).casefold()
+
+
+class StudentNameIndex:
+    """
+    Candidate LRNs per student name, built from (lrn, teacher_id, name) rows.
+    Names are looked up among the guardian's teacher's students first and
+    across all students only if that teacher has none with the name.
+    """
+
+    def __init__(self, rows):
+        self.by_teacher = {}
+        self.by_name = {}
+        for lrn, teacher_id, name in rows:
+            key = name_key(name)
+            self.by_teacher.setdefault((teacher_id, key), []).append(lrn)
+            self.by_name.setdefault(key, []).append(lrn)
+
+    def candidates(self, teacher_id, student_name):
+        key = name_key(student_name)
+        if not key:
+            return []
+        return self.by_teacher.get((teacher_id, key)) or self.by_name.get(key, [])
+
+    def match(self, teacher_id, student_name):
+        """The only candidate LRN, or None when there is no match or several."""
+        found = self.candidates(teacher_id, student_name)
+        return found[0] if len(found) == 1 else None
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+from guardian.matching import StudentNameIndex
+
+BATCH_SIZE = 500
+
+
+def link_students(apps, schema_editor):
+    """
+    Set Guardian.student from student_name where exactly one Student matches.
+    Ambiguous and unknown names stay NULL; list them with
+    `manage.py backfill_guardian_students --dry-run`.
+    """
+    Guardian = apps.get_model('guardian', 'Guardian')
+    Student = apps.get_model('parents', 'Student')
+    index = StudentNameIndex(Student.objects.values_list('lrn', 'teacher_id', 'name'))
+
+    pks = list(Guardian.objects.filter(student__isnull=True).order_by('pk').values_list('pk', flat=True))
+    linked = ambiguous = 0
+    for start in range(0, len(pks), BATCH_SIZE):
+        rows = list(
+            Guardian.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).only('pk', 'teacher_id', 'student_name')
+        )
+        updated = []
+        for row in rows:
+            candidates = index.candidates(row.teacher_id, row.student_name)
+            if len(candidates) == 1:
+                row.student_id = candidates[0]
+                updated.append(row)
+            elif candidates:
+                ambiguous += 1
+        Guardian.objects.bulk_update(updated, ['student'])
+        linked += len(updated)
+    if pks:
+        print(
+            f"\n  Linked {linked} of {len(pks)} guardian(s) to a student; {ambiguous} ambiguous "
+            f"(see `manage.py backfill_guardian_students --dry-run`)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guardian', '0008_guardian_parent_guardian_guardian_student'),
+        ('parents', '0013_section_ref'),
+        ('teacher', '0005_attendance_student'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_students, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['student', 'status', '-timestamp'], name='guardian_student_status_idx'),
+        ),
+    ]
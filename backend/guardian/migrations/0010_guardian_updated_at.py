@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:46
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing rows were last written when they were created, as far as we know
+    Guardian = apps.get_model('guardian', 'Guardian')
+    Guardian.objects.update(updated_at=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guardian', '0009_guardian_student_backfill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guardian',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['student', 'updated_at'], name='guardian_sync_idx'),
+        ),
+    ]
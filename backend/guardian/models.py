@@ -1,6 +1,7 @@
 from django.db import models
 from teacher.models import TeacherProfile
 from parents.models import ParentGuardian, Student
+from .matching import StudentNameIndex, name_key
 
 class Guardian(models.Model):
     STATUS_CHOICES = [
@@ -49,14 +50,35 @@ class Guardian(models.Model):
         help_text='Approval status of the guardian'
     )
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-timestamp']
         verbose_name = 'Guardian'
         verbose_name_plural = 'Guardians'
+        indexes = [
+            # Parent app: a child's pending guardians, newest first
+            models.Index(fields=['student', 'status', '-timestamp'], name='guardian_student_status_idx'),
+            # Parent app delta sync (parents/sync.py)
+            models.Index(fields=['student', 'updated_at'], name='guardian_sync_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - Guardian of {self.student_name} ({self.get_status_display()})"
+
+    def save(self, *args, **kwargs):
+        # Teachers register guardians by typing the student's name; link the
+        # Student here so parent lookups can filter on the FK alone.
+        if self.student_id is None and name_key(self.student_name):
+            self.student_id = self.match_student(self.teacher_id, self.student_name)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def match_student(teacher_id, student_name):
+        """LRN of the single Student called `student_name`, or None if unknown/ambiguous."""
+        first_word = name_key(student_name).split()[0]
+        rows = Student.objects.filter(name__icontains=first_word).values_list('lrn', 'teacher_id', 'name')
+        return StudentNameIndex(rows).match(teacher_id, student_name)
     
     def get_photo_url(self):
         """Get the full URL for the photo"""
@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from backend.serializers import DynamicFieldsMixin
+from backend.thumbnails import get_thumbnail_url
 from .models import Guardian
 
-class GuardianSerializer(serializers.ModelSerializer):
+class GuardianSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     photo_url = serializers.SerializerMethodField()
+    photo_thumb_url = serializers.SerializerMethodField()
     teacher_name = serializers.CharField(source='teacher.user.get_full_name', read_only=True)
     student_id = serializers.CharField(source='student.lrn', read_only=True)
     parent_guardian_name = serializers.CharField(source='parent_guardian.name', read_only=True)
@@ -25,10 +28,13 @@ class GuardianSerializer(serializers.ModelSerializer):
             'student_name',
             'photo',
             'photo_url',
+            'photo_thumb_url',
             'status',
             'timestamp'
         ]
-        read_only_fields = ['id', 'timestamp', 'teacher_name', 'photo_url', 'student_id', 'parent_guardian_name']
+        read_only_fields = ['id', 'timestamp', 'teacher_name', 'photo_url', 'photo_thumb_url', 'student_id', 'parent_guardian_name']
+        # Columns read by the method fields (see backend/serializers.py)
+        field_sources = {'photo_url': ('photo',), 'photo_thumb_url': ('photo',)}
     
     def get_photo_url(self, obj):
         """Return the full URL for the photo"""
@@ -38,6 +44,10 @@ class GuardianSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.photo.url)
             return obj.photo.url
         return None
+
+    def get_photo_thumb_url(self, obj):
+        """Return the URL of the 256px photo derivative for list screens"""
+        return get_thumbnail_url(obj.photo, 256, self.context.get('request'))
     
     def validate_age(self, value):
         """Validate that age is reasonable for a guardian"""
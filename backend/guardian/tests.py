@@ -1,3 +1,60 @@
-from django.test import TestCase
+import gzip
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+
+from backend import cache as tiered
+from teacher.models import TeacherProfile
+from teacher.snapshot import build_delta, current_version
+
+from . import verification
+from .admin import GuardianAdmin
+from .models import Guardian
+
+
+class GuardianStatusActionTests(TestCase):
+    def setUp(self):
+        tiered.clear()
+        user = User.objects.create_user('teacher1', password='x')
+        self.teacher = TeacherProfile.objects.create(
+            user=user, age=30, gender='Female', section='Rose', contact='0917', address='x'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.guardian = Guardian.objects.create(
+                teacher=self.teacher, name='Maria Cruz', age=40, student_name='Ana Cruz', status='allowed'
+            )
+        self.admin = GuardianAdmin(Guardian, admin.site)
+        self.request = RequestFactory().post('/')
+
+    def _run_action(self, action):
+        with mock.patch.object(GuardianAdmin, 'message_user'), self.captureOnCommitCallbacks(execute=True):
+            getattr(self.admin, action)(self.request, Guardian.objects.filter(pk=self.guardian.pk))
+
+    def test_decline_revokes_cached_allow(self):
+        self.assertEqual(verification.verify(self.teacher.pk, name='Maria Cruz')[0], verification.ALLOW)
+        self._run_action('mark_as_declined')
+        self.assertEqual(verification.verify(self.teacher.pk, name='Maria Cruz')[0], verification.UNKNOWN)
+
+    def test_decline_reaches_other_workers(self):
+        verification.verify(self.teacher.pk, name='Maria Cruz')
+        stale = verification._indexes[self.teacher.pk]
+        self._run_action('mark_as_declined')
+        # Another process still holding the old index sees a new shared version
+        verification._indexes[self.teacher.pk] = stale
+        self.assertEqual(verification.verify(self.teacher.pk, name='Maria Cruz')[0], verification.UNKNOWN)
+
+    def test_version_keys_expire(self):
+        verification.verify(self.teacher.pk, name='Maria Cruz')
+        with mock.patch.object(verification.cache, 'set') as cache_set:
+            verification.invalidate_teacher(self.teacher.pk)
+        self.assertEqual(cache_set.call_args.args[2], verification.VERSION_TIMEOUT)
+
+    def test_status_change_reaches_offline_roster_delta(self):
+        version = current_version(self.teacher.pk)
+        self._run_action('mark_as_declined')
+        _, packed = build_delta(self.teacher.pk, version)
+        delta = json.loads(gzip.decompress(packed))
+        self.assertEqual(delta['guardians']['delete'], [str(self.guardian.pk)])
@@ -1,6 +1,6 @@
 
 from django.urls import path
-from .views import GuardianView, GuardianByTeacherView, GuardianPublicListView, ParentGuardianListView
+from .views import GuardianView, GuardianByTeacherView, GuardianPublicListView, ParentGuardianListView, GuardianVerifyView
 
 app_name = 'guardian'
 
@@ -11,4 +11,5 @@ urlpatterns = [
     path('parent/', ParentGuardianListView.as_view(), name='parent-guardian-list'),
     path('parent/<int:pk>/', ParentGuardianListView.as_view(), name='parent-guardian-detail'),
     path('public/', GuardianPublicListView.as_view(), name='guardian-public-list'),
+    path('verify/', GuardianVerifyView.as_view(), name='guardian-verify'),
 ]
@@ -0,0 +1,208 @@
+"""
+Pickup verification: is this person an allowed guardian or a flagged
+unauthorized person for the teacher's class?
+
+Each worker process keeps a per-teacher index in memory, keyed by normalized
+name and by contact number, holding the teacher's allowed Guardians and
+UnauthorizedPersons. A lookup is two dict probes plus one read of the
+teacher's index version, kept in the shared cache (settings.CACHES) and
+read through the per-process tier of backend/cache.py, so another worker's
+change is noticed within LOCAL_CACHE_TIMEOUT seconds. Saves
+and deletes patch the local index in place and bump that version, so other
+workers notice and rebuild their copy on their next lookup. Writes that
+send no signals (queryset.update) must call `invalidate_teacher`. Version
+keys expire after VERSION_TIMEOUT, which bounds how long an index can
+outlive a change that was never signalled.
+"""
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend import cache as tiered
+from backend.thumbnails import get_thumbnail_url
+from teacher.models import UnauthorizedPerson
+
+from .matching import name_key
+from .models import Guardian
+
+ALLOW, DENY, UNKNOWN = 'allow', 'deny', 'unknown'
+CONTACT_DIGITS = 10  # compare the last 10 digits so 0917..., +63917... and 63917... agree
+VERSION_TIMEOUT = 5 * 60
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def contact_key(value):
+    digits = re.sub(r'\D', '', value or '')
+    return digits[-CONTACT_DIGITS:] if len(digits) >= 7 else ''
+
+
+def _version_key(teacher_id):
+    return f'verify:version:{teacher_id}'
+
+
+def _shared_version(teacher_id):
+    return tiered.version(_version_key(teacher_id), VERSION_TIMEOUT)
+
+
+def _guardian_entry(guardian):
+    return {
+        'type': 'guardian',
+        'id': guardian.id,
+        'name': guardian.name,
+        'student_name': guardian.student_name,
+        'student_lrn': guardian.student_id,
+        'relationship': guardian.relationship,
+        'contact': guardian.contact,
+        'photo': get_thumbnail_url(guardian.photo, 256),
+    }
+
+
+def _unauthorized_entry(person):
+    return {
+        'type': 'unauthorized',
+        'id': person.id,
+        'name': person.name,
+        'student_name': person.student_name,
+        'student_lrn': None,
+        'relationship': person.relation,
+        'contact': person.contact,
+        'photo': get_thumbnail_url(person.photo, 256),
+    }
+
+
+class TeacherIndex:
+    def __init__(self, version):
+        self.version = version
+        self.entries = {}
+        self.by_name = defaultdict(set)
+        self.by_contact = defaultdict(set)
+
+    def add(self, entry):
+        ref = (entry['type'], entry['id'])
+        self.entries[ref] = entry
+        if name_key(entry['name']):
+            self.by_name[name_key(entry['name'])].add(ref)
+        if contact_key(entry['contact']):
+            self.by_contact[contact_key(entry['contact'])].add(ref)
+
+    def remove(self, kind, pk):
+        entry = self.entries.pop((kind, pk), None)
+        if entry:
+            self.by_name.get(name_key(entry['name']), set()).discard((kind, pk))
+            self.by_contact.get(contact_key(entry['contact']), set()).discard((kind, pk))
+
+    def lookup(self, name=None, contact=None):
+        """[(entry, matched_on)] for entries matching the name and/or contact."""
+        refs = defaultdict(list)
+        if name_key(name):
+            for ref in self.by_name.get(name_key(name), ()):
+                refs[ref].append('name')
+        if contact_key(contact):
+            for ref in self.by_contact.get(contact_key(contact), ()):
+                refs[ref].append('contact')
+        return [(self.entries[ref], matched_on) for ref, matched_on in refs.items()]
+
+
+def _build(teacher_id, version):
+    index = TeacherIndex(version)
+    for guardian in Guardian.objects.filter(teacher_id=teacher_id, status='allowed').only(
+        'id', 'name', 'student_name', 'student_id', 'relationship', 'contact', 'photo',
+    ):
+        index.add(_guardian_entry(guardian))
+    for person in UnauthorizedPerson.objects.filter(teacher_id=teacher_id).only(
+        'id', 'name', 'student_name', 'relation', 'contact', 'photo',
+    ):
+        index.add(_unauthorized_entry(person))
+    return index
+
+
+def teacher_index(teacher_id):
+    version = _shared_version(teacher_id)
+    index = _indexes.get(teacher_id)
+    if index is None or index.version != version:
+        index = _build(teacher_id, version)
+        with _lock:
+            _indexes[teacher_id] = index
+    return index
+
+
+def verify(teacher_id, name=None, contact=None, student=None):
+    """
+    Decide allow / deny / unknown for a person at pickup.
+
+    deny: matches a flagged unauthorized person (any student).
+    allow: matches an allowed guardian; when `student` (LRN or name) is given,
+    the guardian must be registered for that student.
+    """
+    matches = teacher_index(teacher_id).lookup(name, contact)
+    flagged = [(entry, on) for entry, on in matches if entry['type'] == 'unauthorized']
+    if flagged:
+        return DENY, flagged
+
+    allowed = [(entry, on) for entry, on in matches if entry['type'] == 'guardian']
+    if student:
+        allowed = [
+            (entry, on) for entry, on in allowed
+            if student == entry['student_lrn'] or name_key(student) == name_key(entry['student_name'])
+        ]
+    return (ALLOW, allowed) if allowed else (UNKNOWN, [])
+
+
+def invalidate_teacher(teacher_id):
+    """Make every worker rebuild the teacher's index (after bulk updates that send no signals)."""
+    tiered.bump(_version_key(teacher_id), VERSION_TIMEOUT)
+    with _lock:
+        _indexes.pop(teacher_id, None)
+
+
+def _schedule(teacher_id, kind, pk, entry):
+    # After commit, so a rolled-back write never reaches the index
+    transaction.on_commit(lambda: _apply(teacher_id, kind, pk, entry))
+
+
+def _apply(teacher_id, kind, pk, entry):
+    """Patch this process's index in place and bump the shared version."""
+    previous = cache.get(_version_key(teacher_id))
+    version = time.time_ns()
+    tiered.set(_version_key(teacher_id), version, VERSION_TIMEOUT)
+    with _lock:
+        index = _indexes.get(teacher_id)
+        if index is None:
+            return
+        if index.version != previous:
+            # Already stale (another worker changed it): rebuild on next lookup
+            del _indexes[teacher_id]
+            return
+        index.remove(kind, pk)
+        if entry:
+            index.add(entry)
+        index.version = version
+
+
+@receiver(post_save, sender=Guardian, dispatch_uid='verify_guardian_saved')
+def _guardian_saved(sender, instance, **kwargs):
+    entry = _guardian_entry(instance) if instance.status == 'allowed' else None
+    _schedule(instance.teacher_id, 'guardian', instance.pk, entry)
+
+
+@receiver(post_delete, sender=Guardian, dispatch_uid='verify_guardian_deleted')
+def _guardian_deleted(sender, instance, **kwargs):
+    _schedule(instance.teacher_id, 'guardian', instance.pk, None)
+
+
+@receiver(post_save, sender=UnauthorizedPerson, dispatch_uid='verify_unauthorized_saved')
+def _unauthorized_saved(sender, instance, **kwargs):
+    _schedule(instance.teacher_id, 'unauthorized', instance.pk, _unauthorized_entry(instance))
+
+
+@receiver(post_delete, sender=UnauthorizedPerson, dispatch_uid='verify_unauthorized_deleted')
+def _unauthorized_deleted(sender, instance, **kwargs):
+    _schedule(instance.teacher_id, 'unauthorized', instance.pk, None)
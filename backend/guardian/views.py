@@ -4,11 +4,13 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from teacher.models import TeacherProfile
 from parents.models import ParentGuardian, ParentMobileAccount
+from search.backends import get_backend
 from .models import Guardian
 from .serializers import GuardianSerializer
+from .verification import verify
+import time
 import base64
 from django.core.files.base import ContentFile
-from django.db.models import Q
 
 class GuardianView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -112,6 +114,7 @@ class GuardianView(APIView):
             
             # Get guardians for this teacher
             guardians = Guardian.objects.filter(teacher=teacher_profile).order_by('-timestamp')
+            guardians = GuardianSerializer.sparse_queryset(guardians, request)
             serializer = GuardianSerializer(guardians, many=True, context={'request': request})
             
             return Response({
@@ -344,6 +347,7 @@ class GuardianByTeacherView(APIView):
             
             # Get guardians for this teacher
             guardians = Guardian.objects.filter(teacher=teacher_profile).order_by('-timestamp')
+            guardians = GuardianSerializer.sparse_queryset(guardians, request)
             serializer = GuardianSerializer(guardians, many=True, context={'request': request})
             
             return Response({
@@ -378,11 +382,13 @@ class GuardianPublicListView(APIView):
         if student_name:
             queryset = queryset.filter(student_name__iexact=student_name)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search)
-                | Q(student_name__icontains=search)
-                | Q(relationship__icontains=search)
+            # Word-prefix match on name, student name and relationship via the search index
+            matches = get_backend().search(
+                search, teacher_id=int(teacher_id) if teacher_id and teacher_id.isdigit() else None,
+                kinds=['guardian'], limit=500,
             )
+            queryset = queryset.filter(id__in=[int(document.object_id) for document in matches])
+        queryset = GuardianSerializer.sparse_queryset(queryset, request)
         if limit:
             try:
                 limit_value = max(1, min(int(limit), 500))
@@ -394,6 +400,51 @@ class GuardianPublicListView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class GuardianVerifyView(APIView):
+    """
+    Pickup check at the gate: is this person an allowed guardian (allow), a
+    flagged unauthorized person (deny), or neither (unknown)?
+    Query params: name and/or contact, optional student (LRN or name).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            teacher_profile = TeacherProfile.objects.filter(user=request.user).only('id').first()
+            if not teacher_profile:
+                return Response(
+                    {"error": "Teacher profile not found."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            name = request.query_params.get('name', '')
+            contact = request.query_params.get('contact', '')
+            if not name.strip() and not contact.strip():
+                return Response(
+                    {"error": "name or contact is required"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            start = time.perf_counter()
+            result, matches = verify(
+                teacher_profile.id, name=name, contact=contact,
+                student=request.query_params.get('student', '').strip() or None,
+            )
+            took_us = (time.perf_counter() - start) * 1e6
+
+            return Response({
+                "result": result,
+                "matches": [dict(entry, matched_on=matched_on) for entry, matched_on in matches],
+                "took_us": round(took_us, 1),
+            }, status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response(
+                {"error": f"Error verifying guardian: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class ParentGuardianListView(APIView):
     """
     Endpoint for parents to view and manage guardian requests for their child.
@@ -422,18 +473,19 @@ class ParentGuardianListView(APIView):
                     status=status.HTTP_404_NOT_FOUND
                 )
             
-            # Get guardians for this parent's student
-            # Match by the student FK when set, or by student_name (case-insensitive)
+            # Get guardians for this parent's student (Guardian.save links the
+            # student FK, so this is a guardian_student_status_idx range scan)
             student = parent_guardian.student
             guardians = Guardian.objects.filter(
-                (Q(student=student) | Q(student_name__iexact=student.name)),
+                student=student,
                 status='pending'  # Only show pending guardians
-            ).order_by('-timestamp')
+            ).select_related('teacher__user', 'parent_guardian', 'student').order_by('-timestamp')
+            guardians = GuardianSerializer.sparse_queryset(guardians, request)
             
             serializer = GuardianSerializer(guardians, many=True, context={'request': request})
             
             return Response({
-                "count": guardians.count(),
+                "count": len(serializer.data),
                 "student_id": student.lrn,
                 "student_name": student.name,
                 "results": serializer.data
@@ -477,12 +529,7 @@ class ParentGuardianListView(APIView):
                 )
             
             # Get the guardian - verify it belongs to this parent's student
-            # Try to find the guardian by id and verify it belongs to this parent's student.
-            # Support records where the guardian.student FK is null by falling back to student_name.
-            guardian_qs = Guardian.objects.filter(id=pk).filter(
-                Q(student=parent_guardian.student) | Q(student_name__iexact=parent_guardian.student.name)
-            )
-            guardian = guardian_qs.first()
+            guardian = Guardian.objects.filter(id=pk, student_id=parent_guardian.student_id).first()
             if not guardian:
                 return Response(
                     {"error": "Guardian not found or does not belong to your child"},
@@ -556,10 +603,7 @@ class ParentGuardianListView(APIView):
                 )
             
             # Get the guardian - verify it belongs to this parent's student
-            guardian_qs = Guardian.objects.filter(id=pk).filter(
-                Q(student=parent_guardian.student) | Q(student_name__iexact=parent_guardian.student.name)
-            )
-            guardian = guardian_qs.first()
+            guardian = Guardian.objects.filter(id=pk, student_id=parent_guardian.student_id).first()
             if not guardian:
                 return Response(
                     {"error": "Guardian not found or does not belong to your child"},
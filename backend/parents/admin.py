@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Student, ParentGuardian, ParentMobileAccount, MobileRegistration, ParentNotification, ParentEvent, ParentSchedule
+from .models import (
+    Student, ParentGuardian, ParentMobileAccount, MobileRegistration, ParentNotification, ParentEvent, ParentSchedule,
+    SectionTimetableEntry,
+)
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -37,7 +40,7 @@ class ParentGuardianAdmin(admin.ModelAdmin):
     list_display = ['username', 'name', 'role', 'student', 'teacher', 'contact_number', 'created_at']
     search_fields = ['username', 'name', 'student__name', 'student__lrn', 'teacher__user__username']
     list_filter = ['role', 'teacher', 'created_at']
-    readonly_fields = ['created_at', 'updated_at', 'qr_code_data']
+    readonly_fields = ['created_at', 'updated_at', 'qr_code_data', 'qr_token']
     
     fieldsets = (
         ('Personal Information', {
@@ -47,7 +50,7 @@ class ParentGuardianAdmin(admin.ModelAdmin):
             'fields': ('student', 'teacher')
         }),
         ('QR Code Data', {
-            'fields': ('qr_code_data',),
+            'fields': ('qr_code_data', 'qr_token', 'qr_version'),
             'classes': ('collapse',)
         }),
         ('System Information', {
@@ -125,13 +128,14 @@ class ParentNotificationAdmin(admin.ModelAdmin):
 
 @admin.register(ParentEvent)
 class ParentEventAdmin(admin.ModelAdmin):
-    list_display = ['id', 'teacher', 'title', 'event_type', 'section', 'scheduled_at', 'created_at']
-    list_filter = ['event_type', 'section', 'teacher', 'scheduled_at', 'created_at']
+    list_display = ['id', 'teacher', 'title', 'event_type', 'section', 'scheduled_at', 'published', 'created_at']
+    list_filter = ['event_type', 'section', 'teacher', 'published', 'scheduled_at', 'created_at']
     search_fields = ['title', 'description', 'teacher__user__username', 'parent__name', 'student__name', 'student__lrn']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['published', 'created_at', 'updated_at']
     raw_id_fields = ['parent', 'student']
     fieldsets = (
         ('Event Details', {'fields': ('title', 'description', 'event_type', 'scheduled_at', 'location')}),
+        ('Publishing', {'fields': ('publish_at', 'published')}),
         ('Target', {'fields': ('teacher', 'section', 'parent', 'student')}),
         ('Extra', {'fields': ('extra_data',)}),
         ('System', {'fields': ('created_at', 'updated_at'), 'classes': ('collapse',)}),
@@ -156,10 +160,10 @@ class ParentScheduleAdmin(admin.ModelAdmin):
     search_fields = ['student__name', 'student__lrn', 'subject', 'room']
     readonly_fields = ['created_at', 'updated_at']
     # REMOVED autocomplete_fields - using raw_id_fields instead
-    raw_id_fields = ['parent', 'student', 'teacher']
+    raw_id_fields = ['parent', 'student', 'teacher', 'template']
 
     fieldsets = (
-        ('Associations', {'fields': ('student', 'parent', 'teacher')}),
+        ('Associations', {'fields': ('student', 'parent', 'teacher', 'template')}),
         (
             'Schedule Details',
             {
@@ -179,6 +183,10 @@ class ParentScheduleAdmin(admin.ModelAdmin):
     )
 
 
-
-
-
+@admin.register(SectionTimetableEntry)
+class SectionTimetableEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'section', 'subject', 'day_of_week', 'time_label', 'room', 'teacher']
+    list_filter = ['day_of_week', 'section', 'teacher']
+    search_fields = ['section__name', 'subject', 'room']
+    readonly_fields = ['created_at', 'updated_at']
+    raw_id_fields = ['section', 'teacher']
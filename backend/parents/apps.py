@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class ParentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'parents'
+
+    def ready(self):
+        from backend.thumbnails import track_thumbnails
+
+        from . import qr  # noqa: F401  (connects the QR identity cache invalidation)
+        from . import sync  # noqa: F401  (records tombstones for deleted rows)
+        from . import inbox  # noqa: F401  (fans events out to parent inboxes)
+        from . import timetable  # noqa: F401  (drops cached timetables on writes)
+        from . import ics  # noqa: F401  (drops cached calendar feeds on event writes)
+        from .models import ParentGuardian
+
+        track_thumbnails(ParentGuardian)  # builds photo thumbnails on upload, drops replaced ones
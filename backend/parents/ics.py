@@ -0,0 +1,182 @@
+"""
+iCalendar (RFC 5545) feeds per student, for phone calendar subscriptions.
+
+A feed holds the student's resolved timetable (parents/timetable.py) as
+weekly recurring events and the published announcements that reach the
+student (broadcast, their section, or them). Feed URLs carry a key derived
+from SECRET_KEY, the LRN and the student's calendar_key_version, since
+calendar apps cannot send auth headers; bumping the version (POST to the
+link view) revokes every URL handed out before.
+
+Rendered text and its ETag are cached under a key built from the timetable
+version and a per-teacher event version, so any schedule, timetable or
+announcement write yields a new feed on the next poll and unchanged feeds
+are answered with 304. Event writes bump the version again on commit, so a
+feed another worker renders from not-yet-committed data is not kept.
+"""
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.dateparse import parse_datetime
+
+from backend import cache as tiered
+
+from . import timetable
+from .models import ParentEvent, Student
+
+KEY_SALT = 'parents.ics.feed'
+FEED_TIMEOUT = 60 * 60
+PRODID = '-//childtrack//Student calendar//EN'
+UID_DOMAIN = 'childtrack'
+
+_BYDAY = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def feed_key(student):
+    value = f'{student.lrn}:{student.calendar_key_version}'
+    return salted_hmac(KEY_SALT, value, algorithm='sha256').hexdigest()[:24]
+
+
+def check_feed_key(student, key):
+    return constant_time_compare(feed_key(student), key or '')
+
+
+def rotate_feed_key(student):
+    """Revoke the student's feed URLs; `student` comes back with the new version."""
+    Student.objects.filter(pk=student.pk).update(calendar_key_version=F('calendar_key_version') + 1)
+    student.refresh_from_db(fields=['calendar_key_version'])
+    return feed_key(student)
+
+
+def _events_version(teacher_id):
+    return tiered.version(f'ics:events_version:{teacher_id}')
+
+
+def invalidate_events(teacher_id):
+    tiered.bump(f'ics:events_version:{teacher_id}')
+
+
+def student_events(student):
+    """Published announcements every parent of `student` sees."""
+    return ParentEvent.objects.filter(
+        Q(teacher_id=student.teacher_id, published=True, parent__isnull=True, scheduled_at__isnull=False)
+        & (Q(student_id__isnull=True) | Q(student_id=student.lrn))
+        & (Q(section_ref_id__isnull=True) | Q(section_ref_id=student.section_ref_id))
+    ).order_by('scheduled_at', 'pk')
+
+
+def _escape(text):
+    return (
+        str(text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Split a content line into 75-octet pieces joined by CRLF + space."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # don't split a UTF-8 sequence
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _first_date(weekday, anchor):
+    # First date on/after `anchor` falling on `weekday` (Monday = 0)
+    return anchor + timedelta(days=(weekday - anchor.weekday()) % 7)
+
+
+def _timetable_event(row, student):
+    weekday = row['weekday']
+    # Recur from the week the period was added
+    day = _first_date(weekday, timezone.localtime(parse_datetime(row['created_at'])).date()).strftime('%Y%m%d')
+    uid = f"schedule-{row['id']}" if row['id'] else f"timetable-{row['template']}-{student.lrn}"
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}@{UID_DOMAIN}',
+        f"DTSTAMP:{_utc(parse_datetime(row['updated_at']))}",
+        # Floating local time: the class is at 8:00 wherever the phone is
+        f"DTSTART:{day}T{row['start_time'].replace(':', '')[:6]}",
+    ]
+    if row['end_time']:
+        lines.append(f"DTEND:{day}T{row['end_time'].replace(':', '')[:6]}")
+    lines += [f'RRULE:FREQ=WEEKLY;BYDAY={_BYDAY[weekday]}', f"SUMMARY:{_escape(row['subject'])}"]
+    if row['room']:
+        lines.append(f"LOCATION:{_escape(row['room'])}")
+    if row['description']:
+        lines.append(f"DESCRIPTION:{_escape(row['description'])}")
+    lines.append('END:VEVENT')
+    return lines
+
+
+def _announcement_event(event):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event.pk}@{UID_DOMAIN}',
+        f'DTSTAMP:{_utc(event.updated_at)}',
+        f'DTSTART:{_utc(event.scheduled_at)}',
+        f'SUMMARY:{_escape(event.title)}',
+    ]
+    if event.location:
+        lines.append(f'LOCATION:{_escape(event.location)}')
+    if event.description:
+        lines.append(f'DESCRIPTION:{_escape(event.description)}')
+    if event.event_type:
+        lines.append(f'CATEGORIES:{_escape(event.event_type)}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def render_feed(student):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(student.name)}',
+    ]
+    for row in timetable.student_timetable(student):
+        # Periods without a day or a start time cannot be placed on a calendar
+        if row['weekday'] is not None and row['start_time']:
+            lines += _timetable_event(row, student)
+    for event in student_events(student):
+        lines += _announcement_event(event)
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+def student_feed(student):
+    """(ics text, ETag) for `student`, cached until their timetable or announcements change."""
+    key = f'ics:{timetable.cache_version(student)}:{_events_version(student.teacher_id)}:{student.lrn}'
+    cached = cache.get(key)
+    if cached is None:
+        body = render_feed(student)
+        cached = (body, '"ics-%s"' % hashlib.sha256(body.encode('utf-8')).hexdigest()[:32])
+        cache.set(key, cached, FEED_TIMEOUT)
+    return cached
+
+
+@receiver(post_save, sender=ParentEvent, dispatch_uid='ics_event_saved')
+@receiver(post_delete, sender=ParentEvent, dispatch_uid='ics_event_deleted')
+def _event_changed(sender, instance, **kwargs):
+    if instance.teacher_id:
+        invalidate_events(instance.teacher_id)
+        transaction.on_commit(lambda: invalidate_events(instance.teacher_id))
@@ -0,0 +1,146 @@
+"""
+Per-parent event inbox (fan-out on write).
+
+An event reaches a parent when it belongs to the parent's teacher and each
+of its targets that is set matches: `parent` is this parent, `student` is
+this parent's student, `section_ref` is that student's section, and it has
+been published (parents/publishing.py). Instead of
+evaluating that OR-heavy filter on every read, the matching parents get a
+ParentEventInbox row when the event is saved, and a parent's rows are
+recomputed when the parent or their student changes.
+
+`events_for_parent` is the filter itself (used by rebuild/check);
+`audience` is its inverse, the parents an event should reach.
+
+Removing an inbox row (the event was retargeted, or the parent moved) writes
+an 'events' SyncTombstone for that parent, so the delta sync tells the app to
+drop an event it can no longer see; adding one back clears it. A rebuild
+that adds rows writes a RESET tombstone for the parent instead: those events
+were not touched, so their updated_at may be behind the parent's cursor.
+"""
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import ParentEvent, ParentEventInbox, ParentGuardian, Student, SyncTombstone
+from .sync import RESET
+
+BATCH_SIZE = 500
+
+
+def events_for_parent(parent):
+    """The events `parent` should see, evaluated from the event targets."""
+    section_id = Student.objects.filter(pk=parent.student_id).values_list('section_ref_id', flat=True).first()
+    return ParentEvent.objects.filter(
+        Q(teacher_id=parent.teacher_id, published=True)
+        & (Q(parent_id__isnull=True) | Q(parent_id=parent.pk))
+        & (Q(student_id__isnull=True) | Q(student_id=parent.student_id))
+        & (Q(section_ref_id__isnull=True) | Q(section_ref_id=section_id))
+    )
+
+
+def audience(event):
+    """The parents `event` should reach (none until it is published)."""
+    if event.teacher_id is None or not event.published:
+        return ParentGuardian.objects.none()
+    parents = ParentGuardian.objects.filter(teacher_id=event.teacher_id)
+    if event.parent_id:
+        parents = parents.filter(pk=event.parent_id)
+    if event.student_id:
+        parents = parents.filter(student_id=event.student_id)
+    if event.section_ref_id:
+        parents = parents.filter(student__section_ref_id=event.section_ref_id)
+    return parents
+
+
+def _removed(pairs):
+    """Tombstone (parent id, event id) inbox rows that were just deleted."""
+    SyncTombstone.objects.bulk_create(
+        [SyncTombstone(collection='events', object_id=str(event_id), parent_id=parent_id) for parent_id, event_id in pairs],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def _added(parent_ids, event_ids):
+    # The parent sees these events again: drop their removal tombstones
+    if parent_ids and event_ids:
+        SyncTombstone.objects.filter(
+            collection='events', parent_id__in=parent_ids, object_id__in=[str(pk) for pk in event_ids]
+        ).delete()
+
+
+def fan_out(event):
+    """Make the event's inbox rows match its current audience and scheduled_at."""
+    targets = set(audience(event).values_list('pk', flat=True))
+    entries = ParentEventInbox.objects.filter(event=event)
+    current = set(entries.values_list('parent_id', flat=True))
+
+    entries.exclude(parent_id__in=targets).delete()
+    _removed((parent_id, event.pk) for parent_id in current - targets)
+    _added(targets - current, [event.pk])
+    entries.filter(parent_id__in=targets & current).exclude(scheduled_at=event.scheduled_at).update(
+        scheduled_at=event.scheduled_at
+    )
+    ParentEventInbox.objects.bulk_create(
+        [ParentEventInbox(parent_id=pk, event=event, scheduled_at=event.scheduled_at) for pk in targets - current],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def expected_entries(parent):
+    return dict(events_for_parent(parent).values_list('pk', 'scheduled_at'))
+
+
+def actual_entries(parent):
+    return dict(ParentEventInbox.objects.filter(parent=parent).values_list('event_id', 'scheduled_at'))
+
+
+def inbox_differences(parent):
+    """
+    (expected, missing, extra, stale) for one parent: expected is
+    {event id: scheduled_at}; the others are sets of event ids absent from,
+    wrongly present in, or with an outdated scheduled_at in the inbox.
+    """
+    expected, actual = expected_entries(parent), actual_entries(parent)
+    stale = {pk for pk in expected.keys() & actual.keys() if expected[pk] != actual[pk]}
+    return expected, expected.keys() - actual.keys(), actual.keys() - expected.keys(), stale
+
+
+def rebuild_parent(parent):
+    """Bring one parent's inbox in line with events_for_parent; returns the number of rows changed."""
+    expected, missing, extra, stale = inbox_differences(parent)
+    entries = ParentEventInbox.objects.filter(parent=parent)
+    if extra or stale:
+        entries.filter(event_id__in=extra | stale).delete()
+    _removed((parent.pk, event_id) for event_id in extra)
+    _added([parent.pk], missing)
+    if missing:
+        # Older events now reach the parent: the next sync downloads them all again
+        SyncTombstone.objects.create(collection='events', object_id=RESET, parent_id=parent.pk)
+    ParentEventInbox.objects.bulk_create(
+        [ParentEventInbox(parent=parent, event_id=pk, scheduled_at=expected[pk]) for pk in missing | stale],
+        batch_size=BATCH_SIZE,
+    )
+    return len(missing) + len(extra) + len(stale)
+
+
+@receiver(post_save, sender=ParentEvent, dispatch_uid='inbox_event_saved')
+def _event_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fan_out(instance)
+
+
+@receiver(post_save, sender=ParentGuardian, dispatch_uid='inbox_parent_saved')
+def _parent_saved(sender, instance, raw=False, **kwargs):
+    # The parent may have been created or moved to another student/teacher
+    if not raw:
+        rebuild_parent(instance)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='inbox_student_saved')
+def _student_saved(sender, instance, created, raw=False, **kwargs):
+    # A section change moves the student's parents in or out of section events
+    if not raw and not created:
+        for parent in ParentGuardian.objects.filter(student=instance).only('pk', 'teacher_id', 'student_id'):
+            rebuild_parent(parent)
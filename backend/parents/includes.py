@@ -0,0 +1,129 @@
+"""
+?include= expansion for the parent and student detail endpoints.
+
+The mobile app used to load a parent, then the student, then guardians,
+then schedules, one round trip after another. The detail endpoints now
+accept e.g. `?include=student,guardians,schedules` and embed those
+collections under "included". Each include is one select_related join or
+one prefetch query, so the query count depends only on which includes
+were asked for, not on how many rows they hold.
+"""
+from django.db.models import Prefetch
+
+from guardian.models import Guardian
+from guardian.serializers import GuardianSerializer
+from teacher.models import Attendance
+from teacher.serializers import AttendanceSerializer
+
+from .models import ParentGuardian, ParentNotification
+from .serializers import (
+    ParentGuardianSerializer,
+    ParentNotificationSerializer,
+    StudentSerializer,
+)
+from .timetable import student_timetable
+
+RECENT_LIMIT = 50  # attendance rows / notifications embedded, newest first
+
+# include name -> (relation, queryset factory, serializer, to_attr for sliced prefetches)
+STUDENT_INCLUDES = {
+    'parents': (
+        'parents_guardians',
+        lambda: ParentGuardian.objects.select_related('student', 'teacher__user', 'mobile_account'),
+        ParentGuardianSerializer,
+        None,
+    ),
+    'guardians': (
+        'guardians',
+        lambda: Guardian.objects.select_related('teacher__user', 'parent_guardian', 'student').order_by('-timestamp'),
+        GuardianSerializer,
+        None,
+    ),
+    'attendance': (
+        'attendances',
+        lambda: Attendance.objects.select_related('teacher__user').order_by('-date', '-timestamp')[:RECENT_LIMIT],
+        AttendanceSerializer,
+        'recent_attendance',
+    ),
+}
+
+PARENT_INCLUDES = {
+    'notifications': (
+        'notifications',
+        lambda: ParentNotification.objects.select_related('parent', 'student').order_by('-created_at')[:RECENT_LIMIT],
+        ParentNotificationSerializer,
+        'recent_notifications',
+    ),
+}
+
+# Resolved from the section timetable and its overrides (cached), not prefetched
+TIMETABLE_INCLUDE = 'schedules'
+
+STUDENT_INCLUDE_NAMES = sorted([TIMETABLE_INCLUDE, *STUDENT_INCLUDES])
+PARENT_INCLUDE_NAMES = sorted(['student', TIMETABLE_INCLUDE, *STUDENT_INCLUDES, *PARENT_INCLUDES])
+
+
+def parse_includes(value, allowed):
+    """List of include names from ?include=a,b; ValueError naming any unknown one."""
+    names = [name.strip() for name in (value or '').split(',') if name.strip()]
+    unknown = sorted(set(names) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown include: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return list(dict.fromkeys(names))
+
+
+def _prefetch(prefix, spec):
+    relation, queryset, _, to_attr = spec
+    return Prefetch(prefix + relation, queryset=queryset(), to_attr=to_attr)
+
+
+def _related(obj, spec):
+    relation, _, _, to_attr = spec
+    return getattr(obj, to_attr) if to_attr else getattr(obj, relation).all()
+
+
+def _serialize(serializer, data, context, many=True):
+    # ?fields= / ?omit= apply to the top-level object, not the embedded ones
+    return serializer(data, many=many, context=context, omit=()).data
+
+
+def student_queryset(queryset, includes):
+    return queryset.prefetch_related(
+        *[_prefetch('', STUDENT_INCLUDES[name]) for name in includes if name in STUDENT_INCLUDES]
+    )
+
+
+def embed_student(student, includes, context):
+    return {
+        name: student_timetable(student) if name == TIMETABLE_INCLUDE
+        else _serialize(STUDENT_INCLUDES[name][2], _related(student, STUDENT_INCLUDES[name]), context)
+        for name in includes
+    }
+
+
+def parent_queryset(queryset, includes):
+    lookups = []
+    for name in includes:
+        if name in STUDENT_INCLUDES:
+            lookups.append(_prefetch('student__', STUDENT_INCLUDES[name]))
+        elif name in PARENT_INCLUDES:
+            lookups.append(_prefetch('', PARENT_INCLUDES[name]))
+    if includes:
+        queryset = queryset.select_related('student__teacher__user')
+    return queryset.prefetch_related(*lookups)
+
+
+def embed_parent(parent, includes, context):
+    included = {}
+    for name in includes:
+        if name == 'student':
+            included[name] = _serialize(StudentSerializer, parent.student, context, many=False)
+        elif name == TIMETABLE_INCLUDE:
+            included[name] = student_timetable(parent.student, parent.id)
+        elif name in STUDENT_INCLUDES:
+            spec = STUDENT_INCLUDES[name]
+            included[name] = _serialize(spec[2], _related(parent.student, spec), context)
+        else:
+            spec = PARENT_INCLUDES[name]
+            included[name] = _serialize(spec[2], _related(parent, spec), context)
+    return included
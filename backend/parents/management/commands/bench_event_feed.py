@@ -0,0 +1,149 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from parents.models import ParentEvent, Student
+from teacher.models import Section, TeacherProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the section-scoped event feed query: the legacy section__iexact / "
+        "student__section__iexact OR filter versus the Section FK join."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--section', help='Section name to query (default: the first Section).')
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=200, help='Rows per feed request (view default: 200).')
+        parser.add_argument(
+            '--seed-events', type=int, default=0,
+            help='Generate this many synthetic events first (rolled back afterwards).',
+        )
+        parser.add_argument('--sections', type=int, default=20, help='Synthetic sections when seeding.')
+        parser.add_argument('--students-per-section', type=int, default=40)
+        parser.add_argument('--explain', action='store_true', help='Print the query plan of both queries.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed_events']:
+                seeded_section = self._seed(options)
+                options['section'] = options['section'] or seeded_section.name
+            self._run(options)
+            if options['seed_events']:
+                transaction.set_rollback(True)
+
+    def _seed(self, options):
+        rng = random.Random(42)
+        user = User.objects.create_user(username=f'bench_teacher_{int(time.time())}', password='x')
+        teacher = TeacherProfile.objects.create(
+            user=user, age=30, gender='F', section='Bench 1', contact='0', address='-'
+        )
+        sections = [Section.for_name(f'Bench {n}') for n in range(1, options['sections'] + 1)]
+
+        students = []
+        for section in sections:
+            for n in range(options['students_per_section']):
+                students.append(Student(
+                    lrn=f'B{section.id:04d}{n:05d}', name=f'Student {n}', teacher=teacher,
+                    # vary case/spacing the way free-text input does
+                    section=rng.choice([section.name, section.name.upper(), f' {section.name.lower()} ']),
+                    section_ref=section,
+                ))
+        Student.objects.bulk_create(students, batch_size=500)
+
+        now = timezone.now()
+        events = []
+        for n in range(options['seed_events']):
+            roll = rng.random()
+            section = rng.choice(sections)
+            event = ParentEvent(
+                teacher=teacher, title=f'Event {n}', event_type='Announcement',
+                scheduled_at=now - timedelta(minutes=n),
+            )
+            if roll < 0.6:
+                event.section, event.section_ref = section.name.upper(), section
+            elif roll < 0.9:
+                event.student = rng.choice(students)
+            events.append(event)
+        ParentEvent.objects.bulk_create(events, batch_size=500)
+        self.stdout.write(
+            f"Seeded {len(sections)} sections, {len(students)} students, {len(events)} events (will be rolled back)"
+        )
+        return sections[0]
+
+    def _time(self, build_queryset, iterations):
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = list(build_queryset())
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        return {
+            'rows': len(rows),
+            'median': statistics.median(samples),
+            'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        }
+
+    def _run(self, options):
+        section_name = options['section']
+        if not section_name:
+            first = Section.objects.order_by('id').first()
+            if not first:
+                self.stderr.write("No sections found; pass --seed-events to generate data.")
+                return
+            section_name = first.name
+        limit = options['limit']
+        base = ParentEvent.objects.select_related('teacher', 'parent', 'student').order_by('-scheduled_at', '-created_at')
+
+        def legacy_filter():
+            return Q(section__isnull=True) | Q(section__iexact=section_name) | Q(student__section__iexact=section_name)
+
+        def normalized_filter():
+            # Same work the view does: resolve the section, then filter on integer keys.
+            section_filter = Q(section_ref__isnull=True)
+            section = Section.lookup(section_name)
+            if section:
+                section_filter |= Q(section_ref_id=section.id) | Q(
+                    student_id__in=Student.objects.filter(section_ref_id=section.id).values('lrn')
+                )
+            return section_filter
+
+        def feed(build_filter):
+            return lambda: base.filter(build_filter())[:limit]
+
+        def ids(build_filter):
+            return lambda: base.filter(build_filter()).values_list('id', flat=True)[:limit]
+
+        def count(build_filter):
+            return lambda: [ParentEvent.objects.filter(build_filter()).count()]
+
+        iterations = options['iterations']
+        list(feed(legacy_filter)()), list(feed(normalized_filter)())  # warm up
+        results = [
+            # Full feed: what the view returns (rows + select_related objects).
+            ('feed, before (iexact OR)', self._time(feed(legacy_filter), iterations)),
+            ('feed, after (Section FK)', self._time(feed(normalized_filter), iterations)),
+            # Matching ids only, so the predicate cost is not hidden by model instantiation.
+            ('ids, before', self._time(ids(legacy_filter), iterations)),
+            ('ids, after', self._time(ids(normalized_filter), iterations)),
+            # Every matching row (no LIMIT), e.g. for counts/fan-out.
+            ('count, before', self._time(count(legacy_filter), iterations)),
+            ('count, after', self._time(count(normalized_filter), iterations)),
+        ]
+
+        self.stdout.write(f"Event feed for section {section_name!r}, {iterations} iterations, limit {limit}")
+        self.stdout.write(f"{'query':<28}{'rows':>6}{'median ms':>12}{'p95 ms':>10}")
+        for label, result in results:
+            self.stdout.write(f"{label:<28}{result['rows']:>6}{result['median']:>12.3f}{result['p95']:>10.3f}")
+
+        if options['explain']:
+            self.stdout.write("\nBefore:\n" + feed(legacy_filter)().explain())
+            self.stdout.write("\nAfter:\n" + feed(normalized_filter)().explain())
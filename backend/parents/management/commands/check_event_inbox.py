@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from parents.inbox import inbox_differences, rebuild_parent
+from parents.models import ParentGuardian
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every parent's event inbox with what the event targets say it should hold and "
+        "report missing, extra and stale rows. Exits non-zero on drift unless --fix is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild the inboxes that differ.')
+        parser.add_argument('--verbose-ids', action='store_true', help='List the event ids for each parent.')
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for parent in ParentGuardian.objects.only('pk', 'teacher_id', 'student_id').order_by('pk').iterator():
+            _, missing, extra, stale = inbox_differences(parent)
+            if not (missing or extra or stale):
+                continue
+            drifted += 1
+            line = f"Parent #{parent.pk}: {len(missing)} missing, {len(extra)} extra, {len(stale)} stale"
+            if options['verbose_ids']:
+                line += f" (missing {sorted(missing)}, extra {sorted(extra)}, stale {sorted(stale)})"
+            self.stdout.write(self.style.WARNING(line))
+            if options['fix']:
+                rebuild_parent(parent)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All parent event inboxes are consistent."))
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {drifted} drifted inbox(es)."))
+        else:
+            raise CommandError(f"{drifted} inbox(es) drifted; run with --fix to rebuild them.")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from backend.storage import file_fields
+from backend.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Build missing thumbnails for every stored ImageField file. New uploads get theirs when "
+        "they are saved; run this once after deploying, or after adding a size to IMAGE_THUMBNAIL_SIZES."
+    )
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        done = set()
+        for model, field in file_fields():
+            if not isinstance(field, models.ImageField):
+                continue
+            rows = model._default_manager.exclude(**{f'{field.attname}__isnull': True}).exclude(**{field.attname: ''})
+            for instance in rows.only('pk', field.attname).iterator(chunk_size=500):
+                field_file = getattr(instance, field.attname)
+                if field_file.name in done:
+                    continue  # content-addressed blobs are shared between rows
+                done.add(field_file.name)
+                try:
+                    generate_thumbnails(field_file)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"  {field_file.name}: {exc}")
+                    continue
+                built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Thumbnails present for {built} image(s); {failed} could not be decoded."
+        ))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from parents.models import SyncTombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete parent-app sync tombstones older than --days. Clients whose cursor predates the "
+        "remaining tombstones get a full download flagged reset instead of a delta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Keep the newest tombstone so the table always shows how far it has been pruned
+        newest = SyncTombstone.objects.aggregate(v=Max('id'))['v']
+        deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).exclude(id=newest).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sync tombstone(s) older than {options['days']} day(s)."))
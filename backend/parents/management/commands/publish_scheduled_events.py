@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from parents.publishing import BATCH_SIZE, next_due_at, publish_due
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish announcements whose publish_at has arrived and notify their parents. Runs once "
+        "(for cron), or with --loop as a long-lived scheduler that sleeps until the next due event."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running instead of exiting after one pass.')
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='With --loop: longest sleep between passes, in seconds (picks up newly scheduled events).',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Events published per transaction.')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        if not options['loop']:
+            published = publish_due(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Published {published} scheduled event(s)."))
+            return
+
+        interval = max(1.0, options['interval'])
+        self.stdout.write(f"Publishing scheduled events (checking at least every {interval:g}s); Ctrl+C to stop.")
+        try:
+            while True:
+                published = publish_due(batch_size=batch_size)
+                if published:
+                    self.stdout.write(self.style.SUCCESS(f"{timezone.now():%Y-%m-%d %H:%M:%S} published {published}"))
+                due = next_due_at()
+                delay = interval if due is None else (due - timezone.now()).total_seconds()
+                time.sleep(min(interval, max(delay, 0.5)))
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from parents.inbox import rebuild_parent
+from parents.models import ParentGuardian
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute parent event inboxes from the event targets (teacher, section, student, parent). "
+        "Only rows that differ are written, so re-running is cheap."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--parent', type=int, action='append', help='ParentGuardian id (repeatable; default: all).')
+
+    def handle(self, *args, **options):
+        parents = ParentGuardian.objects.only('pk', 'teacher_id', 'student_id').order_by('pk')
+        if options['parent']:
+            parents = parents.filter(pk__in=options['parent'])
+            if not parents.exists():
+                raise CommandError("No matching parents.")
+
+        rebuilt = changed = 0
+        for parent in parents.iterator():
+            changed += rebuild_parent(parent)
+            rebuilt += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} inbox(es); {changed} row(s) changed."))
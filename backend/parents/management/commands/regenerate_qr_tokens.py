@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from backend import cache as tiered
+from parents.models import ParentGuardian
+from parents.qr import identity_cache_key, make_token
+from teacher.models import RosterChange
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-sign the compact QR tokens of parents/guardians, e.g. after SECRET_KEY changes. "
+        "With --rotate the QR version is bumped first, so previously printed codes stop working."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rotate', action='store_true', help='Invalidate existing codes.')
+        parser.add_argument('--teacher', type=int, help='Only parents of this teacher profile id.')
+        parser.add_argument('--parent', type=int, nargs='*', help='Only these parent/guardian ids.')
+
+    def handle(self, *args, **options):
+        queryset = ParentGuardian.objects.all()
+        if options['teacher']:
+            queryset = queryset.filter(teacher_id=options['teacher'])
+        if options['parent']:
+            queryset = queryset.filter(pk__in=options['parent'])
+
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+        changed = 0
+        for start in range(0, len(pks), BATCH_SIZE):
+            batch_pks = pks[start:start + BATCH_SIZE]
+            with transaction.atomic():
+                if options['rotate']:
+                    ParentGuardian.objects.filter(pk__in=batch_pks).update(qr_version=F('qr_version') + 1)
+                rows = list(
+                    ParentGuardian.objects.filter(pk__in=batch_pks).only('pk', 'teacher_id', 'qr_version', 'qr_token')
+                )
+                updated = []
+                for row in rows:
+                    token = make_token(row.pk, row.qr_version)
+                    if options['rotate'] or row.qr_token != token:
+                        row.qr_token = token
+                        updated.append(row)
+                ParentGuardian.objects.bulk_update(updated, ['qr_token'])
+                # bulk_update skips signals: refresh the scanner roster and the identity cache by hand
+                RosterChange.objects.bulk_create([
+                    RosterChange(teacher_id=row.teacher_id, kind='parent', object_id=str(row.pk)) for row in updated
+                ])
+            tiered.delete(*[identity_cache_key(pk) for pk in batch_pks])
+            changed += len(updated)
+
+        action = 'Rotated' if options['rotate'] else 'Re-signed'
+        self.stdout.write(self.style.SUCCESS(f"{action} {changed} of {len(pks)} QR token(s)."))
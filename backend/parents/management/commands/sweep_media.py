@@ -0,0 +1,46 @@
+import os
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from backend.storage import sweep_orphans
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete uploaded files (and their thumbnails) that no FileField references any more. "
+        "Shared content-addressed blobs are kept as long as at least one row points at them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report orphans without deleting them.')
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Keep files younger than this, so in-flight uploads are not swept (default: 24).',
+        )
+        parser.add_argument('--verbose-list', action='store_true', help='Print every orphaned file name.')
+
+    def handle(self, *args, **options):
+        location = getattr(default_storage, 'location', None)
+        if location and not os.path.isdir(location):
+            self.stdout.write(f"Media root {location} does not exist; nothing to sweep.")
+            return
+
+        stats = sweep_orphans(
+            default_storage,
+            grace_seconds=int(options['grace_hours'] * 3600),
+            dry_run=options['dry_run'],
+        )
+        if options['verbose_list']:
+            for name in stats['deleted']:
+                self.stdout.write(f"  orphan: {name}")
+
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(
+            f"Scanned {stats['scanned']} file(s); {stats['referenced']} referenced blob(s), "
+            f"{stats['shared_blobs']} shared by more than one row "
+            f"({stats['shared_references']} duplicate upload(s) avoided)."
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {stats['orphans']} orphaned file(s), {stats['bytes_reclaimed'] / 1024:.1f} KiB."
+        ))
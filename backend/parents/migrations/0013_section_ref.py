@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def _normalize(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def _link_sections(Section, model, sections):
+    """Point `model.section_ref` at the normalized Section, BATCH_SIZE rows at a time."""
+    pks = list(
+        model.objects.exclude(section__isnull=True).exclude(section='')
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    for start in range(0, len(pks), BATCH_SIZE):
+        rows = list(model.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).only('pk', 'section'))
+        for row in rows:
+            key = _normalize(row.section)
+            if not key:
+                continue
+            if key not in sections:
+                sections[key], _ = Section.objects.get_or_create(
+                    normalized_name=key, defaults={'name': ' '.join(row.section.split())[:50]}
+                )
+            row.section_ref = sections[key]
+        model.objects.bulk_update(rows, ['section_ref'])
+
+
+def link_sections(apps, schema_editor):
+    Section = apps.get_model('teacher', 'Section')
+    sections = {section.normalized_name: section for section in Section.objects.all()}
+    _link_sections(Section, apps.get_model('parents', 'Student'), sections)
+    _link_sections(Section, apps.get_model('parents', 'ParentEvent'), sections)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0012_remove_parentnotification_read'),
+        ('teacher', '0004_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parentevent',
+            name='section_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='teacher.section'),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='section_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='students', to='teacher.section'),
+        ),
+        migrations.RunPython(link_sections, migrations.RunPython.noop),
+    ]
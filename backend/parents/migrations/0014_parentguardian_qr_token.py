@@ -0,0 +1,38 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:42
+
+from django.db import migrations, models
+
+from parents.qr import make_token
+
+BATCH_SIZE = 500
+
+
+def sign_tokens(apps, schema_editor):
+    ParentGuardian = apps.get_model('parents', 'ParentGuardian')
+    pks = list(ParentGuardian.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(pks), BATCH_SIZE):
+        rows = list(ParentGuardian.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).only('pk', 'qr_version'))
+        for row in rows:
+            row.qr_token = make_token(row.pk, row.qr_version)
+        ParentGuardian.objects.bulk_update(rows, ['qr_token'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0013_section_ref'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parentguardian',
+            name='qr_token',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='parentguardian',
+            name='qr_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(sign_tokens, migrations.RunPython.noop),
+    ]
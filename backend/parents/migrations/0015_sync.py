@@ -0,0 +1,58 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:46
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Notifications are never edited, so created_at is their last write
+    ParentNotification = apps.get_model('parents', 'ParentNotification')
+    ParentNotification.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0014_parentguardian_qr_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(max_length=20)),
+                ('object_id', models.CharField(max_length=64)),
+                ('teacher_id', models.BigIntegerField(blank=True, null=True)),
+                ('student_id', models.CharField(blank=True, max_length=20, null=True)),
+                ('parent_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['collection', 'id'], name='tombstone_collection_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='parentnotification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='parentevent',
+            index=models.Index(fields=['teacher', 'updated_at'], name='event_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parentguardian',
+            index=models.Index(fields=['student', 'updated_at'], name='parentguardian_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parentnotification',
+            index=models.Index(fields=['parent', 'updated_at'], name='notification_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parentschedule',
+            index=models.Index(fields=['student', 'updated_at'], name='schedule_sync_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-19 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q
+
+BATCH_SIZE = 500
+
+
+def populate_inbox(apps, schema_editor):
+    # Same targeting rule as parents.inbox.events_for_parent, on historical models
+    ParentGuardian = apps.get_model('parents', 'ParentGuardian')
+    ParentEvent = apps.get_model('parents', 'ParentEvent')
+    ParentEventInbox = apps.get_model('parents', 'ParentEventInbox')
+
+    pending = []
+    parents = ParentGuardian.objects.values_list('pk', 'teacher_id', 'student_id', 'student__section_ref_id')
+    for parent_id, teacher_id, student_id, section_id in parents.iterator():
+        events = ParentEvent.objects.filter(
+            Q(teacher_id=teacher_id)
+            & (Q(parent_id__isnull=True) | Q(parent_id=parent_id))
+            & (Q(student_id__isnull=True) | Q(student_id=student_id))
+            & (Q(section_ref_id__isnull=True) | Q(section_ref_id=section_id))
+        ).values_list('pk', 'scheduled_at')
+        for event_id, scheduled_at in events:
+            pending.append(ParentEventInbox(parent_id=parent_id, event_id=event_id, scheduled_at=scheduled_at))
+        if len(pending) >= BATCH_SIZE:
+            ParentEventInbox.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+            pending = []
+    ParentEventInbox.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0015_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParentEventInbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheduled_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='parents.parentevent')),
+                ('parent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_inbox', to='parents.parentguardian')),
+            ],
+            options={
+                'ordering': ['parent', '-scheduled_at', '-event'],
+                'indexes': [models.Index(fields=['parent', '-scheduled_at', '-event'], name='inbox_parent_scheduled_idx')],
+                'constraints': [models.UniqueConstraint(fields=('parent', 'event'), name='inbox_parent_event_unique')],
+            },
+        ),
+        migrations.RunPython(populate_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0016_parenteventinbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parentevent',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='parentevent',
+            name='published',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='parentevent',
+            index=models.Index(fields=['teacher', 'published', '-scheduled_at'], name='event_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parentevent',
+            index=models.Index(condition=models.Q(('published', False)), fields=['publish_at'], name='event_due_idx'),
+        ),
+    ]
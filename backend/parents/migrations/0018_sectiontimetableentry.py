@@ -0,0 +1,110 @@
+# Generated by Django 5.1.6 on 2026-10-19 15:40
+
+import json
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+SLOT_FIELDS = (
+    'teacher_id', 'subject', 'description', 'day_of_week', 'start_time', 'end_time', 'time_label', 'room', 'icon',
+    'extra_data',
+)
+
+
+def collapse_section_timetables(apps, schema_editor):
+    """
+    A period that every scheduled student of a section has as an identical
+    row becomes one SectionTimetableEntry, and those rows are deleted (with
+    sync tombstones so the mobile app drops its copies). Anything that
+    differs between students stays a per-student row, and so does every row
+    targeted at one parent (parent_id set).
+    """
+    ParentSchedule = apps.get_model('parents', 'ParentSchedule')
+    SectionTimetableEntry = apps.get_model('parents', 'SectionTimetableEntry')
+    SyncTombstone = apps.get_model('parents', 'SyncTombstone')
+
+    scheduled = defaultdict(set)  # section id -> lrns with any section-wide schedule row
+    slots = defaultdict(lambda: defaultdict(list))  # (section id, slot) -> lrn -> row ids
+    rows = ParentSchedule.objects.filter(student__section_ref__isnull=False, parent__isnull=True).values_list(
+        'id', 'student_id', 'student__section_ref_id', *SLOT_FIELDS
+    )
+    for pk, lrn, section_id, *slot in rows.iterator():
+        slot[-1] = json.dumps(slot[-1], sort_keys=True)  # JSON -> hashable
+        scheduled[section_id].add(lrn)
+        slots[(section_id, tuple(slot))][lrn].append(pk)
+
+    for (section_id, slot), by_student in slots.items():
+        if len(by_student) < 2 or by_student.keys() != scheduled[section_id]:
+            continue
+        values = dict(zip(SLOT_FIELDS, slot))
+        values['extra_data'] = json.loads(values['extra_data'])
+        SectionTimetableEntry.objects.create(section_id=section_id, **values)
+
+        doomed = [(pk, lrn) for lrn, pks in by_student.items() for pk in pks]
+        for start in range(0, len(doomed), BATCH_SIZE):
+            batch = doomed[start:start + BATCH_SIZE]
+            SyncTombstone.objects.bulk_create([
+                SyncTombstone(collection='schedules', object_id=str(pk), student_id=lrn) for pk, lrn in batch
+            ])
+            ParentSchedule.objects.filter(pk__in=[pk for pk, _ in batch]).delete()
+
+
+def expand_section_timetables(apps, schema_editor):
+    # Back to one row per student, keeping each student's override where there is one
+    ParentSchedule = apps.get_model('parents', 'ParentSchedule')
+    SectionTimetableEntry = apps.get_model('parents', 'SectionTimetableEntry')
+    Student = apps.get_model('parents', 'Student')
+
+    for entry in SectionTimetableEntry.objects.iterator():
+        overridden = set(ParentSchedule.objects.filter(template=entry).values_list('student_id', flat=True))
+        students = Student.objects.filter(section_ref_id=entry.section_id).exclude(lrn__in=overridden)
+        ParentSchedule.objects.bulk_create(
+            [
+                ParentSchedule(student_id=lrn, **{name: getattr(entry, name) for name in SLOT_FIELDS})
+                for lrn in students.values_list('lrn', flat=True)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    ParentSchedule.objects.filter(template__isnull=False).update(template=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0017_parentevent_publishing'),
+        ('teacher', '0008_attendance_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionTimetableEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=150)),
+                ('description', models.TextField(blank=True)),
+                ('day_of_week', models.CharField(blank=True, choices=[('monday', 'Monday'), ('tuesday', 'Tuesday'), ('wednesday', 'Wednesday'), ('thursday', 'Thursday'), ('friday', 'Friday'), ('saturday', 'Saturday'), ('sunday', 'Sunday')], max_length=9)),
+                ('start_time', models.TimeField(blank=True, null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('time_label', models.CharField(blank=True, max_length=120)),
+                ('room', models.CharField(blank=True, max_length=50)),
+                ('icon', models.CharField(blank=True, default='book-outline', max_length=64)),
+                ('extra_data', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timetable_entries', to='teacher.section')),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='timetable_entries', to='teacher.teacherprofile')),
+            ],
+            options={
+                'ordering': ['section', 'day_of_week', 'start_time', 'subject'],
+                'indexes': [models.Index(fields=['section', 'updated_at'], name='timetable_section_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='parentschedule',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='overrides', to='parents.sectiontimetableentry'),
+        ),
+        migrations.RunPython(collapse_section_timetables, expand_section_timetables),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.6 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def _week_position(day_of_week, start_time):
+    # Same as parents.models.week_position
+    day = (day_of_week or '').strip().lower()
+    if day not in WEEKDAYS:
+        return None, None
+    weekday = WEEKDAYS.index(day)
+    minutes = start_time.hour * 60 + start_time.minute if start_time else 0
+    return weekday, weekday * 24 * 60 + minutes
+
+
+def backfill_week_positions(apps, schema_editor):
+    for model_name in ('ParentSchedule', 'SectionTimetableEntry'):
+        model = apps.get_model('parents', model_name)
+        last_pk = 0
+        while True:
+            batch = list(model.objects.filter(pk__gt=last_pk).order_by('pk').only(
+                'pk', 'day_of_week', 'start_time'
+            )[:BATCH_SIZE])
+            if not batch:
+                break
+            for row in batch:
+                row.weekday, row.minute_of_week = _week_position(row.day_of_week, row.start_time)
+            model.objects.bulk_update(batch, ['weekday', 'minute_of_week'])
+            last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0018_sectiontimetableentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parentschedule',
+            name='minute_of_week',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='parentschedule',
+            name='weekday',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='sectiontimetableentry',
+            name='minute_of_week',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='sectiontimetableentry',
+            name='weekday',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_week_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='parentschedule',
+            index=models.Index(fields=['student', 'minute_of_week'], name='schedule_week_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parentschedule',
+            index=models.Index(fields=['teacher', 'minute_of_week'], name='schedule_teacher_week_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sectiontimetableentry',
+            index=models.Index(fields=['section', 'minute_of_week'], name='timetable_week_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0019_schedule_minute_of_week'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='synctombstone',
+            name='section_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0020_synctombstone_section_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='calendar_key_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
-from teacher.models import TeacherProfile
+from django.utils import timezone
+from teacher.models import TeacherProfile, Section
 
 class Student(models.Model):
     GENDER_CHOICES = [
@@ -13,11 +15,16 @@ class Student(models.Model):
     gender = models.CharField(max_length=1, choices=GENDER_CHOICES, blank=True, null=True)
     grade_level = models.CharField(max_length=20, blank=True, null=True)
     section = models.CharField(max_length=50, blank=True, null=True)
+    section_ref = models.ForeignKey(
+        Section, on_delete=models.SET_NULL, null=True, blank=True, related_name='students'
+    )
     teacher = models.ForeignKey(
         TeacherProfile, 
         on_delete=models.CASCADE,
         related_name='students'
     )
+    # Part of the calendar feed key (parents/ics.py); bump to revoke a shared feed URL
+    calendar_key_version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -33,6 +40,11 @@ class Student(models.Model):
         verbose_name = "Student"
         verbose_name_plural = "Students"
 
+    def save(self, *args, **kwargs):
+        # Keep the normalized section FK in sync with the free-text field
+        self.section_ref = Section.for_name(self.section)
+        super().save(*args, **kwargs)
+
 
 class ParentGuardian(models.Model):
     ROLE_CHOICES = [
@@ -61,6 +73,9 @@ class ParentGuardian(models.Model):
     email = models.EmailField(blank=True, null=True)
     address = models.TextField(blank=True, null=True)
     qr_code_data = models.TextField()
+    # Compact signed code (parents/qr.py); bump qr_version to revoke a printed code
+    qr_token = models.CharField(max_length=40, blank=True)
+    qr_version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -77,6 +92,10 @@ class ParentGuardian(models.Model):
         ordering = ['teacher', 'student', 'role']
         verbose_name = "Parent/Guardian"
         verbose_name_plural = "Parents/Guardians"
+        indexes = [
+            # Parent app delta sync (parents/sync.py)
+            models.Index(fields=['student', 'updated_at'], name='parentguardian_sync_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         """
@@ -118,6 +137,13 @@ class ParentGuardian(models.Model):
 
         super().save(*args, **kwargs)
 
+        # The token embeds the pk, so it can only be signed once the row exists
+        from .qr import make_token
+        token = make_token(self.pk, self.qr_version)
+        if self.qr_token != token:
+            self.qr_token = token
+            ParentGuardian.objects.filter(pk=self.pk).update(qr_token=token)
+
 
 class ParentMobileAccount(models.Model):
     """Mobile app account for parents/guardians"""
@@ -182,9 +208,13 @@ class ParentNotification(models.Model):
     message = models.TextField()
     extra_data = models.JSONField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['parent', 'updated_at'], name='notification_sync_idx'),
+        ]
 
     def __str__(self):
         try:
@@ -208,6 +238,9 @@ class ParentEvent(models.Model):
     parent = models.ForeignKey(ParentGuardian, on_delete=models.CASCADE, null=True, blank=True, related_name='events')
     student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True, blank=True, related_name='events')
     section = models.CharField(max_length=50, blank=True, null=True)
+    section_ref = models.ForeignKey(
+        Section, on_delete=models.SET_NULL, null=True, blank=True, related_name='events'
+    )
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     event_type = models.CharField(max_length=50)
@@ -217,25 +250,133 @@ class ParentEvent(models.Model):
     scheduled_at = models.DateTimeField(null=True, blank=True)
     location = models.CharField(max_length=200, blank=True)
     extra_data = models.TextField(blank=True, null=True)
+    # When parents get to see (and are notified of) the announcement. Empty
+    # or past means on creation; future ones wait for publish_scheduled_events.
+    publish_at = models.DateTimeField(null=True, blank=True)
+    published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-scheduled_at', '-created_at']
+        indexes = [
+            models.Index(fields=['teacher', 'updated_at'], name='event_sync_idx'),
+            models.Index(fields=['teacher', 'published', '-scheduled_at'], name='event_published_idx'),
+            # "Next due" lookup of the publisher; only unpublished rows are indexed
+            models.Index(fields=['publish_at'], condition=Q(published=False), name='event_due_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.scheduled_at}"
 
+    def save(self, *args, **kwargs):
+        # Keep the normalized section FK in sync with the free-text field
+        self.section_ref = Section.for_name(self.section)
+        if self._state.adding:
+            self.published = self.publish_at is None or self.publish_at <= timezone.now()
+        elif not self.published and self.publish_at is None:
+            # Schedule cleared: publish on the next run instead of never
+            self.publish_at = timezone.now()
+        super().save(*args, **kwargs)
+
+class ParentEventInbox(models.Model):
+    """
+    One row per (parent, event) the parent should see, written when events,
+    parents or students change (parents/inbox.py), so a parent's event list
+    is a range scan on (parent, -scheduled_at) instead of OR-filters over
+    three joins.
+    """
+    parent = models.ForeignKey(ParentGuardian, on_delete=models.CASCADE, related_name='event_inbox')
+    event = models.ForeignKey(ParentEvent, on_delete=models.CASCADE, related_name='inbox_entries')
+    # Copied from the event so the list is ordered straight off the index
+    scheduled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['parent', '-scheduled_at', '-event']
+        constraints = [
+            models.UniqueConstraint(fields=['parent', 'event'], name='inbox_parent_event_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['parent', '-scheduled_at', '-event'], name='inbox_parent_scheduled_idx'),
+        ]
+
+    def __str__(self):
+        return f"Event #{self.event_id} for parent #{self.parent_id}"
+
+
+DAYS_OF_WEEK = [
+    ('monday', 'Monday'),
+    ('tuesday', 'Tuesday'),
+    ('wednesday', 'Wednesday'),
+    ('thursday', 'Thursday'),
+    ('friday', 'Friday'),
+    ('saturday', 'Saturday'),
+    ('sunday', 'Sunday'),
+]
+WEEKDAYS = [value for value, _ in DAYS_OF_WEEK]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def week_position(day_of_week, start_time=None):
+    """
+    (weekday, minute_of_week) for a day name and optional start time: Monday
+    is 0 and Monday 00:00 is minute 0; (None, None) for a blank/unknown day.
+    """
+    day = (day_of_week or '').strip().lower()
+    if day not in WEEKDAYS:
+        return None, None
+    weekday = WEEKDAYS.index(day)
+    minutes = start_time.hour * 60 + start_time.minute if start_time else 0
+    return weekday, weekday * MINUTES_PER_DAY + minutes
+
+
+class SectionTimetableEntry(models.Model):
+    """
+    One period of a section's class timetable. Every student in the section
+    gets it without a ParentSchedule row of their own; a student's
+    ParentSchedule with `template` set overrides it (parents/timetable.py).
+    """
+    section = models.ForeignKey(Section, on_delete=models.CASCADE, related_name='timetable_entries')
+    teacher = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name='timetable_entries',
+        blank=True,
+        null=True,
+    )
+    subject = models.CharField(max_length=150)
+    description = models.TextField(blank=True)
+    day_of_week = models.CharField(max_length=9, choices=DAYS_OF_WEEK, blank=True)
+    start_time = models.TimeField(blank=True, null=True)
+    end_time = models.TimeField(blank=True, null=True)
+    # Derived from day_of_week/start_time on save, for indexed "next classes" queries
+    weekday = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    minute_of_week = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    time_label = models.CharField(max_length=120, blank=True)
+    room = models.CharField(max_length=50, blank=True)
+    icon = models.CharField(max_length=64, blank=True, default='book-outline')
+    extra_data = models.JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['section', 'day_of_week', 'start_time', 'subject']
+        indexes = [
+            models.Index(fields=['section', 'updated_at'], name='timetable_section_idx'),
+            models.Index(fields=['section', 'minute_of_week'], name='timetable_week_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.section} - {self.subject} ({self.day_of_week or 'any day'})"
+
+    def save(self, *args, **kwargs):
+        self.weekday, self.minute_of_week = week_position(self.day_of_week, self.start_time)
+        super().save(*args, **kwargs)
+
+
 class ParentSchedule(models.Model):
-    DAYS_OF_WEEK = [
-        ('monday', 'Monday'),
-        ('tuesday', 'Tuesday'),
-        ('wednesday', 'Wednesday'),
-        ('thursday', 'Thursday'),
-        ('friday', 'Friday'),
-        ('saturday', 'Saturday'),
-        ('sunday', 'Sunday'),
-    ]
+    DAYS_OF_WEEK = DAYS_OF_WEEK
 
     parent = models.ForeignKey(
         ParentGuardian,
@@ -256,11 +397,22 @@ class ParentSchedule(models.Model):
         blank=True,
         null=True,
     )
+    # Set when this row overrides a period of the student's section timetable
+    template = models.ForeignKey(
+        SectionTimetableEntry,
+        on_delete=models.CASCADE,
+        related_name='overrides',
+        blank=True,
+        null=True,
+    )
     subject = models.CharField(max_length=150)
     description = models.TextField(blank=True)
     day_of_week = models.CharField(max_length=9, choices=DAYS_OF_WEEK, blank=True)
     start_time = models.TimeField(blank=True, null=True)
     end_time = models.TimeField(blank=True, null=True)
+    # Derived from day_of_week/start_time on save, for indexed "next classes" queries
+    weekday = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    minute_of_week = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
     time_label = models.CharField(max_length=120, blank=True)
     room = models.CharField(max_length=50, blank=True)
     icon = models.CharField(max_length=64, blank=True, default='book-outline')
@@ -270,10 +422,43 @@ class ParentSchedule(models.Model):
 
     class Meta:
         ordering = ['student', 'day_of_week', 'start_time', 'subject', 'created_at']
+        indexes = [
+            models.Index(fields=['student', 'updated_at'], name='schedule_sync_idx'),
+            models.Index(fields=['student', 'minute_of_week'], name='schedule_week_idx'),
+            models.Index(fields=['teacher', 'minute_of_week'], name='schedule_teacher_week_idx'),
+        ]
 
     def __str__(self):
         try:
             student_name = self.student.name if self.student else 'Unknown student'
             return f"{self.subject} - {student_name}"
         except:
-            return f"{self.subject}"
\ No newline at end of file
+            return f"{self.subject}"
+
+    def save(self, *args, **kwargs):
+        self.weekday, self.minute_of_week = week_position(self.day_of_week, self.start_time)
+        super().save(*args, **kwargs)
+
+
+class SyncTombstone(models.Model):
+    """
+    A deleted row the parent app may still hold. The owner columns are copied
+    from the row (not foreign keys, the row is gone) so parents/sync.py can
+    scope tombstones the same way as live rows; the id is the sync cursor.
+    """
+    collection = models.CharField(max_length=20)
+    object_id = models.CharField(max_length=64)
+    teacher_id = models.BigIntegerField(blank=True, null=True)
+    student_id = models.CharField(max_length=20, blank=True, null=True)
+    parent_id = models.BigIntegerField(blank=True, null=True)
+    section_id = models.BigIntegerField(blank=True, null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['collection', 'id'], name='tombstone_collection_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.collection} {self.object_id}"
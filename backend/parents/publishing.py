@@ -0,0 +1,85 @@
+"""
+Scheduled publishing of announcements.
+
+An event posted with a future `publish_at` is stored unpublished: it is
+left out of parent inboxes and event lists, and nobody is notified. The
+publish_scheduled_events command calls `publish_due`, which flips due
+events to published in batches and does the fan-out then, exactly as the
+create view does for events published immediately.
+"""
+import json
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .ics import invalidate_events
+from .inbox import fan_out
+from .models import ParentEvent, ParentGuardian, ParentNotification
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+
+def notifications_for(event):
+    """Unsaved ParentNotification rows for a published event (section-targeted events only)."""
+    if not event.section_ref_id:
+        return []
+    parents = ParentGuardian.objects.filter(
+        student__section_ref_id=event.section_ref_id, teacher_id=event.teacher_id
+    ).values_list('id', 'student_id')
+    return [
+        ParentNotification(
+            parent_id=parent_id,
+            student_id=student_id,
+            type='event',
+            message=f"{event.title}: {event.description or ''}",
+            extra_data=json.dumps({'event_id': event.id}),
+        )
+        for parent_id, student_id in parents
+    ]
+
+
+def notify_parents(event):
+    ParentNotification.objects.bulk_create(notifications_for(event), batch_size=BATCH_SIZE)
+
+
+def due_events(now=None):
+    """Unpublished events whose publish time has come, oldest first (event_due_idx)."""
+    return ParentEvent.objects.filter(published=False, publish_at__lte=now or timezone.now()).order_by('publish_at')
+
+
+def next_due_at():
+    """publish_at of the next event waiting to be published, or None."""
+    return ParentEvent.objects.filter(published=False).order_by('publish_at').values_list(
+        'publish_at', flat=True
+    ).first()
+
+
+def publish_due(now=None, batch_size=BATCH_SIZE):
+    """Publish every due event, `batch_size` per transaction; returns how many were published."""
+    due_by = now or timezone.now()
+    published = 0
+    while True:
+        with transaction.atomic():
+            # skip_locked lets several publishers run side by side on PostgreSQL
+            batch = list(due_events(due_by).select_for_update(skip_locked=True)[:batch_size])
+            if not batch:
+                return published
+            # updated_at moves so the delta sync picks the events up; stamped per
+            # batch so a cursor taken after an earlier batch is not already past it
+            ParentEvent.objects.filter(pk__in=[event.pk for event in batch]).update(
+                published=True, updated_at=timezone.now()
+            )
+            notifications = []
+            for event in batch:
+                event.published = True
+                fan_out(event)
+                notifications += notifications_for(event)
+            ParentNotification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+            # update() sends no post_save, so drop the calendar feeds here (once committed)
+            for teacher_id in {event.teacher_id for event in batch if event.teacher_id}:
+                transaction.on_commit(lambda teacher_id=teacher_id: invalidate_events(teacher_id))
+        published += len(batch)
+        logger.info('Published %d scheduled event(s), %d notification(s)', len(batch), len(notifications))
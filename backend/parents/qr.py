@@ -0,0 +1,124 @@
+"""
+Signed QR tokens for parent/guardian pickup codes.
+
+A token is `P.<parent id>.<qr version>.<signature>`: ids in base 36 and a
+truncated HMAC-SHA256 (keyed from SECRET_KEY) in base 32, all upper case so
+the QR encoder can use its compact alphanumeric mode. About 24 characters
+against ~120 for the legacy JSON payload.
+
+`verify_token` checks the signature with no database access. `resolve_token`
+then maps the parent id to the student/parent fields attendance needs via a
+per-parent entry in the shared cache (settings.CACHES, read through the
+per-process tier of backend/cache.py), and rejects tokens whose version is
+older than the parent's current `qr_version` (bump it to revoke a printed
+code). Because the cache is shared, dropping an entry in one process, e.g.
+`manage.py regenerate_qr_tokens --rotate`, revokes the old code on every
+worker within LOCAL_CACHE_TIMEOUT seconds.
+"""
+import base64
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from backend import cache as tiered
+
+from .models import ParentGuardian, Student
+
+TOKEN_PREFIX = 'P'
+SIGNATURE_BYTES = 10  # 80-bit tag -> 16 base32 characters
+KEY_SALT = 'parents.qr.token'
+PARENT_CACHE_TIMEOUT = 60 * 60
+
+_BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def _to_base36(number):
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = _BASE36[remainder] + digits
+        if not number:
+            return digits
+
+
+def _signature(body):
+    digest = salted_hmac(KEY_SALT, body, algorithm='sha256').digest()[:SIGNATURE_BYTES]
+    return base64.b32encode(digest).decode('ascii').rstrip('=')
+
+
+def make_token(parent_id, version):
+    body = f'{TOKEN_PREFIX}.{_to_base36(parent_id)}.{_to_base36(version)}'
+    return f'{body}.{_signature(body)}'
+
+
+def is_token(value):
+    return isinstance(value, str) and value.strip().upper().startswith(f'{TOKEN_PREFIX}.')
+
+
+def verify_token(value):
+    """Return (parent_id, version) for a correctly signed token, else raise InvalidToken."""
+    parts = (value or '').strip().upper().split('.')
+    if len(parts) != 4 or parts[0] != TOKEN_PREFIX:
+        raise InvalidToken('Malformed QR token')
+    body = '.'.join(parts[:3])
+    if not constant_time_compare(parts[3], _signature(body)):
+        raise InvalidToken('Invalid QR token signature')
+    try:
+        return int(parts[1], 36), int(parts[2], 36)
+    except ValueError:
+        raise InvalidToken('Malformed QR token')
+
+
+def identity_cache_key(parent_id):
+    return f'qr:parent:{parent_id}'
+
+
+def parent_identity(parent_id):
+    """Cached {version, lrn, student, gender, name, role} for a parent, or None."""
+    key = identity_cache_key(parent_id)
+    identity = tiered.get(key)
+    if identity is None:
+        row = (
+            ParentGuardian.objects.filter(pk=parent_id)
+            .values_list('qr_version', 'student_id', 'student__name', 'student__gender', 'name', 'role')
+            .first()
+        )
+        if row is None:
+            return None
+        version, lrn, student_name, gender, name, role = row
+        identity = {
+            'version': version, 'lrn': lrn, 'student': student_name,
+            'gender': gender or '', 'name': name, 'role': role,
+        }
+        tiered.set(key, identity, PARENT_CACHE_TIMEOUT)
+    return identity
+
+
+def resolve_token(value):
+    """Verify a token and return the parent's identity dict; raise InvalidToken otherwise."""
+    parent_id, version = verify_token(value)
+    identity = parent_identity(parent_id)
+    if identity is None:
+        raise InvalidToken('QR code belongs to a deleted parent/guardian')
+    if version != identity['version']:
+        raise InvalidToken('QR code has been replaced; use the newest code')
+    return identity
+
+
+@receiver(post_save, sender=ParentGuardian, dispatch_uid='qr_parent_saved')
+@receiver(post_delete, sender=ParentGuardian, dispatch_uid='qr_parent_deleted')
+def _parent_changed(sender, instance, **kwargs):
+    tiered.delete(identity_cache_key(instance.pk))
+
+
+@receiver(post_save, sender=Student, dispatch_uid='qr_student_saved')
+def _student_changed(sender, instance, created, **kwargs):
+    if not created:
+        tiered.delete(*[
+            identity_cache_key(pk) for pk in ParentGuardian.objects.filter(student=instance).values_list('pk', flat=True)
+        ])
@@ -1,10 +1,15 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Student, ParentGuardian, ParentMobileAccount, ParentNotification, ParentEvent, ParentSchedule
+from .models import (
+    Student, ParentGuardian, ParentMobileAccount, ParentNotification, ParentEvent, ParentSchedule,
+    SectionTimetableEntry,
+)
 from teacher.models import TeacherProfile
+from backend.serializers import DynamicFieldsMixin
+from backend.thumbnails import get_thumbnail_url
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.user.username', read_only=True)
     teacher_section = serializers.CharField(source='teacher.section', read_only=True)
     parents_count = serializers.SerializerMethodField()
@@ -26,12 +31,14 @@ class StudentSerializer(serializers.ModelSerializer):
             'created_at',
         ]
         read_only_fields = ['created_at']
+        # Columns read by the method fields (see backend/serializers.py)
+        field_sources = {'parents_count': ()}
 
     def get_parents_count(self, obj):
         return obj.parents_guardians.count()
 
 
-class ParentGuardianSerializer(serializers.ModelSerializer):
+class ParentGuardianSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.name', read_only=True)
     student_lrn = serializers.CharField(source='student.lrn', read_only=True)
     student_section = serializers.CharField(source='student.section', read_only=True)
@@ -44,6 +51,8 @@ class ParentGuardianSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(required=False, allow_null=True)
     # Public URL for the avatar (absolute URL when request context provided)
     avatar_url = serializers.SerializerMethodField(read_only=True)
+    # Resized copy for list screens (generated on first request)
+    avatar_thumb_url = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = ParentGuardian
@@ -67,10 +76,12 @@ class ParentGuardianSerializer(serializers.ModelSerializer):
             'must_change_credentials',
             'avatar',
             'avatar_url',
+            'avatar_thumb_url',
             'has_mobile_account',
             'created_at',
         ]
-        read_only_fields = ['created_at', 'teacher', 'avatar_url']
+        read_only_fields = ['created_at', 'teacher', 'avatar_url', 'avatar_thumb_url']
+        field_sources = {'has_mobile_account': (), 'avatar_url': ('avatar',), 'avatar_thumb_url': ('avatar',)}
     
     def get_has_mobile_account(self, obj):
         return hasattr(obj, 'mobile_account')
@@ -88,6 +99,10 @@ class ParentGuardianSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
+    def get_avatar_thumb_url(self, obj):
+        """Return the 256px avatar derivative (absolute when request context provided)."""
+        return get_thumbnail_url(obj.avatar, 256, self.context.get('request'))
+
 
 class ParentMobileAccountSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
@@ -228,7 +243,7 @@ class TeacherStudentsSerializer(serializers.ModelSerializer):
         return obj.parents_guardians.count()
 
 
-class ParentNotificationSerializer(serializers.ModelSerializer):
+class ParentNotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     student_name = serializers.CharField(source='student.name', read_only=True)
     student_lrn = serializers.CharField(source='student.lrn', read_only=True)
@@ -255,7 +270,7 @@ class ParentNotificationSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ParentEventSerializer(serializers.ModelSerializer):
+class ParentEventSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.user.username', read_only=True)
     parent_name = serializers.CharField(source='parent.name', read_only=True, allow_null=True)
     student_name = serializers.CharField(source='student.name', read_only=True, allow_null=True)
@@ -280,17 +295,83 @@ class ParentEventSerializer(serializers.ModelSerializer):
             'scheduled_at',
             'location',
             'extra_data',
+            'publish_at',
+            'published',
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['created_at', 'updated_at', 'teacher']
+        read_only_fields = ['created_at', 'updated_at', 'teacher', 'published']
         extra_kwargs = {
             'parent': {'required': False, 'allow_null': True},
             'student': {'required': False, 'allow_null': True}
         }
 
 
-class ParentScheduleSerializer(serializers.ModelSerializer):
+class TimeLabelMixin:
+    """Fill `time_label` from start/end times ("8:00 AM - 9:00 AM") when none is given."""
+
+    def _ensure_time_label(self, data, fallback_instance=None):
+        if data.get('time_label'):
+            return data
+        start = data.get('start_time')
+        end = data.get('end_time')
+        if not start and not end and fallback_instance:
+            start = getattr(fallback_instance, 'start_time', None)
+            end = getattr(fallback_instance, 'end_time', None)
+        label = self._build_time_label(start, end)
+        if label:
+            data['time_label'] = label
+        return data
+
+    def _build_time_label(self, start, end):
+        def _fmt(value):
+            if not value:
+                return None
+            return value.strftime("%I:%M %p").lstrip('0')
+
+        start_str = _fmt(start)
+        end_str = _fmt(end)
+        if start_str and end_str:
+            return f"{start_str} - {end_str}"
+        return start_str or end_str
+
+
+class SectionTimetableEntrySerializer(TimeLabelMixin, DynamicFieldsMixin, serializers.ModelSerializer):
+    section_name = serializers.CharField(source='section.name', read_only=True)
+    teacher_name = serializers.CharField(source='teacher.user.username', read_only=True, default=None)
+
+    class Meta:
+        model = SectionTimetableEntry
+        fields = [
+            'id',
+            'section',
+            'section_name',
+            'teacher',
+            'teacher_name',
+            'subject',
+            'description',
+            'day_of_week',
+            'start_time',
+            'end_time',
+            'weekday',
+            'minute_of_week',
+            'time_label',
+            'room',
+            'icon',
+            'extra_data',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = ['created_at', 'updated_at', 'teacher', 'weekday', 'minute_of_week']
+
+    def create(self, validated_data):
+        return super().create(self._ensure_time_label(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self._ensure_time_label(validated_data, fallback_instance=instance))
+
+
+class ParentScheduleSerializer(TimeLabelMixin, DynamicFieldsMixin, serializers.ModelSerializer):
     parent_name = serializers.CharField(source='parent.name', read_only=True)
     student_name = serializers.CharField(source='student.name', read_only=True)
     student_lrn = serializers.CharField(source='student.lrn', read_only=True)
@@ -307,11 +388,14 @@ class ParentScheduleSerializer(serializers.ModelSerializer):
             'student_lrn',
             'teacher',
             'teacher_name',
+            'template',
             'subject',
             'description',
             'day_of_week',
             'start_time',
             'end_time',
+            'weekday',
+            'minute_of_week',
             'time_label',
             'room',
             'icon',
@@ -319,7 +403,7 @@ class ParentScheduleSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at', 'weekday', 'minute_of_week']
 
     def validate(self, data):
         parent = data.get('parent')
@@ -328,6 +412,10 @@ class ParentScheduleSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Either parent or student must be provided.")
         if parent and student and parent.student != student:
             raise serializers.ValidationError("Provided student does not match the parent's student.")
+        template = data.get('template')
+        student = student or (parent.student if parent else None)
+        if template and student and template.section_id != student.section_ref_id:
+            raise serializers.ValidationError("template belongs to another section's timetable.")
         return data
 
     def create(self, validated_data):
@@ -348,28 +436,3 @@ class ParentScheduleSerializer(serializers.ModelSerializer):
             if not data.get('teacher'):
                 data['teacher'] = parent.teacher
         return data
-
-    def _ensure_time_label(self, data, fallback_instance=None):
-        if data.get('time_label'):
-            return data
-        start = data.get('start_time')
-        end = data.get('end_time')
-        if not start and not end and fallback_instance:
-            start = getattr(fallback_instance, 'start_time', None)
-            end = getattr(fallback_instance, 'end_time', None)
-        label = self._build_time_label(start, end)
-        if label:
-            data['time_label'] = label
-        return data
-
-    def _build_time_label(self, start, end):
-        def _fmt(value):
-            if not value:
-                return None
-            return value.strftime("%I:%M %p").lstrip('0')
-
-        start_str = _fmt(start)
-        end_str = _fmt(end)
-        if start_str and end_str:
-            return f"{start_str} - {end_str}"
-        return start_str or end_str
\ No newline at end of file
@@ -0,0 +1,238 @@
+"""
+Delta sync for the parent mobile app.
+
+One request returns every collection the app shows (parents, events,
+notifications, schedules, timetable, guardians, attendance) for the
+parent's student. For each collection the client sends back the cursor it
+got last time and receives only rows created/updated since, plus the ids
+deleted since.
+
+A cursor is `<updated_at µs>-<pk>-<tombstone id>`: rows are read in
+(updated_at, pk) order so a page can stop anywhere without skipping rows
+that share a timestamp, and deletions are read from SyncTombstone by id. A
+missing cursor means a full download; so does a cursor older than the
+retained tombstones, flagged `reset` so the client drops its local copy.
+A student moving section resets their timetable the same way, through a
+RESET tombstone: the old section's periods never changed, so nothing else
+would tell the app to drop them. Likewise for the events of a parent whose
+inbox rebuild brings in events older than their cursor (parents/inbox.py).
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Max, Min, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from guardian.models import Guardian
+from guardian.serializers import GuardianSerializer
+from teacher.models import Attendance
+from teacher.serializers import AttendanceSerializer
+
+from .models import (
+    ParentEvent, ParentGuardian, ParentNotification, ParentSchedule, SectionTimetableEntry, Student, SyncTombstone,
+)
+from .serializers import (
+    ParentEventSerializer,
+    ParentGuardianSerializer,
+    ParentNotificationSerializer,
+    ParentScheduleSerializer,
+    SectionTimetableEntrySerializer,
+)
+
+PAGE_SIZE = 500
+RESET = '*'  # object_id of a tombstone that resets the collection for its scope
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# rows(parent) -> the parent's visible rows; owner(instance) -> tombstone scope columns
+Collection = namedtuple('Collection', 'model serializer rows owner')
+
+
+def _event_rows(parent):
+    # The parent's inbox already holds exactly the events targeted at them (parents/inbox.py)
+    return ParentEvent.objects.select_related('teacher__user', 'parent', 'student').filter(
+        inbox_entries__parent_id=parent.id
+    )
+
+
+COLLECTIONS = {
+    'parents': Collection(
+        ParentGuardian,
+        ParentGuardianSerializer,
+        lambda parent: ParentGuardian.objects.select_related('student', 'teacher__user', 'mobile_account')
+        .filter(student_id=parent.student_id),
+        lambda obj: {'student_id': obj.student_id},
+    ),
+    'events': Collection(
+        ParentEvent,
+        ParentEventSerializer,
+        _event_rows,
+        lambda obj: {'teacher_id': obj.teacher_id, 'student_id': obj.student_id, 'parent_id': obj.parent_id},
+    ),
+    'notifications': Collection(
+        ParentNotification,
+        ParentNotificationSerializer,
+        lambda parent: ParentNotification.objects.select_related('parent', 'student').filter(parent_id=parent.id),
+        lambda obj: {'parent_id': obj.parent_id},
+    ),
+    'schedules': Collection(
+        ParentSchedule,
+        ParentScheduleSerializer,
+        lambda parent: ParentSchedule.objects.select_related('parent', 'student', 'teacher__user').filter(
+            Q(student_id=parent.student_id) & (Q(parent_id__isnull=True) | Q(parent_id=parent.id))
+        ),
+        lambda obj: {'student_id': obj.student_id},
+    ),
+    # The student's section periods; 'schedules' holds their own rows and overrides (`template`)
+    'timetable': Collection(
+        SectionTimetableEntry,
+        SectionTimetableEntrySerializer,
+        lambda parent: SectionTimetableEntry.objects.select_related('section', 'teacher__user').filter(
+            section_id=parent.student.section_ref_id
+        ),
+        lambda obj: {'section_id': obj.section_id},
+    ),
+    'guardians': Collection(
+        Guardian,
+        GuardianSerializer,
+        lambda parent: Guardian.objects.select_related('teacher__user', 'parent_guardian', 'student')
+        .filter(student_id=parent.student_id),
+        lambda obj: {'student_id': obj.student_id},
+    ),
+    'attendance': Collection(
+        Attendance,
+        AttendanceSerializer,
+        lambda parent: Attendance.objects.select_related('teacher__user').filter(student_id=parent.student_id),
+        lambda obj: {'student_id': obj.student_id},
+    ),
+}
+COLLECTION_FOR_MODEL = {collection.model: name for name, collection in COLLECTIONS.items()}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1) if value else 0
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def make_cursor(updated_at_micros, pk, tombstone_id):
+    return f'{updated_at_micros}-{pk}-{tombstone_id}'
+
+
+def parse_cursor(value):
+    """(updated_at µs, pk, tombstone id) from a cursor string."""
+    try:
+        micros, pk, tombstone_id = (int(part) for part in value.split('-'))
+    except (AttributeError, ValueError):
+        raise InvalidCursor(f'Invalid sync cursor: {value!r}')
+    return micros, pk, tombstone_id
+
+
+def _tombstones_for(name, parent):
+    scope = (
+        Q(student_id=parent.student_id)
+        | Q(parent_id=parent.id)
+        | Q(student_id__isnull=True, parent_id__isnull=True, section_id__isnull=True, teacher_id=parent.teacher_id)
+    )
+    if parent.student.section_ref_id:
+        scope |= Q(section_id=parent.student.section_ref_id)
+    return SyncTombstone.objects.filter(collection=name).filter(scope)
+
+
+def _latest_tombstone():
+    return SyncTombstone.objects.aggregate(v=Max('id'))['v'] or 0
+
+
+def sync_collection(name, parent, cursor=None, context=None, latest_tombstone=None):
+    """
+    {'upserted', 'deleted', 'cursor', 'more', 'full'[, 'reset']} for one
+    collection. `more` means the page was cut at PAGE_SIZE rows; call again
+    with the returned cursor.
+    """
+    collection = COLLECTIONS[name]
+    if latest_tombstone is None:
+        latest_tombstone = _latest_tombstone()
+    result = {'full': cursor is None}
+
+    rows = collection.rows(parent)
+    micros, pk, deleted = 0, 0, []
+    if cursor is not None:
+        since_micros, since_pk, tombstone_id = parse_cursor(cursor)
+        oldest = SyncTombstone.objects.aggregate(v=Min('id'))['v']
+        if oldest is not None and tombstone_id < oldest - 1:
+            # Deletions since the cursor were pruned: start over
+            result.update(full=True, reset=True)
+        else:
+            tombstones = list(
+                _tombstones_for(name, parent)
+                .filter(id__gt=tombstone_id, id__lte=latest_tombstone)
+                .values_list('object_id', flat=True)
+            )
+            if RESET in tombstones:
+                result.update(full=True, reset=True)
+            else:
+                micros, pk = since_micros, since_pk
+                since = _from_micros(micros)
+                rows = rows.filter(Q(updated_at__gt=since) | Q(updated_at=since, pk__gt=pk))
+                deleted = tombstones
+
+    page = list(rows.order_by('updated_at', 'pk')[:PAGE_SIZE + 1])
+    more = len(page) > PAGE_SIZE
+    page = page[:PAGE_SIZE]
+    if page:
+        micros, pk = _to_micros(page[-1].updated_at), page[-1].pk
+
+    result.update(
+        upserted=collection.serializer(page, many=True, context=context or {}).data,
+        deleted=sorted(set(deleted)),
+        cursor=make_cursor(micros, pk, latest_tombstone),
+        more=more,
+    )
+    return result
+
+
+def sync(parent, cursors, context=None):
+    """Sync every collection named in `cursors` ({name: cursor or None})."""
+    latest_tombstone = _latest_tombstone()
+    return {
+        name: sync_collection(name, parent, cursor, context, latest_tombstone)
+        for name, cursor in cursors.items()
+    }
+
+
+@receiver(post_delete, sender=ParentGuardian, dispatch_uid='sync_parent_deleted')
+@receiver(post_delete, sender=ParentEvent, dispatch_uid='sync_event_deleted')
+@receiver(post_delete, sender=ParentNotification, dispatch_uid='sync_notification_deleted')
+@receiver(post_delete, sender=ParentSchedule, dispatch_uid='sync_schedule_deleted')
+@receiver(post_delete, sender=SectionTimetableEntry, dispatch_uid='sync_timetable_deleted')
+@receiver(post_delete, sender=Guardian, dispatch_uid='sync_guardian_deleted')
+@receiver(post_delete, sender=Attendance, dispatch_uid='sync_attendance_deleted')
+def _row_deleted(sender, instance, **kwargs):
+    name = COLLECTION_FOR_MODEL[sender]
+    SyncTombstone.objects.create(
+        collection=name, object_id=str(instance.pk), **COLLECTIONS[name].owner(instance)
+    )
+
+
+@receiver(pre_save, sender=Student, dispatch_uid='sync_student_saving')
+def _student_saving(sender, instance, **kwargs):
+    # Student.save() has already resolved the new section_ref
+    if not instance._state.adding:
+        instance._previous_section_id = (
+            Student.objects.filter(pk=instance.pk).values_list('section_ref_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Student, dispatch_uid='sync_student_saved')
+def _student_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_section_id', instance.section_ref_id)
+    if not created and previous != instance.section_ref_id:
+        # The old section's periods go stale for this student without changing
+        SyncTombstone.objects.create(collection='timetable', object_id=RESET, student_id=instance.pk)
+    instance._previous_section_id = instance.section_ref_id
@@ -1,3 +1,398 @@
-from django.test import TestCase
+from datetime import datetime, time, timedelta
+from importlib import import_module
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib import admin
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend import cache as tiered
+from guardian.admin import GuardianAdmin
+from guardian.models import Guardian
+from teacher.models import Absence, Attendance, Section
+from teacher.tests import make_teacher
+
+from .models import (
+    ParentEvent, ParentEventInbox, ParentGuardian, ParentNotification, ParentSchedule, SectionTimetableEntry, Student,
+    SyncTombstone,
+)
+from .publishing import publish_due
+from .qr import InvalidToken, resolve_token
+from .sync import sync
+from .timetable import filter_rows, next_classes, student_timetable
+
+
+class ParentFixtureMixin:
+    def setUp(self):
+        tiered.clear()
+        self.teacher = make_teacher()
+        self.student = Student.objects.create(lrn='1001', name='Ana Cruz', teacher=self.teacher, section='Rose')
+        self.parent = ParentGuardian.objects.create(
+            student=self.student, teacher=self.teacher, name='Maria Cruz', role='Parent1'
+        )
+        self.client = APIClient()
+
+
+class QRTokenTests(ParentFixtureMixin, TestCase):
+    def test_token_not_in_public_endpoints(self):
+        response = self.client.get('/api/parents/parents/public/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('qr_token', response.json()[0])
+        self.assertNotIn('qr_token', self.client.get(f'/api/parents/parent/{self.parent.pk}/').json())
+
+    def test_token_endpoint_requires_owner(self):
+        url = f'/api/parents/parent/{self.parent.pk}/qr/'
+        self.assertIn(self.client.get(url).status_code, (401, 403))
+        self.client.force_authenticate(make_teacher('teacher2').user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(self.teacher.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.parent.refresh_from_db()
+        self.assertEqual(response.json()['qr_token'], self.parent.qr_token)
+
+    def test_rotate_revokes_cached_identity(self):
+        self.parent.refresh_from_db()
+        old_token = self.parent.qr_token
+        self.assertEqual(resolve_token(old_token)['lrn'], '1001')  # identity now cached
+        call_command('regenerate_qr_tokens', '--rotate', '--parent', str(self.parent.pk), stdout=StringIO())
+        with self.assertRaises(InvalidToken):
+            resolve_token(old_token)
+        self.parent.refresh_from_db()
+        self.assertEqual(resolve_token(self.parent.qr_token)['lrn'], '1001')
+
+
+class SyncTests(ParentFixtureMixin, TestCase):
+    def _sync(self, name, cursor=None, parent=None):
+        return sync(parent or self.parent, {name: cursor})[name]
+
+    def test_cursor_pages_through_rows_sharing_a_timestamp(self):
+        for day in range(1, 6):
+            Attendance.objects.create(
+                teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date=f'2026-10-{day:02d}'
+            )
+        Attendance.objects.update(updated_at=timezone.now())
+        seen, cursor = [], None
+        with mock.patch('parents.sync.PAGE_SIZE', 2):
+            while True:
+                page = self._sync('attendance', cursor)
+                seen += [row['id'] for row in page['upserted']]
+                cursor = page['cursor']
+                if not page['more']:
+                    break
+        self.assertEqual(sorted(seen), sorted(Attendance.objects.values_list('pk', flat=True)))
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(self._sync('attendance', cursor)['upserted'], [])
+
+    def test_deletes_are_tombstoned(self):
+        attendance = Attendance.objects.create(
+            teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date='2026-10-01'
+        )
+        pk = attendance.pk
+        cursor = self._sync('attendance')['cursor']
+        attendance.delete()
+        page = self._sync('attendance', cursor)
+        self.assertEqual(page['deleted'], [str(pk)])
+        self.assertEqual(self._sync('attendance', page['cursor'])['deleted'], [])
+
+    def test_pruned_tombstones_force_a_reset(self):
+        cursor = self._sync('attendance')['cursor']
+        for _ in range(3):
+            SyncTombstone.objects.create(collection='attendance', object_id='x')
+        SyncTombstone.objects.filter(pk__lt=SyncTombstone.objects.latest('id').pk).delete()
+        page = self._sync('attendance', cursor)
+        self.assertTrue(page['reset'])
+        self.assertTrue(page['full'])
+
+    def test_retargeted_event_is_deleted_for_the_dropped_parent(self):
+        other_student = Student.objects.create(lrn='1002', name='Ben Cruz', teacher=self.teacher, section='Rose')
+        other = ParentGuardian.objects.create(
+            student=other_student, teacher=self.teacher, name='Jose Cruz', role='Parent1'
+        )
+        event = ParentEvent.objects.create(teacher=self.teacher, parent=self.parent, title='Meeting', event_type='meeting')
+        page = self._sync('events')
+        self.assertEqual([row['id'] for row in page['upserted']], [event.pk])
+
+        event.parent = other
+        event.save()
+        page = self._sync('events', page['cursor'])
+        self.assertEqual(page['deleted'], [str(event.pk)])
+        self.assertEqual([row['id'] for row in self._sync('events', parent=other)['upserted']], [event.pk])
+
+        # Retargeted back: the tombstone goes and the event comes back as an upsert
+        event.parent = self.parent
+        event.save()
+        page = self._sync('events', page['cursor'])
+        self.assertEqual(page['deleted'], [])
+        self.assertEqual([row['id'] for row in page['upserted']], [event.pk])
+
+    def test_admin_status_change_is_synced(self):
+        guardian = Guardian.objects.create(
+            teacher=self.teacher, student=self.student, name='Lola', age=70, student_name='Ana Cruz', status='allowed'
+        )
+        cursor = self._sync('guardians')['cursor']
+        with mock.patch.object(GuardianAdmin, 'message_user'):
+            GuardianAdmin(Guardian, admin.site).mark_as_declined(
+                RequestFactory().post('/'), Guardian.objects.filter(pk=guardian.pk)
+            )
+        page = self._sync('guardians', cursor)
+        self.assertEqual([(row['id'], row['status']) for row in page['upserted']], [(guardian.pk, 'declined')])
+
+
+class ScheduledPublishingTests(ParentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.later = timezone.now() + timedelta(hours=1)
+        self.draft = ParentEvent.objects.create(
+            teacher=self.teacher, section='Rose', title='Field trip', event_type='announcement', publish_at=self.later
+        )
+
+    def _listed(self, user=None):
+        if user is not None:
+            self.client.force_authenticate(user)
+        response = self.client.get('/api/parents/events/')
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results'] if isinstance(response.data, dict) else response.data
+        return [row['id'] for row in rows]
+
+    def test_draft_is_listed_only_for_its_teacher(self):
+        self.assertFalse(self.draft.published)
+        self.assertEqual(self._listed(), [])
+        self.assertEqual(self._listed(make_teacher('teacher2', section='Lily').user), [])
+        self.assertEqual(self._listed(self.teacher.user), [self.draft.pk])
+
+    def test_publish_due_publishes_and_notifies(self):
+        self.assertEqual(publish_due(now=timezone.now()), 0)
+        self.assertEqual(publish_due(now=self.later), 1)
+        self.draft.refresh_from_db()
+        self.assertTrue(self.draft.published)
+        self.assertEqual(ParentEventInbox.objects.get(event=self.draft).parent, self.parent)
+        self.assertEqual(ParentNotification.objects.filter(parent=self.parent, type='event').count(), 1)
+        self.assertEqual(publish_due(now=self.later), 0)
+
+    def test_each_batch_gets_its_own_timestamp(self):
+        second = ParentEvent.objects.create(
+            teacher=self.teacher, section='Rose', title='Recital', event_type='announcement',
+            publish_at=self.later + timedelta(minutes=1),
+        )
+        before = timezone.now()
+        self.assertEqual(publish_due(now=self.later + timedelta(minutes=1), batch_size=1), 2)
+        self.draft.refresh_from_db()
+        second.refresh_from_db()
+        # A cursor taken after the first batch committed must not already cover the second
+        self.assertLess(before, self.draft.updated_at)
+        self.assertLess(self.draft.updated_at, second.updated_at)
+
+
+class TimetableSyncTests(ParentFixtureMixin, TestCase):
+    def _sync(self, cursor=None):
+        return sync(self.parent, {'timetable': cursor})['timetable']
+
+    def _entry(self, section, **fields):
+        return SectionTimetableEntry.objects.create(
+            section=Section.for_name(section), teacher=self.teacher, subject='Math', day_of_week='monday', **fields
+        )
+
+    def test_deletes_are_scoped_to_the_section(self):
+        own, other = self._entry('Rose'), self._entry('Lily')
+        own_pk = own.pk
+        page = self._sync()
+        self.assertEqual([row['id'] for row in page['upserted']], [own_pk])
+        # Same teacher, another section: not a period this parent holds
+        other.delete()
+        own.delete()
+        self.assertEqual(self._sync(page['cursor'])['deleted'], [str(own_pk)])
+
+    def test_section_move_resets_the_timetable(self):
+        self._entry('Rose')
+        lily = self._entry('Lily', room='B2')
+        cursor = self._sync()['cursor']
+
+        self.student.section = 'Lily'
+        self.student.save()
+        self.parent.refresh_from_db()
+        page = self._sync(cursor)
+        self.assertTrue(page['reset'])
+        self.assertEqual([row['id'] for row in page['upserted']], [lily.pk])
+        self.assertFalse(self._sync(page['cursor']).get('reset'))
+
+        self.student.name = 'Ana Reyes'
+        self.student.save()
+        self.assertFalse(self._sync(page['cursor']).get('reset'))
+
+
+class CollapseTimetableMigrationTests(ParentFixtureMixin, TestCase):
+    def test_rows_targeted_at_a_parent_are_not_collapsed(self):
+        other_student = Student.objects.create(lrn='1002', name='Ben Cruz', teacher=self.teacher, section='Rose')
+        other = ParentGuardian.objects.create(
+            student=other_student, teacher=self.teacher, name='Jose Cruz', role='Parent1'
+        )
+        for student, parent in ((self.student, None), (other_student, None), (self.student, self.parent),
+                                (other_student, other)):
+            ParentSchedule.objects.create(
+                student=student, parent=parent, teacher=self.teacher, subject='Tutoring' if parent else 'Math'
+            )
+        migration = import_module('parents.migrations.0018_sectiontimetableentry')
+        migration.collapse_section_timetables(apps, None)
+
+        self.assertEqual(list(SectionTimetableEntry.objects.values_list('subject', flat=True)), ['Math'])
+        self.assertEqual(
+            sorted(ParentSchedule.objects.values_list('subject', 'parent_id')),
+            [('Tutoring', self.parent.pk), ('Tutoring', other.pk)],
+        )
+
+
+class CalendarFeedTests(ParentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.teacher.user)
+
+    def _feed(self, url):
+        response = self.client.get(url)
+        return response.status_code, response.content.decode() if response.status_code == 200 else ''
+
+    def test_rotating_revokes_the_old_url(self):
+        old = self.client.get('/api/parents/calendar/', {'lrn': '1001'}).data['url']
+        self.assertEqual(self._feed(old)[0], 200)
+
+        new = self.client.post('/api/parents/calendar/', {'lrn': '1001'}).data['url']
+        self.assertNotEqual(new, old)
+        self.assertEqual(self._feed(old)[0], 404)
+        self.assertEqual(self._feed(new)[0], 200)
+        self.assertEqual(self.client.get('/api/parents/calendar/', {'lrn': '1001'}).data['url'], new)
+
+    def test_other_teacher_cannot_rotate(self):
+        self.client.force_authenticate(make_teacher('teacher2', section='Lily').user)
+        self.assertEqual(self.client.post('/api/parents/calendar/', {'lrn': '1001'}).status_code, 404)
+
+    def test_feed_cached_before_commit_is_dropped_on_commit(self):
+        url = self.client.get('/api/parents/calendar/', {'lrn': '1001'}).data['url']
+        self.assertNotIn('Recital', self._feed(url)[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            ParentEvent.objects.create(
+                teacher=self.teacher, title='Recital', event_type='event', scheduled_at=timezone.now()
+            )
+            # Another worker renders the feed before the event is visible to it
+            with mock.patch('parents.ics.student_events', return_value=ParentEvent.objects.none()):
+                self.assertNotIn('Recital', self._feed(url)[1])
+        self.assertIn('Recital', self._feed(url)[1])
+
+    def test_published_event_reaches_the_feed(self):
+        url = self.client.get('/api/parents/calendar/', {'lrn': '1001'}).data['url']
+        later = timezone.now() + timedelta(hours=1)
+        ParentEvent.objects.create(
+            teacher=self.teacher, title='Recital', event_type='event', scheduled_at=later, publish_at=later
+        )
+        self.assertNotIn('Recital', self._feed(url)[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_due(now=later)
+        self.assertIn('Recital', self._feed(url)[1])
+
+
+class TimelineTests(ParentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for day in (17, 18, 19):
+            Attendance.objects.create(
+                teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date=f'2026-10-{day}'
+            )
+        # Scans sharing one instant must still page without gaps or repeats
+        Attendance.objects.update(timestamp=timezone.now() - timedelta(days=1))
+        Absence.objects.create(teacher=self.teacher, student_name='Ana Cruz', date=timezone.localdate(), reason='Sick')
+        Absence.objects.create(
+            teacher=self.teacher, student_name='Ana Cruz', date=timezone.localdate() - timedelta(days=3), reason='Flu'
+        )
+        self.client.force_authenticate(self.teacher.user)
+        self.url = '/api/parents/students/1001/timeline/'
+
+    def _pages(self, limit, **params):
+        entries, cursor = [], None
+        while True:
+            response = self.client.get(self.url, {'limit': limit, **({'cursor': cursor} if cursor else {}), **params})
+            self.assertEqual(response.status_code, 200)
+            entries += [(entry['type'], entry['id'], entry['at']) for entry in response.data['results']]
+            cursor = response.data['cursor']
+            if not response.data['more']:
+                return entries, cursor
+
+    def test_pages_cover_every_entry_once_newest_first(self):
+        entries, _ = self._pages(limit=2)
+        self.assertEqual(len(entries), 5)
+        self.assertEqual(len(set(entries)), 5)
+        self.assertEqual(
+            [entry[0] for entry in entries], ['absence', 'attendance', 'attendance', 'attendance', 'absence']
+        )
+        self.assertEqual(entries, self._pages(limit=100)[0])
+
+    def test_rows_written_between_pages_do_not_shift_later_pages(self):
+        first = self.client.get(self.url, {'limit': 2}).data
+        Attendance.objects.create(teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date='2026-10-20')
+        second = self.client.get(self.url, {'limit': 10, 'cursor': first['cursor']}).data
+        seen = [(entry['type'], entry['id']) for entry in first['results'] + second['results']]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_types_filter(self):
+        entries, _ = self._pages(limit=2, types='absence')
+        self.assertEqual([entry[0] for entry in entries], ['absence', 'absence'])
+        self.assertEqual(self.client.get(self.url, {'types': 'absence,bogus'}).status_code, 400)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(self.url, {'cursor': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': '-.-.-.-.1-2-3'}).status_code, 400)
+
+    def test_other_teacher_gets_404(self):
+        self.client.force_authenticate(make_teacher('teacher2', section='Lily').user)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class InboxRebuildSyncTests(ParentFixtureMixin, TestCase):
+    def test_section_move_delivers_the_new_sections_events(self):
+        rose = ParentEvent.objects.create(teacher=self.teacher, section='Rose', title='Rose day', event_type='event')
+        lily = ParentEvent.objects.create(teacher=self.teacher, section='Lily', title='Lily day', event_type='event')
+        page = sync(self.parent, {'events': None})['events']
+        self.assertEqual([row['id'] for row in page['upserted']], [rose.pk])
+
+        self.student.section = 'Lily'
+        self.student.save()
+        page = sync(self.parent, {'events': page['cursor']})['events']
+        self.assertTrue(page['reset'])
+        self.assertEqual([row['id'] for row in page['upserted']], [lily.pk])
+        self.assertFalse(sync(self.parent, {'events': page['cursor']})['events'].get('reset'))
+
+
+class UpcomingClassesTests(ParentFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for subject, day, start in (
+            ('Math', 'monday', time(8)), ('Assembly', 'monday', None), ('Science', 'wednesday', time(10)),
+            ('Art', 'friday', time(14)), ('Reading', '', time(9)),
+        ):
+            ParentSchedule.objects.create(
+                student=self.student, teacher=self.teacher, subject=subject, day_of_week=day, start_time=start
+            )
+
+    def _at(self, day, hour):
+        return timezone.make_aware(datetime(2026, 10, day, hour))  # 2026-10-19 is a Monday
+
+    def _both(self, now, count=None):
+        stored = [row.subject for row in next_classes(ParentSchedule.objects.filter(student=self.student), now, count)]
+        rows = filter_rows(student_timetable(self.student), upcoming=True, now=now)
+        resolved = [row['subject'] for row in rows][:count]
+        self.assertEqual(stored, resolved)
+        return stored
+
+    def test_wraps_around_the_end_of_the_week(self):
+        self.assertEqual(self._both(self._at(21, 12)), ['Art', 'Assembly', 'Math', 'Science'])
+        self.assertEqual(self._both(self._at(21, 12), count=2), ['Art', 'Assembly'])
+        self.assertEqual(self._both(self._at(23, 15), count=3), ['Assembly', 'Math', 'Science'])
+
+    def test_untimed_periods_stay_listed_all_day(self):
+        self.assertEqual(self._both(self._at(19, 9)), ['Assembly', 'Science', 'Art', 'Math'])
+        self.assertEqual(self._both(self._at(19, 23), count=1), ['Assembly'])
+        # The next day they move to the end of the week like any past period
+        self.assertEqual(self._both(self._at(20, 7)), ['Science', 'Art', 'Assembly', 'Math'])
@@ -0,0 +1,166 @@
+"""
+A student's history as one paginated, newest-first timeline.
+
+Attendance scans, absences, dropouts, unauthorized pickup attempts and
+guardian registrations live in separate tables. Each source below reads its
+rows for the student in (time, pk) descending order from a keyset position,
+at most limit + 1 rows per page; heapq.merge interleaves the sources and the
+page takes the first `limit`. The cursor records, per source, the last row
+handed out, so a page reads about `limit` rows from each source whatever
+the student's history length, and rows written meanwhile never shift a page.
+
+Dated rows (absences, dropouts) sit at local midnight of their date.
+"""
+import heapq
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from typing import Callable, NamedTuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from guardian.models import Guardian
+from guardian.serializers import GuardianSerializer
+from teacher.models import Absence, Attendance, Dropout, UnauthorizedPerson
+from teacher.serializers import (
+    AbsenceSerializer, AttendanceSerializer, DropoutSerializer, UnauthorizedPersonListSerializer,
+)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class Source(NamedTuple):
+    rows: Callable  # student -> queryset of that student's rows
+    time_field: str  # DateTimeField, or DateField for dated rows
+    serializer: type
+
+
+def _by_name(student):
+    # Rows that only carry the typed student name
+    return Q(teacher_id=student.teacher_id, student_name__iexact=student.name)
+
+
+SOURCES = {
+    'attendance': Source(
+        lambda student: Attendance.objects.select_related('teacher__user').filter(student=student),
+        'timestamp',
+        AttendanceSerializer,
+    ),
+    'absence': Source(
+        lambda student: Absence.objects.select_related('teacher__user').filter(
+            Q(student=student) | Q(student__isnull=True) & _by_name(student)
+        ),
+        'date',
+        AbsenceSerializer,
+    ),
+    'dropout': Source(
+        lambda student: Dropout.objects.select_related('teacher__user').filter(_by_name(student)),
+        'date',
+        DropoutSerializer,
+    ),
+    'unauthorized': Source(
+        lambda student: UnauthorizedPerson.objects.select_related('teacher__user').filter(_by_name(student)),
+        'timestamp',
+        UnauthorizedPersonListSerializer,
+    ),
+    'guardian': Source(
+        lambda student: Guardian.objects.select_related('teacher__user', 'parent_guardian', 'student').filter(
+            student=student
+        ),
+        'timestamp',
+        GuardianSerializer,
+    ),
+}
+# Breaks ties between sources at the same instant (a scan before that day's absence)
+_RANK = {name: rank for rank, name in enumerate(reversed(list(SOURCES)))}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def make_cursor(positions):
+    """`<µs>-<pk>` per source in SOURCES order; `-` for a source not read yet."""
+    return '.'.join(
+        '-' if positions.get(name) is None else '%d-%d' % positions[name] for name in SOURCES
+    )
+
+
+def parse_cursor(value):
+    """{source: (µs, pk) or None} from a cursor string."""
+    parts = (value or '').split('.')
+    if len(parts) != len(SOURCES):
+        raise InvalidCursor(f'Invalid timeline cursor: {value!r}')
+    positions = {}
+    for name, part in zip(SOURCES, parts):
+        try:
+            positions[name] = None if part == '-' else tuple(int(n) for n in part.split('-', 1))
+        except ValueError:
+            raise InvalidCursor(f'Invalid timeline cursor: {value!r}')
+        if positions[name] is not None and len(positions[name]) != 2:
+            raise InvalidCursor(f'Invalid timeline cursor: {value!r}')
+    return positions
+
+
+def _moment(source, obj):
+    value = getattr(obj, source.time_field)
+    if source.time_field == 'date':
+        return timezone.make_aware(datetime.combine(value, dt_time.min))
+    return value
+
+
+def _page(source, student, position, limit):
+    rows = source.rows(student)
+    if position is not None:
+        micros, pk = position
+        since = _from_micros(micros)
+        if source.time_field == 'date':
+            since = timezone.localtime(since).date()
+        rows = rows.filter(Q(**{f'{source.time_field}__lt': since}) | Q(**{source.time_field: since, 'pk__lt': pk}))
+    return list(rows.order_by(f'-{source.time_field}', '-pk')[:limit + 1])
+
+
+def _entries(name, source, rows):
+    for obj in rows:
+        yield (_moment(source, obj), _RANK[name], obj.pk), name, obj
+
+
+def student_timeline(student, cursor=None, limit=DEFAULT_LIMIT, types=None, context=None):
+    """
+    {'results', 'cursor', 'more'} for one page of `student`'s timeline, newest
+    first; pass the returned cursor back for the next page. `types` limits
+    the sources read (all by default).
+    """
+    positions = parse_cursor(cursor) if cursor else dict.fromkeys(SOURCES)
+    names = [name for name in SOURCES if types is None or name in types]
+    merged = heapq.merge(
+        *(_entries(name, SOURCES[name], _page(SOURCES[name], student, positions[name], limit)) for name in names),
+        key=lambda entry: entry[0],
+        reverse=True,
+    )
+
+    results = []
+    for (moment, _, pk), name, obj in merged:
+        if len(results) == limit:
+            more = True
+            break
+        source = SOURCES[name]
+        positions[name] = (_to_micros(moment), pk)
+        results.append({
+            'type': name,
+            'id': pk,
+            'at': moment.isoformat(),
+            'data': source.serializer(obj, context=context or {}).data,
+        })
+    else:
+        more = False
+    return {'results': results, 'cursor': make_cursor(positions), 'more': more}
@@ -0,0 +1,197 @@
+"""
+Section timetables with per-student overrides.
+
+A section's periods are stored once as SectionTimetableEntry rows. What a
+student (or one of their parents) sees is resolved at read time:
+
+    section periods, each replaced by the student's ParentSchedule row that
+    overrides it (`template` set), plus the student's own extra rows
+
+in the same row shape ParentScheduleSerializer gives (periods taken from
+the section have "id": null and their entry id in "template"). The merged
+list is cached per student and parent, under a key carrying a per-section
+and a per-student version that writes bump, like the roster state cache
+(versions are read through backend/cache.py).
+"""
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend import cache as tiered
+
+from .models import (
+    MINUTES_PER_DAY, MINUTES_PER_WEEK, ParentGuardian, ParentSchedule, SectionTimetableEntry, Student, week_position,
+)
+from .serializers import ParentScheduleSerializer
+
+TIMETABLE_TIMEOUT = 60 * 60
+
+
+def _version(scope, key):
+    return tiered.version(f'timetable:version:{scope}:{key}')
+
+
+def _bump(scope, key):
+    tiered.bump(f'timetable:version:{scope}:{key}')
+
+
+def invalidate_section(section_id):
+    if section_id:
+        _bump('section', section_id)
+
+
+def invalidate_student(lrn):
+    _bump('student', lrn)
+
+
+def _sort_key(row):
+    # Same order as the schedule list query
+    return (row['day_of_week'] or '', row['start_time'] or '', row['subject'], row['created_at'] or '')
+
+
+def _from_template(entry, student):
+    """An unsaved ParentSchedule showing a section period to `student`."""
+    return ParentSchedule(
+        student=student,
+        teacher=entry.teacher,
+        template=entry,
+        **{
+            name: getattr(entry, name)
+            for name in ('subject', 'description', 'day_of_week', 'start_time', 'end_time', 'weekday',
+                         'minute_of_week', 'time_label', 'room', 'icon', 'extra_data', 'created_at', 'updated_at')
+        },
+    )
+
+
+def compute_timetable(student, parent_id=None):
+    """
+    Serialized schedule rows for `student`; with `parent_id`, rows targeted at
+    another parent are left out (same rule as the parent schedule filter).
+    """
+    own = ParentSchedule.objects.select_related('parent', 'student', 'teacher__user').filter(student=student)
+    overrides, rows = {}, []
+    for row in own:
+        if parent_id is not None and row.parent_id not in (None, parent_id):
+            continue
+        if row.template_id:
+            overrides[row.template_id] = row
+        else:
+            rows.append(row)
+    if student.section_ref_id:
+        entries = SectionTimetableEntry.objects.select_related('teacher__user').filter(
+            section_id=student.section_ref_id
+        )
+        # Overrides of another section's periods (the student moved) drop out with it
+        rows += [overrides.get(entry.id) or _from_template(entry, student) for entry in entries]
+    data = ParentScheduleSerializer(rows, many=True, omit=()).data
+    return sorted(data, key=_sort_key)
+
+
+def cache_version(student):
+    """Changes whenever the student's resolved timetable may have (for keys built on it)."""
+    return f'{_version("section", student.section_ref_id or 0)}:{_version("student", student.lrn)}'
+
+
+def student_timetable(student, parent_id=None):
+    """Cached `compute_timetable`; dropped on any write to the section's or student's rows."""
+    key = f'timetable:{cache_version(student)}:{student.lrn}:{parent_id or "-"}'
+    rows = cache.get(key)
+    if rows is None:
+        rows = [dict(row) for row in compute_timetable(student, parent_id)]
+        cache.set(key, rows, TIMETABLE_TIMEOUT)
+    return rows
+
+
+@receiver(post_save, sender=SectionTimetableEntry, dispatch_uid='timetable_entry_saved')
+@receiver(post_delete, sender=SectionTimetableEntry, dispatch_uid='timetable_entry_deleted')
+def _entry_changed(sender, instance, **kwargs):
+    invalidate_section(instance.section_id)
+
+
+@receiver(post_save, sender=ParentSchedule, dispatch_uid='timetable_schedule_saved')
+@receiver(post_delete, sender=ParentSchedule, dispatch_uid='timetable_schedule_deleted')
+def _schedule_changed(sender, instance, **kwargs):
+    invalidate_student(instance.student_id)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='timetable_student_saved')
+def _student_saved(sender, instance, created, **kwargs):
+    # A section change swaps the whole timetable
+    if not created:
+        invalidate_student(instance.lrn)
+
+
+@receiver(post_save, sender=ParentGuardian, dispatch_uid='timetable_parent_saved')
+def _parent_saved(sender, instance, **kwargs):
+    # parent_name is part of the cached rows
+    invalidate_student(instance.student_id)
+
+
+def current_minute_of_week(now):
+    return now.weekday() * MINUTES_PER_DAY + now.hour * 60 + now.minute
+
+
+def _minutes_ahead(minute_of_week, position):
+    # Minutes from `position` to the next start, wrapping past Sunday night
+    return (minute_of_week - position) % MINUTES_PER_WEEK
+
+
+def _untimed_today(now):
+    # A period with a day but no start time sits at minute 0 of that day
+    return Q(minute_of_week=now.weekday() * MINUTES_PER_DAY, start_time__isnull=True)
+
+
+def next_classes(queryset, now, count=None):
+    """
+    The next `count` (default: all) periods from `now` on, in order, wrapping
+    around the end of the week: today's periods without a start time first
+    (they last the whole day), then at most two range scans on
+    minute_of_week, the second only when the rest of this week has fewer
+    than `count`. Periods without a day have no place in the week and are
+    left out.
+    """
+    position = current_minute_of_week(now)
+    queryset = queryset.filter(minute_of_week__isnull=False).order_by('minute_of_week', 'pk')
+    rows = list(queryset.filter(_untimed_today(now))[:count])
+    queryset = queryset.exclude(_untimed_today(now))
+    for scan in (queryset.filter(minute_of_week__gte=position), queryset.filter(minute_of_week__lt=position)):
+        if count is not None and len(rows) >= count:
+            break
+        rows += list(scan if count is None else scan[:count - len(rows)])
+    return rows
+
+
+def filter_rows(rows, teacher_id=None, day=None, upcoming=False, now=None):
+    """
+    The schedule list's teacher/day filters, applied to resolved rows;
+    `upcoming` orders them like next_classes.
+    """
+    if teacher_id is not None:
+        rows = [row for row in rows if row['teacher'] == teacher_id]
+    if day:
+        weekday, _ = week_position(day)
+        rows = [row for row in rows if weekday is not None and row['weekday'] == weekday]
+    if upcoming:
+        position = current_minute_of_week(now)
+
+        def ahead(row):
+            if row['start_time'] is None and row['weekday'] == now.weekday():
+                return -1  # today's untimed periods first, as in next_classes
+            return _minutes_ahead(row['minute_of_week'], position)
+
+        rows = sorted(
+            (row for row in rows if row['minute_of_week'] is not None),
+            key=lambda row: (ahead(row), row['subject']),
+        )
+    return rows
+
+
+def select_fields(rows, fields=None, omit=None):
+    """?fields= / ?omit= for resolved rows."""
+    if fields is None and not omit:
+        return rows
+    return [
+        {name: value for name, value in row.items() if (fields is None or name in fields) and name not in (omit or ())}
+        for row in rows
+    ]
@@ -14,10 +14,17 @@ from .views import (
     ParentGuardianPublicListView,
     ParentLoginView,
     ParentDetailView,
+    ParentQRTokenView,
     ParentNotificationListCreateView,
     ParentEventListCreateView,
     ParentEventDetailView,
     ParentScheduleListCreateView,
+    SectionTimetableListCreateView,
+    SectionTimetableDetailView,
+    StudentCalendarFeedView,
+    StudentCalendarLinkView,
+    StudentTimelineView,
+    ParentSyncView,
     AvatarDebugView,
 )
 
@@ -30,12 +37,14 @@ urlpatterns = [
     path('teacher-students/', TeacherStudentsView.as_view(), name='teacher-students'),
     path('students/', StudentListView.as_view(), name='student-list'),
     path('students/<str:lrn>/', StudentDetailView.as_view(), name='student-detail'),
+    path('students/<str:lrn>/timeline/', StudentTimelineView.as_view(), name='student-timeline'),
     path('all-teachers-students/', AllTeachersStudentsView.as_view(), name='all-teachers-students'),
     
     # Parent/Guardian Management
     path('parents/', ParentGuardianListView.as_view(), name='parent-list'),
     path('parents/public/', ParentGuardianPublicListView.as_view(), name='parent-public-list'),
     path('parent/<int:pk>/', ParentDetailView.as_view(), name='parent-detail'),
+    path('parent/<int:pk>/qr/', ParentQRTokenView.as_view(), name='parent-qr-token'),
     path('by-lrn/<str:lrn>/', ParentsByLRNView.as_view(), name='parents-by-lrn'),
     
     # Parent Login (Web)
@@ -54,6 +63,16 @@ urlpatterns = [
     
     # Schedules
     path('schedules/', ParentScheduleListCreateView.as_view(), name='schedule-list-create'),
+    path('timetable/', SectionTimetableListCreateView.as_view(), name='timetable-list-create'),
+    path('timetable/<int:pk>/', SectionTimetableDetailView.as_view(), name='timetable-detail'),
+
+    # Calendar subscriptions (iCalendar)
+    path('calendar/', StudentCalendarLinkView.as_view(), name='student-calendar-link'),
+    path('calendar/<str:lrn>.ics', StudentCalendarFeedView.as_view(), name='student-calendar-feed'),
+
+    # Mobile app delta sync: every collection in one request
+    path('sync/', ParentSyncView.as_view(), name='parent-sync'),
+
     # Debug endpoint to check uploaded avatar files (remove in production)
     path('debug/avatar-exists/', AvatarDebugView.as_view(), name='avatar-debug'),
 ]
\ No newline at end of file
@@ -4,6 +4,8 @@ from django.db import transaction
 from django.db.models import Prefetch, Q
 from django.contrib.auth import authenticate
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import reverse
 import os
 from rest_framework import permissions, status
 from rest_framework.response import Response
@@ -14,9 +16,16 @@ from rest_framework.authtoken.models import Token
 from django.utils import timezone
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
-from .models import Student, ParentGuardian, ParentMobileAccount, ParentNotification, ParentEvent, ParentSchedule
+from .models import (
+    Student, ParentGuardian, ParentMobileAccount, ParentNotification, ParentEvent, ParentSchedule,
+    SectionTimetableEntry, week_position,
+)
+from .sync import COLLECTIONS, InvalidCursor, sync
+from . import includes as related
+from .publishing import notify_parents
+from . import ics, timeline, timetable
 
-from teacher.models import TeacherProfile
+from teacher.models import TeacherProfile, Section
 from .serializers import (
     StudentSerializer,
     ParentGuardianSerializer,
@@ -28,6 +37,7 @@ from .serializers import (
     ParentNotificationSerializer,
     ParentEventSerializer,
     ParentScheduleSerializer,
+    SectionTimetableEntrySerializer,
 )
 
 logger = logging.getLogger(__name__)
@@ -292,14 +302,18 @@ class StudentListView(APIView):
     def get(self, request):
         try:
             teacher = TeacherProfile.objects.get(user=request.user)
-            qs = Student.objects.filter(teacher=teacher).prefetch_related('parents_guardians')
+            qs = Student.objects.filter(teacher=teacher)
         except TeacherProfile.DoesNotExist:
             # Admin fallback: return all students
-            qs = Student.objects.all().prefetch_related('parents_guardians')
+            qs = Student.objects.all()
+        # parents_count reads the prefetched parents; skip the query when it is not returned
+        if StudentSerializer.returns_field(request, 'parents_count'):
+            qs = qs.prefetch_related('parents_guardians')
+        qs = StudentSerializer.sparse_queryset(qs.select_related('teacher__user'), request)
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(qs, request)
-        serializer = StudentSerializer(page, many=True)
+        serializer = StudentSerializer(page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
 
 
@@ -320,6 +334,7 @@ class ParentGuardianListView(APIView):
             lrn = request.query_params.get('lrn')
             if lrn:
                 qs = qs.filter(student__lrn=lrn)
+            qs = ParentGuardianSerializer.sparse_queryset(qs, request)
             
             paginator = self.pagination_class()
             page = paginator.paginate_queryset(qs, request)
@@ -332,23 +347,37 @@ class ParentGuardianListView(APIView):
 class StudentDetailView(APIView):
     """
     Get details for a single student (must belong to authenticated teacher).
+
+    ?include=guardians,schedules,attendance (any of parents, guardians,
+    schedules, attendance) embeds those collections under "included".
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, lrn):
+        try:
+            includes = related.parse_includes(request.query_params.get('include'), related.STUDENT_INCLUDE_NAMES)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             teacher = TeacherProfile.objects.get(user=request.user)
-            student = Student.objects.get(lrn=lrn, teacher=teacher)
+            student = related.student_queryset(
+                Student.objects.select_related('teacher__user'), includes
+            ).get(lrn=lrn, teacher=teacher)
         except TeacherProfile.DoesNotExist:
             return Response({"error": "Teacher profile not found"}, status=status.HTTP_404_NOT_FOUND)
         except Student.DoesNotExist:
             return Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        parents = ParentGuardian.objects.filter(student=student)
+        parents = ParentGuardian.objects.filter(student=student).select_related(
+            'student', 'teacher__user', 'mobile_account'
+        )
         response_data = {
             "student": StudentSerializer(student).data,
             "parents_guardians": ParentGuardianSerializer(parents, many=True, context={'request': request}).data,
         }
+        if includes:
+            response_data["included"] = related.embed_student(student, includes, {'request': request})
         return Response(response_data)
 
 
@@ -479,6 +508,7 @@ class ParentGuardianPublicListView(APIView):
             queryset = queryset.filter(student__name__iexact=student_name)
         if role:
             queryset = queryset.filter(role__iexact=role)
+        queryset = ParentGuardianSerializer.sparse_queryset(queryset, request)
         if limit:
             try:
                 limit_value = max(1, min(int(limit), 500))
@@ -523,18 +553,30 @@ class ParentDetailView(APIView):
     """Retrieve or partially update a ParentGuardian by primary key.
 
     Endpoint: GET/PATCH /api/parents/parent/<pk>/
+
+    GET ?include=student,guardians,schedules (any of student, parents,
+    guardians, schedules, attendance, notifications) embeds those under
+    "included", replacing the follow-up requests the app used to make.
     """
     permission_classes = [permissions.AllowAny]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get(self, request, pk):
         try:
-            parent = ParentGuardian.objects.get(pk=pk)
+            includes = related.parse_includes(request.query_params.get('include'), related.PARENT_INCLUDE_NAMES)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            parent = related.parent_queryset(ParentGuardian.objects.all(), includes).get(pk=pk)
         except ParentGuardian.DoesNotExist:
             return Response({'error': 'Parent not found'}, status=status.HTTP_404_NOT_FOUND)
 
         serializer = ParentGuardianSerializer(parent, context={'request': request})
-        return Response(serializer.data)
+        data = serializer.data
+        if includes:
+            data = {**data, 'included': related.embed_parent(parent, includes, {'request': request})}
+        return Response(data)
 
     def patch(self, request, pk):
         try:
@@ -622,6 +664,24 @@ class ParentDetailView(APIView):
         return Response(response_data)
 
 
+class ParentQRTokenView(APIView):
+    """
+    The parent's compact pickup QR token, a bearer credential, so it is left
+    out of ParentGuardianSerializer (returned by public endpoints) and only
+    given to the parent's teacher or the parent's own mobile account.
+    Endpoint: GET /api/parents/parent/<pk>/qr/
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        parent = ParentGuardian.objects.filter(pk=pk).filter(
+            Q(teacher__user=request.user) | Q(mobile_account__user=request.user)
+        ).only('id', 'qr_token', 'qr_version').first()
+        if parent is None:
+            return Response({'error': 'Parent not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'id': parent.id, 'qr_token': parent.qr_token, 'qr_version': parent.qr_version})
+
+
 class ParentNotificationListCreateView(APIView):
     """
     Read/create notifications tied to ParentGuardian records.
@@ -638,6 +698,7 @@ class ParentNotificationListCreateView(APIView):
             queryset = queryset.filter(parent_id=parent_id)
         if lrn:
             queryset = queryset.filter(student__lrn=lrn)
+        queryset = ParentNotificationSerializer.sparse_queryset(queryset, request)
         if limit:
             try:
                 limit_value = max(1, min(int(limit), 200))
@@ -645,7 +706,7 @@ class ParentNotificationListCreateView(APIView):
             except (TypeError, ValueError):
                 logger.warning("Invalid limit param for notifications: %s", limit)
 
-        serializer = ParentNotificationSerializer(queryset, many=True)
+        serializer = ParentNotificationSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
 
     def post(self, request):
@@ -679,7 +740,9 @@ class ParentEventListCreateView(APIView):
         Query params:
         - teacher_id: Filter by specific teacher
         - lrn: Filter by student LRN (parents only)
-        - parent_id: Filter by parent (parents only)
+        - parent: Events this parent should see, read from their inbox
+          (already scoped to their teacher, student and section, so
+          `section`/`lrn` are not re-applied)
         - upcoming: Show only future events (1/true/yes)
         - limit: Max number of results (default 200)
         """
@@ -695,9 +758,14 @@ class ParentEventListCreateView(APIView):
 
         # If authenticated user is a parent, automatically filter to their teacher
         user = request.user
+        # Scheduled announcements stay hidden until published; a teacher also sees their own
+        if user and user.is_authenticated:
+            queryset = queryset.filter(Q(published=True) | Q(teacher__user=user))
+        else:
+            queryset = queryset.filter(published=True)
         if user and user.is_authenticated:
             try:
-                parent = ParentGuardian.objects.get(user=user)
+                parent = ParentGuardian.objects.get(mobile_account__user=user)
                 # Parent only sees announcements from their student's teacher
                 queryset = queryset.filter(teacher=parent.teacher)
                 logger.info(f"Parent {parent.id} viewing events from teacher {parent.teacher.id}")
@@ -714,18 +782,35 @@ class ParentEventListCreateView(APIView):
         upcoming = request.query_params.get('upcoming')
         limit = request.query_params.get('limit')
 
+        if parent_id:
+            try:
+                parent_id = int(parent_id)
+            except (TypeError, ValueError):
+                return Response({"error": "parent must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+            # Fan-out-on-write inbox (parents/inbox.py): one indexed range scan
+            # instead of OR-filters over the parent, student and section joins
+            inbox_filter = {'inbox_entries__parent_id': parent_id}
+            if upcoming and str(upcoming).lower() in ('1', 'true', 'yes'):
+                # Same filter() call, so it applies to this parent's inbox row
+                inbox_filter['inbox_entries__scheduled_at__gte'] = timezone.now()
+                upcoming = None
+            queryset = queryset.filter(**inbox_filter).order_by('-inbox_entries__scheduled_at', '-id')
+            section = lrn = None
+
         if teacher_id:
             queryset = queryset.filter(teacher_id=teacher_id)
         # Filter by section: include events explicitly targeted to the section,
         # events attached to a student in that section, or broadcast events
-        # (section is null) when appropriate.
+        # (no section) when appropriate. Matching goes through the normalized
+        # Section FK so it is an integer-key join rather than an iexact scan.
         if section:
-            queryset = queryset.filter(
-                Q(section__isnull=True) | Q(section__iexact=section) | Q(student__section__iexact=section)
-            )
-        
-        if parent_id:
-            queryset = queryset.filter(Q(parent_id=parent_id) | Q(parent__isnull=True))
+            section_filter = Q(section_ref__isnull=True)
+            section_obj = Section.lookup(section)
+            if section_obj:
+                section_filter |= Q(section_ref_id=section_obj.id) | Q(
+                    student_id__in=Student.objects.filter(section_ref_id=section_obj.id).values('lrn')
+                )
+            queryset = queryset.filter(section_filter)
         
         if lrn:
             queryset = queryset.filter(Q(student__lrn=lrn) | Q(student__isnull=True))
@@ -733,6 +818,8 @@ class ParentEventListCreateView(APIView):
         if upcoming and str(upcoming).lower() in ('1', 'true', 'yes'):
             now = timezone.now()
             queryset = queryset.filter(scheduled_at__gte=now)
+
+        queryset = ParentEventSerializer.sparse_queryset(queryset, request)
         
         if limit:
             try:
@@ -748,7 +835,7 @@ class ParentEventListCreateView(APIView):
         except Exception:
             logger.debug('Could not determine matched_count for events')
 
-        serializer = ParentEventSerializer(queryset, many=True)
+        serializer = ParentEventSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
 
     def post(self, request):
@@ -759,9 +846,10 @@ class ParentEventListCreateView(APIView):
         - title: Announcement title
         - description: Announcement content
         - event_type: Type (e.g. 'Announcement', 'Alert', 'Reminder')
-        - scheduled_at: ISO datetime when to publish
+        - scheduled_at: ISO datetime of the event
         
         Optional:
+        - publish_at: ISO datetime to publish and notify at (default: now)
         - parent_id: Target specific parent (null = all parents)
         - student_id: Target specific student (null = all students)
         - location: Physical location (if applicable)
@@ -786,29 +874,13 @@ class ParentEventListCreateView(APIView):
 
             logger.info(f"Teacher {teacher.id} created announcement: {event.title} (section={section_value})")
 
-            # Create notifications for parents in the targeted section (if provided).
-            try:
-                if section_value:
-                    # Find parents whose student is in the given section and whose teacher is this teacher
-                    parents_qs = ParentGuardian.objects.filter(student__section__iexact=section_value, teacher=teacher)
-                    notifications = []
-                    for p in parents_qs:
-                        try:
-                            notif = ParentNotification(
-                                parent=p,
-                                student=p.student,
-                                type='event',
-                                message=f"{event.title}: {event.description or ''}",
-                                extra_data=json.dumps({'event_id': event.id})
-                            )
-                            notifications.append(notif)
-                        except Exception:
-                            continue
-                    if notifications:
-                        ParentNotification.objects.bulk_create(notifications)
-
-            except Exception:
-                logger.exception('Failed to create section notifications')
+            # Notify parents in the targeted section now, or when a scheduled
+            # announcement is published (parents/publishing.py).
+            if event.published:
+                try:
+                    notify_parents(event)
+                except Exception:
+                    logger.exception('Failed to create section notifications')
 
             output = ParentEventSerializer(event).data
             return Response(output, status=status.HTTP_201_CREATED)
@@ -830,6 +902,8 @@ class ParentEventDetailView(APIView):
             event = ParentEvent.objects.select_related('teacher', 'parent', 'student').get(pk=pk)
         except ParentEvent.DoesNotExist:
             return Response({"error": "Announcement not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not event.published and not (event.teacher and event.teacher.user_id == request.user.id):
+            return Response({"error": "Announcement not found"}, status=status.HTTP_404_NOT_FOUND)
 
         serializer = ParentEventSerializer(event)
         return Response(serializer.data)
@@ -892,6 +966,15 @@ class ParentEventDetailView(APIView):
 class ParentScheduleListCreateView(APIView):
     """
     Read/create student schedule entries.
+
+    With `parent`, `student` or `lrn` the response is the student's resolved
+    timetable: their section's periods merged with their own rows and
+    overrides (parents/timetable.py). Other queries list stored rows only.
+
+    `upcoming=1` returns the next classes from now on in start order, wrapping
+    around the end of the week (`limit` of them); today's periods without a
+    start time come first all day long, and periods without a day are left
+    out.
     """
     permission_classes = [permissions.AllowAny]
 
@@ -904,40 +987,66 @@ class ParentScheduleListCreateView(APIView):
         upcoming = request.query_params.get('upcoming')
         limit = request.query_params.get('limit')
 
+        if parent_id or student_id or lrn:
+            return self._timetable(request, parent_id, student_id or lrn, teacher_id, day, upcoming, limit)
+
         queryset = ParentSchedule.objects.select_related('parent', 'student', 'teacher').order_by(
             'day_of_week', 'start_time', 'subject', 'created_at'
         )
 
-        if parent_id:
-            queryset = queryset.filter(parent_id=parent_id)
-        if student_id:
-            queryset = queryset.filter(student__pk=student_id)
-        if lrn:
-            queryset = queryset.filter(student__lrn=lrn)
         if teacher_id:
             queryset = queryset.filter(teacher_id=teacher_id)
         if day:
-            queryset = queryset.filter(day_of_week__iexact=str(day).lower())
-        if upcoming and str(upcoming).lower() in ('1', 'true', 'yes'):
-            now = timezone.localtime()
-            today_day = now.strftime('%A').lower()
-            current_time = now.time()
-            queryset = queryset.filter(
-                Q(day_of_week__iexact=today_day, start_time__gte=current_time)
-                | Q(day_of_week__iexact=today_day, start_time__isnull=True)
-                | Q(day_of_week__isnull=True)
-                | Q(day_of_week='')
-            )
+            weekday, _ = week_position(day)
+            queryset = queryset.filter(weekday=weekday) if weekday is not None else queryset.none()
+        queryset = ParentScheduleSerializer.sparse_queryset(queryset, request)
+        limit_value = None
         if limit:
             try:
                 limit_value = max(1, min(int(limit), 500))
-                queryset = queryset[:limit_value]
             except (TypeError, ValueError):
                 logger.warning("Invalid limit param for schedules: %s", limit)
+        if upcoming and str(upcoming).lower() in ('1', 'true', 'yes'):
+            # Next classes from now on, wrapping into next week (indexed minute_of_week)
+            queryset = timetable.next_classes(queryset, timezone.localtime(), limit_value)
+        elif limit_value:
+            queryset = queryset[:limit_value]
 
-        serializer = ParentScheduleSerializer(queryset, many=True)
+        serializer = ParentScheduleSerializer(queryset, many=True, context={'request': request})
         return Response(serializer.data)
 
+    def _timetable(self, request, parent_id, student_id, teacher_id, day, upcoming, limit):
+        try:
+            parent_id = int(parent_id) if parent_id else None
+            teacher_id = int(teacher_id) if teacher_id else None
+        except (TypeError, ValueError):
+            return Response({"error": "parent and teacher must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if parent_id is not None:
+            parent = ParentGuardian.objects.select_related('student').filter(pk=parent_id).first()
+            student = parent.student if parent else None
+            if student is not None and student_id and student.lrn != student_id:
+                student = None
+        else:
+            student = Student.objects.filter(pk=student_id).first()
+        if student is None:
+            return Response([])
+
+        rows = timetable.filter_rows(
+            timetable.student_timetable(student, parent_id),
+            teacher_id=teacher_id,
+            day=day,
+            upcoming=bool(upcoming and str(upcoming).lower() in ('1', 'true', 'yes')),
+            now=timezone.localtime(),
+        )
+        rows = timetable.select_fields(rows, *ParentScheduleSerializer.requested_fields(request))
+        if limit:
+            try:
+                rows = rows[:max(1, min(int(limit), 500))]
+            except (TypeError, ValueError):
+                logger.warning("Invalid limit param for schedules: %s", limit)
+        return Response(rows)
+
     def post(self, request):
         serializer = ParentScheduleSerializer(data=request.data)
         if serializer.is_valid():
@@ -946,3 +1055,276 @@ class ParentScheduleListCreateView(APIView):
             return Response(output, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+class SectionTimetableListCreateView(APIView):
+    """
+    A section's class timetable, shared by every student in it.
+    Endpoint: /api/parents/timetable/
+
+    GET ?section=<id or name>: the section's periods (`upcoming=1&limit=N`:
+    the next N from now on, wrapping around the end of the week).
+    POST (teachers): add a period; `section` defaults to the teacher's own.
+    Per-student changes are ParentSchedule rows with `template` set.
+    """
+
+    def get_permissions(self):
+        if self.request.method == 'GET':
+            return [permissions.AllowAny()]
+        return [permissions.IsAuthenticated()]
+
+    def get(self, request):
+        section = _resolve_section(request.query_params.get('section'))
+        if section is None:
+            return Response({"error": "Unknown or missing section"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = SectionTimetableEntry.objects.select_related('section', 'teacher__user').filter(
+            section=section
+        ).order_by('day_of_week', 'start_time', 'subject')
+        queryset = SectionTimetableEntrySerializer.sparse_queryset(queryset, request)
+        if str(request.query_params.get('upcoming', '')).lower() in ('1', 'true', 'yes'):
+            try:
+                limit = max(1, min(int(request.query_params.get('limit') or 500), 500))
+            except (TypeError, ValueError):
+                return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = timetable.next_classes(queryset, timezone.localtime(), limit)
+        serializer = SectionTimetableEntrySerializer(queryset, many=True, context={'request': request})
+        return Response(serializer.data)
+
+    def post(self, request):
+        try:
+            teacher = TeacherProfile.objects.get(user=request.user)
+        except TeacherProfile.DoesNotExist:
+            return Response({"error": "Only teachers can edit timetables"}, status=status.HTTP_403_FORBIDDEN)
+
+        data = request.data.copy()
+        section_value = data.get('section')
+        section = _resolve_section(section_value, create=True) if section_value else teacher.section_ref
+        if section is None:
+            return Response({"error": "Unknown or missing section"}, status=status.HTTP_400_BAD_REQUEST)
+        data['section'] = section.id
+
+        serializer = SectionTimetableEntrySerializer(data=data)
+        if serializer.is_valid():
+            entry = serializer.save(teacher=teacher)
+            return Response(SectionTimetableEntrySerializer(entry).data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class SectionTimetableDetailView(APIView):
+    """
+    Update or delete one timetable period (the teacher who added it only).
+    Endpoint: /api/parents/timetable/{id}/
+    """
+
+    def get_permissions(self):
+        if self.request.method == 'GET':
+            return [permissions.AllowAny()]
+        return [permissions.IsAuthenticated()]
+
+    def _own_entry(self, request, pk):
+        try:
+            entry = SectionTimetableEntry.objects.get(pk=pk)
+        except SectionTimetableEntry.DoesNotExist:
+            return None, Response({"error": "Timetable entry not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not TeacherProfile.objects.filter(user=request.user, pk=entry.teacher_id).exists():
+            return None, Response(
+                {"error": "You can only change your own timetable entries"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return entry, None
+
+    def get(self, request, pk):
+        try:
+            entry = SectionTimetableEntry.objects.select_related('section', 'teacher__user').get(pk=pk)
+        except SectionTimetableEntry.DoesNotExist:
+            return Response({"error": "Timetable entry not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(SectionTimetableEntrySerializer(entry, context={'request': request}).data)
+
+    def patch(self, request, pk):
+        entry, error = self._own_entry(request, pk)
+        if error:
+            return error
+        data = request.data.copy()
+        if 'section' in data:
+            section = _resolve_section(data.get('section'), create=True)
+            if section is None:
+                return Response({"error": "Unknown section"}, status=status.HTTP_400_BAD_REQUEST)
+            data['section'] = section.id
+        serializer = SectionTimetableEntrySerializer(entry, data=data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        entry, error = self._own_entry(request, pk)
+        if error:
+            return error
+        entry.delete()
+        return Response({"message": "Timetable entry deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
+
+
+def _resolve_section(value, create=False):
+    """Section for an id or a free-text name (created on first use when `create`)."""
+    value = str(value or '').strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return Section.objects.filter(pk=int(value)).first()
+    return Section.for_name(value) if create else Section.lookup(value)
+
+
+class StudentCalendarFeedView(APIView):
+    """
+    iCalendar feed of a student's timetable and announcements, for calendar
+    apps to subscribe to. Endpoint: /api/parents/calendar/<lrn>.ics?key=<feed key>
+    (get the full URL from /api/parents/calendar/).
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []  # calendar apps send no credentials; the key is the credential
+
+    def get(self, request, lrn):
+        student = Student.objects.filter(lrn=lrn).only(
+            'lrn', 'name', 'teacher_id', 'section_ref_id', 'calendar_key_version'
+        ).first()
+        if student is None or not ics.check_feed_key(student, request.query_params.get('key')):
+            return Response({"error": "Calendar not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        body, etag = ics.student_feed(student)
+        candidates = [tag.strip() for tag in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]
+        # The compression middleware may have weakened the ETag the client holds
+        if etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+            response['Content-Disposition'] = f'inline; filename="{lrn}.ics"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=300'
+        return response
+
+
+class StudentCalendarLinkView(APIView):
+    """
+    Subscription URL for a student's calendar feed.
+    Endpoint: /api/parents/calendar/ (parent mobile account: their student;
+    teacher: ?lrn= of one of their students)
+    GET: the current URL. POST: revoke every URL handed out so far and return
+    a new one.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _student(self, request):
+        account = ParentMobileAccount.objects.select_related('parent_guardian').filter(user=request.user).first()
+        if account:
+            return account.parent_guardian.student, None
+        lrn = request.query_params.get('lrn') or request.data.get('lrn')
+        if not lrn:
+            return None, Response({"error": "lrn is required"}, status=status.HTTP_400_BAD_REQUEST)
+        student = Student.objects.filter(lrn=lrn, teacher__user=request.user).first()
+        if student is None:
+            return None, Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
+        return student, None
+
+    def _link(self, request, student, key):
+        url = request.build_absolute_uri(
+            f"{reverse('student-calendar-feed', kwargs={'lrn': student.lrn})}?key={key}"
+        )
+        return Response({"lrn": student.lrn, "url": url, "webcal_url": 'webcal://' + url.split('://', 1)[1]})
+
+    def get(self, request):
+        student, error = self._student(request)
+        if error:
+            return error
+        return self._link(request, student, ics.feed_key(student))
+
+    def post(self, request):
+        student, error = self._student(request)
+        if error:
+            return error
+        return self._link(request, student, ics.rotate_feed_key(student))
+
+
+class StudentTimelineView(APIView):
+    """
+    A student's attendance, absences, dropouts, unauthorized pickup attempts
+    and guardian registrations merged newest first, one page at a time
+    (parents/timeline.py).
+    Endpoint: GET /api/parents/students/<lrn>/timeline/?cursor=&limit=&types=
+    For the student's teacher, or a parent mobile account of the student.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, lrn):
+        student = Student.objects.filter(lrn=lrn).filter(
+            Q(teacher__user=request.user) | Q(parents_guardians__mobile_account__user=request.user)
+        ).first()
+        if student is None:
+            return Response({"error": "Student not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', timeline.DEFAULT_LIMIT)), timeline.MAX_LIMIT))
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        types = request.query_params.get('types')
+        if types:
+            types = {name.strip() for name in types.split(',') if name.strip()}
+            unknown = types - timeline.SOURCES.keys()
+            if unknown:
+                return Response(
+                    {"error": f"Unknown types: {', '.join(sorted(unknown))}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        try:
+            page = timeline.student_timeline(
+                student, request.query_params.get('cursor'), limit, types or None, {'request': request}
+            )
+        except timeline.InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"lrn": student.lrn, **page})
+
+
+class ParentSyncView(APIView):
+    """
+    Delta sync for the parent mobile app: one request instead of one per screen.
+    Endpoint: GET /api/parents/sync/
+
+    The parent is the signed-in mobile account, or ?parent=<id>. Each
+    collection to sync is a query param holding the cursor from the previous
+    response (empty for a first download), e.g.
+    ?parent=3&events=<cursor>&notifications=&attendance=<cursor>
+    With no collection params every collection is downloaded in full.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        parent = None
+        if request.user and request.user.is_authenticated:
+            account = ParentMobileAccount.objects.select_related('parent_guardian__student').filter(
+                user=request.user
+            ).first()
+            parent = account.parent_guardian if account else None
+        if parent is None:
+            parent_id = request.query_params.get('parent')
+            if not parent_id:
+                return Response({"error": "parent is required"}, status=status.HTTP_400_BAD_REQUEST)
+            parent = ParentGuardian.objects.select_related('student').filter(pk=parent_id).first()
+            if parent is None:
+                return Response({"error": "Parent/guardian not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        cursors = {
+            name: request.query_params.get(name) or None
+            for name in COLLECTIONS if name in request.query_params
+        } or dict.fromkeys(COLLECTIONS)
+
+        started = timezone.now()
+        try:
+            collections = sync(parent, cursors, context={'request': request})
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "parent": parent.id,
+            "student": parent.student_id,
+            "server_time": started.isoformat(),
+            "collections": collections,
+        })
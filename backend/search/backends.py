@@ -0,0 +1,139 @@
+"""
+Typeahead search over SearchDocument.
+
+Every query is split into words and each word is matched as a prefix, so
+"ana re" finds "Ana Reyes" and "1234" finds LRN 123456789012. Backends:
+
+- SQLiteFTSBackend: the FTS5 table created by migration 0002 (prefix indexes
+  on 2 and 3 characters), ranked with bm25 weighting names over keywords.
+- PostgresBackend: `to_tsquery('simple', 'word:*')` against a GIN tsvector
+  index, plus pg_trgm word similarity (when the extension is installed) so
+  misspelt names still match.
+- SimpleBackend: LIKE prefix filters, for databases without either.
+
+`get_backend()` picks one from the connection vendor unless
+settings.SEARCH_BACKEND names a class explicitly.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .documents import normalize_text
+from .models import SearchDocument
+
+WORD_RE = re.compile(r'\w+')
+FTS_TABLE = 'search_document_fts'
+
+
+class SearchBackend:
+    name = 'base'
+
+    @staticmethod
+    def words(query):
+        return WORD_RE.findall(normalize_text(query))
+
+    def scoped(self, teacher_id=None, kinds=None):
+        queryset = SearchDocument.objects.all()
+        if teacher_id is not None:
+            queryset = queryset.filter(teacher_id=teacher_id)
+        if kinds:
+            queryset = queryset.filter(kind__in=kinds)
+        return queryset
+
+    def search(self, query, teacher_id=None, kinds=None, limit=10):
+        """Best matches first, as a list of SearchDocument."""
+        words = self.words(query)
+        if not words:
+            return []
+        return self.run(words, teacher_id, kinds, limit)
+
+    def run(self, words, teacher_id, kinds, limit):
+        raise NotImplementedError
+
+
+class SimpleBackend(SearchBackend):
+    name = 'simple'
+
+    def run(self, words, teacher_id, kinds, limit):
+        queryset = self.scoped(teacher_id, kinds)
+        for word in words:
+            queryset = queryset.filter(Q(search_text__startswith=word) | Q(search_text__contains=f' {word}'))
+        return list(queryset.order_by('title')[:limit])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    name = 'sqlite-fts5'
+
+    def run(self, words, teacher_id, kinds, limit):
+        # Quote every word so FTS5 operators typed by the user are matched literally
+        match = ' '.join(f'"{word}"*' for word in words)
+        sql = [
+            f"SELECT d.id FROM {FTS_TABLE} JOIN search_searchdocument d ON d.id = {FTS_TABLE}.rowid",
+            f"WHERE {FTS_TABLE} MATCH %s",
+        ]
+        params = [match]
+        if teacher_id is not None:
+            sql.append("AND d.teacher_id = %s")
+            params.append(teacher_id)
+        if kinds:
+            sql.append(f"AND d.kind IN ({', '.join(['%s'] * len(kinds))})")
+            params.extend(kinds)
+        sql.append(f"ORDER BY bm25({FTS_TABLE}, 10.0, 1.0), d.title LIMIT %s")
+        params.append(limit)
+        with connection.cursor() as cursor:
+            cursor.execute(' '.join(sql), params)
+            ids = [row[0] for row in cursor.fetchall()]
+        documents = SearchDocument.objects.in_bulk(ids)
+        return [documents[pk] for pk in ids if pk in documents]
+
+
+class PostgresBackend(SearchBackend):
+    name = 'postgres'
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def has_trigram():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            return cursor.fetchone() is not None
+
+    def run(self, words, teacher_id, kinds, limit):
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        # Same expression as search_doc_tsv_idx so the GIN index is used
+        matches = RawSQL(
+            "to_tsvector('simple', search_text) @@ to_tsquery('simple', %s)", [tsquery],
+            output_field=BooleanField(),
+        )
+        queryset = self.scoped(teacher_id, kinds)
+        if self.has_trigram():
+            text = ' '.join(words)
+            # `<%` is word_similarity() above pg_trgm.word_similarity_threshold, served by search_doc_trgm_idx
+            similar = RawSQL("%s <%% search_text", [text], output_field=BooleanField())
+            queryset = queryset.filter(Q(matches) | Q(similar)).annotate(
+                score=RawSQL("word_similarity(%s, search_text)", [text], output_field=FloatField())
+            ).order_by('-score', 'title')
+        else:
+            queryset = queryset.filter(matches).order_by('title')
+        return list(queryset[:limit])
+
+
+def _fts_table_exists():
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+@lru_cache(maxsize=1)
+def get_backend():
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'postgresql':
+        return PostgresBackend()
+    if connection.vendor == 'sqlite' and _fts_table_exists():
+        return SQLiteFTSBackend()
+    return SimpleBackend()
@@ -0,0 +1,128 @@
+"""
+What gets indexed for each searchable model, and helpers to write it.
+
+A builder turns a model instance into the SearchDocument fields; signals call
+`index_instance` / `remove_instance` on every save/delete and
+`manage.py rebuild_search_index` calls `rebuild` for bulk changes.
+"""
+import unicodedata
+
+from django.apps import apps as django_apps
+
+from .models import SearchDocument
+
+
+def normalize_text(value):
+    """Casefold and strip accents so 'Peña' and 'pena' index alike."""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def _student(student):
+    return {
+        'teacher_id': student.teacher_id,
+        'title': student.name,
+        'subtitle': ' · '.join(filter(None, [f'LRN {student.lrn}', student.section])),
+        'keywords': ' '.join(filter(None, [student.lrn, student.section, student.grade_level])),
+    }
+
+
+def _parent(parent):
+    return {
+        'teacher_id': parent.teacher_id,
+        'title': parent.name,
+        'subtitle': f"{parent.get_role_display()} of {parent.student.name}",
+        'keywords': ' '.join(filter(None, [
+            parent.student.name, parent.student_id, parent.username, parent.email, parent.contact_number,
+        ])),
+    }
+
+
+def _guardian(guardian):
+    return {
+        'teacher_id': guardian.teacher_id,
+        'title': guardian.name,
+        'subtitle': f"Guardian of {guardian.student_name} ({guardian.get_status_display()})",
+        'keywords': ' '.join(filter(None, [
+            guardian.student_name, guardian.student_id, guardian.relationship, guardian.contact,
+        ])),
+    }
+
+
+# kind -> (model label, builder, select_related for rebuild)
+KINDS = {
+    'student': ('parents.Student', _student, ()),
+    'parent': ('parents.ParentGuardian', _parent, ('student',)),
+    'guardian': ('guardian.Guardian', _guardian, ()),
+}
+
+
+# Documents that embed fields of another model: model label -> [(dependent kind, FK to it)]
+DEPENDENTS = {
+    'parents.Student': [('parent', 'student')],  # parent documents carry the student's name
+}
+
+
+def kind_for_model(model):
+    label = model._meta.label
+    for kind, (model_label, _, _) in KINDS.items():
+        if model_label == label:
+            return kind
+    raise KeyError(label)
+
+
+def build_document(instance, kind=None, document_model=SearchDocument):
+    kind = kind or kind_for_model(type(instance))
+    fields = KINDS[kind][1](instance)
+    fields['search_text'] = normalize_text(f"{fields['title']} {fields['keywords']}")
+    return document_model(kind=kind, object_id=str(instance.pk), **fields)
+
+
+def index_instance(instance):
+    document = build_document(instance)
+    SearchDocument.objects.update_or_create(
+        kind=document.kind,
+        object_id=document.object_id,
+        defaults={
+            field: getattr(document, field)
+            for field in ('teacher_id', 'title', 'subtitle', 'keywords', 'search_text')
+        },
+    )
+
+
+def index_dependents(instance):
+    """Reindex the documents that embed fields of `instance` (e.g. after a student is renamed)."""
+    for kind, fk in DEPENDENTS.get(instance._meta.label, ()):
+        label, _, related = KINDS[kind]
+        model = django_apps.get_model(label)
+        for dependent in model.objects.select_related(*related).filter(**{fk: instance}):
+            index_instance(dependent)
+
+
+def remove_instance(instance):
+    SearchDocument.objects.filter(kind=kind_for_model(type(instance)), object_id=str(instance.pk)).delete()
+
+
+def rebuild(get_model=None, batch_size=500):
+    """
+    Recreate every document from the source tables and return {kind: count}.
+    Migrations pass `apps.get_model` so historical models are used.
+    """
+    get_model = get_model or django_apps.get_model
+    document_model = get_model('search', 'SearchDocument')
+    document_model.objects.all().delete()
+    counts = {}
+    for kind, (label, _, related) in KINDS.items():
+        model = get_model(*label.split('.'))
+        batch = []
+        counts[kind] = 0
+        for instance in model.objects.select_related(*related).order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(build_document(instance, kind, document_model))
+            if len(batch) >= batch_size:
+                document_model.objects.bulk_create(batch)
+                counts[kind] += len(batch)
+                batch = []
+        document_model.objects.bulk_create(batch)
+        counts[kind] += len(batch)
+    return counts
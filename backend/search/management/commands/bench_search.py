@@ -0,0 +1,64 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from search.backends import SimpleBackend, get_backend
+from search.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = (
+        "Time typeahead queries (1-4 character prefixes of indexed names and LRNs) and compare the "
+        "p95 with settings.SEARCH_TYPEAHEAD_P95_MS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=300)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--compare-simple', action='store_true',
+            help='Also time the LIKE-based SimpleBackend on the same queries.',
+        )
+
+    def _queries(self, count):
+        rng = random.Random(7)
+        rows = list(SearchDocument.objects.values_list('teacher_id', 'search_text')[:5000])
+        queries = []
+        for _ in range(count if rows else 0):
+            teacher_id, text = rng.choice(rows)
+            words = text.split() or ['a']
+            word = rng.choice(words)
+            queries.append((teacher_id, word[:rng.randint(1, 4)]))
+        return queries
+
+    def _time(self, backend, queries, limit):
+        samples = []
+        for teacher_id, query in queries:
+            start = time.perf_counter()
+            backend.search(query, teacher_id=teacher_id, limit=limit)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def handle(self, *args, **options):
+        queries = self._queries(options['queries'])
+        if not queries:
+            self.stderr.write("The search index is empty; run rebuild_search_index first.")
+            return
+
+        target = getattr(settings, 'SEARCH_TYPEAHEAD_P95_MS', 50)
+        backends = [get_backend()]
+        if options['compare_simple'] and not isinstance(backends[0], SimpleBackend):
+            backends.append(SimpleBackend())
+
+        self.stdout.write(
+            f"{len(queries)} queries over {SearchDocument.objects.count()} documents, p95 target {target} ms"
+        )
+        for backend in backends:
+            backend.search(queries[0][1], teacher_id=queries[0][0])  # warm up
+            median, p95 = self._time(backend, queries, options['limit'])
+            line = f"{backend.name:<14} median {median:7.3f} ms   p95 {p95:7.3f} ms"
+            self.stdout.write(self.style.SUCCESS(line) if p95 <= target else self.style.ERROR(line))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search.documents import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the typeahead search documents from students, parent accounts and guardians. "
+        "Saves and deletes keep the index current; run this after bulk imports, loaddata or raw SQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = rebuild(batch_size=options['batch_size'])
+        summary = ', '.join(f"{count} {kind}(s)" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {summary}."))
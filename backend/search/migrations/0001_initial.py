@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('teacher', '0005_attendance_student'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('parent', 'Parent/Guardian account'), ('guardian', 'Registered guardian')], max_length=20)),
+                ('object_id', models.CharField(max_length=64)),
+                ('title', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, max_length=255)),
+                ('keywords', models.TextField(blank=True)),
+                ('search_text', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('teacher', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='teacher.teacherprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['teacher', 'kind'], name='search_doc_teacher_kind_idx')],
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,94 @@
+from django.db import DatabaseError, migrations, transaction
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_document_fts USING fts5(
+        title, keywords,
+        content='search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER search_document_ai AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_document_fts(rowid, title, keywords) VALUES (new.id, new.title, new.keywords);
+    END
+    """,
+    """
+    CREATE TRIGGER search_document_ad AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_document_fts(search_document_fts, rowid, title, keywords)
+        VALUES ('delete', old.id, old.title, old.keywords);
+    END
+    """,
+    """
+    CREATE TRIGGER search_document_au AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_document_fts(search_document_fts, rowid, title, keywords)
+        VALUES ('delete', old.id, old.title, old.keywords);
+        INSERT INTO search_document_fts(rowid, title, keywords) VALUES (new.id, new.title, new.keywords);
+    END
+    """,
+    "INSERT INTO search_document_fts(search_document_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS search_document_au",
+    "DROP TRIGGER IF EXISTS search_document_ad",
+    "DROP TRIGGER IF EXISTS search_document_ai",
+    "DROP TABLE IF EXISTS search_document_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX search_doc_tsv_idx ON search_searchdocument USING gin (to_tsvector('simple', search_text))",
+]
+
+POSTGRES_TRIGRAM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX search_doc_trgm_idx ON search_searchdocument USING gin (search_text gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS search_doc_trgm_idx",
+    "DROP INDEX IF EXISTS search_doc_tsv_idx",
+]
+
+
+def _execute(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            with transaction.atomic():
+                _execute(schema_editor, SQLITE_FORWARD)
+        except DatabaseError as exc:
+            # SQLite built without FTS5: search.backends falls back to LIKE
+            print(f"\n  FTS5 unavailable ({exc}); search will use the simple backend")
+    elif vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_FORWARD)
+        try:
+            with transaction.atomic():
+                _execute(schema_editor, POSTGRES_TRIGRAM)
+        except DatabaseError as exc:
+            # No permission to create extensions: prefix search still works, typo matching does not
+            print(f"\n  pg_trgm unavailable ({exc}); fuzzy matching disabled")
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _execute(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _execute(schema_editor, POSTGRES_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def populate(apps, schema_editor):
+    from search.documents import rebuild
+    counts = rebuild(apps.get_model)
+    if any(counts.values()):
+        print("\n  Indexed " + ", ".join(f"{count} {kind}(s)" for kind, count in counts.items()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0002_fulltext_index'),
+        ('guardian', '0009_guardian_student_backfill'),
+        ('parents', '0013_section_ref'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
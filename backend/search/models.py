@@ -0,0 +1,37 @@
+from django.db import models
+from teacher.models import TeacherProfile
+
+
+class SearchDocument(models.Model):
+    """
+    One row per searchable student, parent/guardian account or registered
+    guardian. The text columns are what the full-text index covers; the
+    source rows are never scanned by the typeahead.
+    """
+    KIND_CHOICES = [
+        ('student', 'Student'),
+        ('parent', 'Parent/Guardian account'),
+        ('guardian', 'Registered guardian'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64)
+    teacher = models.ForeignKey(
+        TeacherProfile, on_delete=models.CASCADE, null=True, blank=True, related_name='search_documents'
+    )
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    # LRN, contact details and related names: matched, never displayed
+    keywords = models.TextField(blank=True)
+    # casefolded, accent-stripped title + keywords for the Postgres/fallback backends
+    search_text = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['kind', 'object_id']
+        indexes = [
+            models.Index(fields=['teacher', 'kind'], name='search_doc_teacher_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
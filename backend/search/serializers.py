@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import SearchDocument
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='object_id', read_only=True)
+
+    class Meta:
+        model = SearchDocument
+        fields = ['kind', 'id', 'title', 'subtitle']
@@ -0,0 +1,22 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .documents import KINDS, index_dependents, index_instance, remove_instance
+
+
+def _saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:  # loaddata: run rebuild_search_index afterwards
+        return
+    index_instance(instance)
+    if not created:
+        index_dependents(instance)
+
+
+def _deleted(sender, instance, **kwargs):
+    remove_instance(instance)
+
+
+for label, _, _ in KINDS.values():
+    model = apps.get_model(label)
+    post_save.connect(_saved, sender=model, dispatch_uid=f'search_index_{label}')
+    post_delete.connect(_deleted, sender=model, dispatch_uid=f'search_remove_{label}')
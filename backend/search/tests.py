@@ -0,0 +1,26 @@
+from django.test import TestCase
+
+from parents.models import ParentGuardian, Student
+from teacher.tests import make_teacher
+
+from .backends import get_backend
+from .models import SearchDocument
+
+
+class StudentRenameTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher()
+        self.student = Student.objects.create(lrn='1001', name='Ana Cruz', teacher=self.teacher, section='Rose')
+        self.parent = ParentGuardian.objects.create(
+            student=self.student, teacher=self.teacher, name='Maria Santos', role='Parent1'
+        )
+
+    def test_rename_reindexes_parent_documents(self):
+        self.student.name = 'Ana Reyes'
+        self.student.save()
+
+        document = SearchDocument.objects.get(kind='parent', object_id=str(self.parent.pk))
+        self.assertIn('ana reyes', document.search_text)
+        self.assertNotIn('cruz', document.search_text)
+        hits = get_backend().search('reyes', teacher_id=self.teacher.pk, kinds=['parent'])
+        self.assertEqual([hit.object_id for hit in hits], [str(self.parent.pk)])
@@ -0,0 +1,60 @@
+import time
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from teacher.models import TeacherProfile
+from .backends import get_backend
+from .models import SearchDocument
+from .serializers import SearchResultSerializer
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class SearchView(APIView):
+    """
+    Typeahead over the teacher's students, parent accounts and guardians.
+
+    GET /api/search/?q=ana re&kinds=student,guardian&limit=10
+    Every word in `q` is matched as a prefix of a name, LRN or contact detail.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            teacher_profile = TeacherProfile.objects.filter(user=request.user).only('id').first()
+            if not teacher_profile:
+                return Response(
+                    {"error": "Teacher profile not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            query = request.query_params.get('q', '').strip()
+            valid_kinds = {kind for kind, _ in SearchDocument.KIND_CHOICES}
+            kinds = [k for k in request.query_params.get('kinds', '').split(',') if k in valid_kinds]
+            try:
+                limit = max(1, min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+            except (TypeError, ValueError):
+                limit = DEFAULT_LIMIT
+
+            backend = get_backend()
+            start = time.perf_counter()
+            documents = backend.search(query, teacher_id=teacher_profile.id, kinds=kinds, limit=limit)
+            took_ms = (time.perf_counter() - start) * 1000
+
+            response = Response({
+                "query": query,
+                "count": len(documents),
+                "took_ms": round(took_ms, 2),
+                "results": SearchResultSerializer(documents, many=True).data,
+            }, status=status.HTTP_200_OK)
+            response['Server-Timing'] = f'search;desc="{backend.name}";dur={took_ms:.2f}'
+            return response
+
+        except Exception as e:
+            return Response(
+                {"error": f"Error searching: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
@@ -0,0 +1,98 @@
+"""
+Absences generated from missing scans.
+
+On a school day, every student on a teacher's roster who has no attendance
+scan for that day (other than one marking them absent) and no absence yet
+is marked absent. A scan counts when it is linked to the student or, left
+unlinked (typed by hand, or an LRN that did not resolve), carries their
+LRN or their name under their teacher; absences match by name the same
+way. The roster-minus-scanned difference is one query over all teachers
+(NOT EXISTS subqueries on the attendance and absence student/day
+indexes), and the missing rows go in with bulk_create, so a day costs a
+few queries whatever the roster size. Students who already
+have an absence that day are left out of the difference, which makes a
+re-run of the same day a no-op.
+"""
+from collections import Counter
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from parents.models import Student
+
+from .models import Absence, Attendance, Dropout, TeacherProfile
+
+BATCH_SIZE = 500
+REASON = 'No attendance scan recorded'
+
+# A scan with one of these statuses does not put the student in school
+NOT_PRESENT = ('Absent', 'Dropped Out')
+
+
+def holidays():
+    return {value if isinstance(value, date) else date.fromisoformat(value) for value in settings.SCHOOL_HOLIDAYS}
+
+
+def is_school_day(day):
+    return day.weekday() in settings.SCHOOL_DAYS and day not in holidays()
+
+
+def school_days(start, end):
+    """School days from `start` to `end`, both included."""
+    days, day = [], start
+    while day <= end:
+        if is_school_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def missing_students(day, teacher_ids=None):
+    """Students with neither a scan nor an absence on `day` (the roster minus the scanned)."""
+    scanned = Attendance.objects.filter(
+        Q(student=OuterRef('pk'))
+        | Q(student__isnull=True, student_lrn=OuterRef('lrn'))
+        | Q(student__isnull=True, teacher_id=OuterRef('teacher_id'), student_name__iexact=OuterRef('name')),
+        date=day,
+    ).exclude(status__in=NOT_PRESENT)
+    absent = Absence.objects.filter(
+        Q(student=OuterRef('pk')) | Q(
+            student__isnull=True, teacher_id=OuterRef('teacher_id'), student_name__iexact=OuterRef('name')
+        ),
+        date=day,
+    )
+    dropped = Dropout.objects.filter(
+        teacher_id=OuterRef('teacher_id'), student_name__iexact=OuterRef('name'), date__lte=day
+    )
+    students = Student.objects.filter(created_at__date__lte=day).exclude(
+        Exists(scanned) | Exists(absent) | Exists(dropped)
+    )
+    if teacher_ids is not None:
+        students = students.filter(teacher_id__in=teacher_ids)
+    return students
+
+
+def generate_for_day(day, teacher_ids=None, dry_run=False):
+    """
+    Create the missing absences for `day`; returns {teacher id: absences
+    created} (what would be created, with `dry_run`). Nothing on non-school days.
+    """
+    if not is_school_day(day):
+        return Counter()
+    with transaction.atomic():
+        # Serializes overlapping runs on PostgreSQL so the difference is not taken twice
+        teachers = TeacherProfile.objects.select_for_update().order_by('pk')
+        if teacher_ids is not None:
+            teachers = teachers.filter(pk__in=teacher_ids)
+        list(teachers.values_list('pk', flat=True))
+
+        rows = missing_students(day, teacher_ids).order_by().values_list('lrn', 'name', 'teacher_id')
+        absences = [
+            Absence(teacher_id=teacher_id, student_id=lrn, student_name=name, date=day, reason=REASON, generated=True)
+            for lrn, name, teacher_id in rows
+        ]
+        if not dry_run:
+            Absence.objects.bulk_create(absences, batch_size=BATCH_SIZE)
+    return Counter(absence.teacher_id for absence in absences)
@@ -14,6 +14,7 @@ class AttendanceAdmin(admin.ModelAdmin):
     list_filter = ['status', 'transaction_type', 'date', 'session', 'gender', 'teacher']
     date_hierarchy = 'date'
     ordering = ['-date', '-timestamp']
+    raw_id_fields = ['student']
 
 @admin.register(UnauthorizedPerson)
 class UnauthorizedPersonAdmin(admin.ModelAdmin):
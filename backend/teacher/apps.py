@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TeacherConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'teacher'
+
+    def ready(self):
+        from backend.thumbnails import track_thumbnails
+
+        from . import roster, snapshot  # noqa: F401  (connect their signal handlers)
+        from .models import UnauthorizedPerson
+
+        track_thumbnails(UnauthorizedPerson)  # builds photo thumbnails on upload, drops replaced ones
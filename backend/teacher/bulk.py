@@ -0,0 +1,186 @@
+"""
+Bulk create/update/delete of a teacher's attendance, absence and dropout rows.
+
+POST .../bulk/ with
+
+    {"operations": [
+        {"op": "create", "data": {"student_name": "Ana Cruz", "date": "2026-10-19", "reason": "Sick"}},
+        {"op": "update", "id": 41, "data": {"status": "Late"}},
+        {"op": "delete", "id": 42}
+    ], "atomic": false}
+
+validates every operation, checks that all the referenced ids belong to the
+teacher with one `pk__in` query, then applies the valid ones in a single
+transaction: one bulk_create, one bulk_update and one delete. The response
+has a result per operation, in order. Invalid operations are skipped (207)
+unless "atomic" is true, in which case nothing is applied (400).
+
+bulk_create/bulk_update skip Model.save() and post_save, so each model's
+`prepare` fills in what save() would derive and `applied` does what the
+post_save receivers would.
+"""
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from parents.models import Student
+
+from .models import Absence, Attendance, Dropout
+from .roster import invalidate_roster_state, student_pk_for_lrn
+from .serializers import AbsenceSerializer, AttendanceSerializer, DropoutSerializer
+
+DEFAULT_MAX_OPERATIONS = 500
+OPERATIONS = ('create', 'update', 'delete')
+
+
+class BulkOperations:
+    model = None
+    serializer_class = None
+
+    def normalize(self, data):
+        """Request data of one create/update, before validation."""
+        return data
+
+    def prepare(self, teacher, items):
+        """Set derived fields on the (instance, validated data) pairs; returns extra fields to update."""
+        return ()
+
+    def applied(self, teacher):
+        """Called once after the transaction commits."""
+
+
+class AttendanceOperations(BulkOperations):
+    model = Attendance
+    serializer_class = AttendanceSerializer
+
+    def normalize(self, data):
+        # Same status -> transaction_type rule as attendance_detail
+        if 'status' in data:
+            data = dict(data)
+            data['transaction_type'] = {'Drop-off': 'drop-off', 'Pick-up': 'pick-up'}.get(data['status'], 'attendance')
+        return data
+
+    def prepare(self, teacher, items):
+        now = timezone.now()
+        for attendance, data in items:
+            if 'student_lrn' in data and attendance.student_lrn:
+                attendance.student_id = student_pk_for_lrn(attendance.student_lrn)
+            attendance.updated_at = now  # auto_now is not applied by bulk_update
+        return ('student', 'updated_at')
+
+    def applied(self, teacher):
+        invalidate_roster_state(teacher.pk)
+
+
+class AbsenceOperations(BulkOperations):
+    model = Absence
+    serializer_class = AbsenceSerializer
+
+    def prepare(self, teacher, items):
+        if not any('student_name' in data for _, data in items):
+            return ()
+        # Absence.save() rule, with the teacher's names fetched once
+        by_name = {}
+        for lrn, name in Student.objects.filter(teacher=teacher).values_list('lrn', 'name'):
+            key = name.strip().casefold()
+            by_name[key] = None if key in by_name else lrn  # None marks a duplicate name
+        for absence, data in items:
+            if 'student_name' in data:
+                absence.student_id = by_name.get(absence.student_name.strip().casefold())
+        return ('student',)
+
+
+class DropoutOperations(BulkOperations):
+    model = Dropout
+    serializer_class = DropoutSerializer
+
+
+def _result(index, op, code, **extra):
+    return {'index': index, 'op': op, 'status': code, **extra}
+
+
+def apply_operations(operations_class, teacher, operations, atomic=False):
+    """Validate and apply `operations`; returns (results, HTTP status)."""
+    handler = operations_class()
+    model, serializer_class = handler.model, handler.serializer_class
+    results = [None] * len(operations)
+
+    ids, seen = [], set()
+    for index, spec in enumerate(operations):
+        op = spec.get('op') if isinstance(spec, dict) else None
+        if op not in OPERATIONS:
+            results[index] = _result(index, op, status.HTTP_400_BAD_REQUEST, error=f"op must be one of {', '.join(OPERATIONS)}")
+        elif op != 'create':
+            pk = spec.get('id')
+            if not isinstance(pk, int) or isinstance(pk, bool):
+                results[index] = _result(index, op, status.HTTP_400_BAD_REQUEST, error='id must be an integer')
+            elif pk in seen:
+                results[index] = _result(index, op, status.HTTP_400_BAD_REQUEST, id=pk, error='id appears more than once')
+            else:
+                seen.add(pk)
+                ids.append(pk)
+
+    # Ownership of every referenced row in one query
+    owned = model.objects.filter(teacher=teacher).in_bulk(ids)
+
+    creates, updates, deletes, update_fields = [], [], [], set()
+    for index, spec in enumerate(operations):
+        if results[index] is not None:
+            continue
+        op = spec['op']
+        instance = None
+        if op != 'create':
+            instance = owned.get(spec['id'])
+            if instance is None:
+                results[index] = _result(index, op, status.HTTP_404_NOT_FOUND, id=spec['id'], error='Not found')
+                continue
+        if op == 'delete':
+            deletes.append((index, instance.pk))
+            continue
+        data = spec.get('data')
+        if not isinstance(data, dict):
+            results[index] = _result(index, op, status.HTTP_400_BAD_REQUEST, error='data must be an object')
+            continue
+        serializer = serializer_class(instance, data=handler.normalize(data), partial=op == 'update')
+        if not serializer.is_valid():
+            results[index] = _result(index, op, status.HTTP_400_BAD_REQUEST, errors=serializer.errors)
+            continue
+        validated = serializer.validated_data
+        if op == 'create':
+            creates.append((index, model(teacher=teacher, **validated), validated))
+        else:
+            for name, value in validated.items():
+                setattr(instance, name, value)
+            update_fields.update(validated)
+            updates.append((index, instance, validated))
+
+    if atomic and any(result is not None for result in results):
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = _result(
+                    index, operations[index]['op'], status.HTTP_424_FAILED_DEPENDENCY,
+                    error='Not applied: another operation failed'
+                )
+        return results, status.HTTP_400_BAD_REQUEST
+
+    with transaction.atomic():
+        update_fields.update(handler.prepare(teacher, [(obj, data) for _, obj, data in creates + updates]))
+        created = model.objects.bulk_create([obj for _, obj, _ in creates])
+        if updates and update_fields:
+            model.objects.bulk_update([obj for _, obj, _ in updates], sorted(update_fields))
+        if deletes:
+            # Queryset delete still sends post_delete per row (sync tombstones, roster state)
+            model.objects.filter(pk__in=[pk for _, pk in deletes]).delete()
+        transaction.on_commit(lambda: handler.applied(teacher))
+
+    for (index, _, _), obj in zip(creates, created):
+        obj.teacher = teacher
+        results[index] = _result(index, 'create', status.HTTP_201_CREATED, id=obj.pk, data=serializer_class(obj).data)
+    for index, obj, _ in updates:
+        obj.teacher = teacher
+        results[index] = _result(index, 'update', status.HTTP_200_OK, id=obj.pk, data=serializer_class(obj).data)
+    for index, pk in deletes:
+        results[index] = _result(index, 'delete', status.HTTP_204_NO_CONTENT, id=pk)
+
+    failed = any(result['status'] >= 400 for result in results)
+    return results, status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
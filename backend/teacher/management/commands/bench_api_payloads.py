@@ -0,0 +1,98 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from backend import compression
+from backend.renderers import MessagePackRenderer, msgpack
+from teacher.models import TeacherProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure bytes on the wire (JSON, gzip, brotli, MessagePack) and render/compress CPU time "
+        "for the largest API responses, as seen by one teacher."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teacher', type=int, help='TeacherProfile id (default: the one with most attendance).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs per measurement (median is shown).')
+
+    def _endpoints(self, teacher):
+        return [
+            ('attendance', '/api/attendance/', {}),
+            ('teacher roster', '/api/parents/teacher-students/', {}),
+            ('all-teachers roster', '/api/parents/all-teachers-students/', {}),
+            ('guardians', '/api/guardian/', {}),
+            ('guardians public', '/api/guardian/public/', {'teacher': teacher.id}),
+        ]
+
+    def _time(self, func, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return result, statistics.median(samples)
+
+    def handle(self, *args, **options):
+        if options['teacher']:
+            teacher = TeacherProfile.objects.filter(pk=options['teacher']).select_related('user').first()
+        else:
+            teacher = (
+                TeacherProfile.objects.annotate(n=Count('attendances')).order_by('-n').select_related('user').first()
+            )
+        if teacher is None:
+            raise CommandError("No teacher profile found.")
+
+        repeat = max(1, options['repeat'])
+        client = APIClient()
+        client.force_authenticate(teacher.user)
+        json_renderer = JSONRenderer()
+        msgpack_renderer = MessagePackRenderer() if msgpack is not None else None
+        brotli_available = compression.brotli is not None
+
+        self.stdout.write(f"Teacher #{teacher.id} ({teacher.user.username}), median of {repeat} run(s)")
+        self.stdout.write(
+            f"{'endpoint':<22}{'json B':>10}{'gzip B':>10}{'br B':>10}{'msgpack B':>11}"
+            f"{'json ms':>9}{'msgpack ms':>12}{'gzip ms':>9}{'br ms':>8}"
+        )
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, path, params in self._endpoints(teacher):
+                response = client.get(path, params, HTTP_ACCEPT='application/json')
+                if response.status_code != 200 or not hasattr(response, 'data'):
+                    self.stderr.write(f"{label}: HTTP {response.status_code}, skipped")
+                    continue
+
+                body, json_ms = self._time(lambda: json_renderer.render(response.data), repeat)
+                gzipped, gzip_ms = self._time(lambda: compression.compress(body, 'gzip'), repeat)
+                row = [f"{label:<22}", f"{len(body):>10}", f"{len(gzipped):>10}"]
+                if brotli_available:
+                    brotlied, br_ms = self._time(lambda: compression.compress(body, 'br'), repeat)
+                    row.append(f"{len(brotlied):>10}")
+                else:
+                    br_ms = None
+                    row.append(f"{'-':>10}")
+                if msgpack_renderer is not None:
+                    packed, msgpack_ms = self._time(lambda: msgpack_renderer.render(response.data), repeat)
+                    row.append(f"{len(packed):>11}")
+                else:
+                    msgpack_ms = None
+                    row.append(f"{'-':>11}")
+                row += [
+                    f"{json_ms:>9.2f}",
+                    f"{msgpack_ms:>12.2f}" if msgpack_ms is not None else f"{'-':>12}",
+                    f"{gzip_ms:>9.2f}",
+                    f"{br_ms:>8.2f}" if br_ms is not None else f"{'-':>8}",
+                ]
+                self.stdout.write(''.join(row))
+
+        if not brotli_available or msgpack_renderer is None:
+            missing = [name for name, ok in (('brotli', brotli_available), ('msgpack', msgpack_renderer)) if not ok]
+            self.stdout.write(f"Not installed: {', '.join(missing)} (columns shown as -)")
+        self.stdout.write(self.style.SUCCESS("Done."))
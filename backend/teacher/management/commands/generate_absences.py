@@ -0,0 +1,82 @@
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from teacher.absences import generate_for_day, is_school_day, school_days
+from teacher.models import TeacherProfile
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark students absent who had no attendance scan on a school day (weekends and "
+        "SCHOOL_HOLIDAYS are skipped). Safe to re-run: students already marked absent are left "
+        "alone. Runs once (for cron), or with --loop every day at --at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to process, YYYY-MM-DD (default: today).')
+        parser.add_argument('--since', help='Also process every school day from this date up to --date.')
+        parser.add_argument('--teacher', action='append', help='Only this teacher (username); repeatable.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be created without saving.')
+        parser.add_argument('--loop', action='store_true', help='Keep running and process each day at --at.')
+        parser.add_argument('--at', default='18:00', help='With --loop: local time to run each day, HH:MM.')
+
+    def handle(self, *args, **options):
+        teacher_ids = None
+        if options['teacher']:
+            teachers = dict(
+                TeacherProfile.objects.filter(user__username__in=options['teacher'])
+                .values_list('user__username', 'pk')
+            )
+            unknown = set(options['teacher']) - teachers.keys()
+            if unknown:
+                raise CommandError(f"Unknown teacher(s): {', '.join(sorted(unknown))}")
+            teacher_ids = list(teachers.values())
+
+        if not options['loop']:
+            end = _date(options['date']) if options['date'] else timezone.localdate()
+            start = _date(options['since']) if options['since'] else end
+            if start > end:
+                raise CommandError("--since must not be after --date.")
+            days = school_days(start, end)
+            if not days:
+                self.stdout.write("No school days in range; nothing to do.")
+            for day in days:
+                self._run(day, teacher_ids, options['dry_run'])
+            return
+
+        try:
+            run_at = datetime.strptime(options['at'], '%H:%M').time()
+        except ValueError:
+            raise CommandError(f"Invalid --at {options['at']!r}; use HH:MM.")
+        self.stdout.write(f"Generating absences daily at {run_at:%H:%M}; Ctrl+C to stop.")
+        try:
+            while True:
+                now = timezone.localtime()
+                next_run = now.replace(hour=run_at.hour, minute=run_at.minute, second=0, microsecond=0)
+                if next_run <= now:
+                    next_run += timedelta(days=1)
+                time.sleep((next_run - now).total_seconds())
+                if is_school_day(next_run.date()):
+                    self._run(next_run.date(), teacher_ids, options['dry_run'])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped.")
+
+    def _run(self, day, teacher_ids, dry_run):
+        created = generate_for_day(day, teacher_ids, dry_run=dry_run)
+        names = dict(TeacherProfile.objects.filter(pk__in=created).values_list('pk', 'user__username'))
+        for teacher_id, count in sorted(created.items(), key=lambda item: names.get(item[0], '')):
+            self.stdout.write(f"  {names.get(teacher_id, teacher_id)}: {count}")
+        verb = 'Would create' if dry_run else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"{day}: {verb} {sum(created.values())} absence(s) for {len(created)} teacher(s)."
+        ))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from teacher.models import RosterChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete roster change-log entries older than --days. Scanners whose version predates the "
+        "remaining log get a full snapshot instead of a delta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Keep the newest entry so the log always shows how far it has been pruned
+        newest = RosterChange.objects.aggregate(v=Max('id'))['v']
+        deleted, _ = RosterChange.objects.filter(created_at__lt=cutoff).exclude(id=newest).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} roster change(s) older than {options['days']} day(s)."))
@@ -0,0 +1,114 @@
+import base64
+import binascii
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+BATCH_SIZE = 200
+
+_MIME_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+
+def _decode_photo(value):
+    """Return (bytes, extension) for a base64 string or data URL, or (None, None)."""
+    value = (value or '').strip()
+    if not value:
+        return None, None
+    extension = None
+    if value.startswith('data:') and 'base64,' in value:
+        header, value = value.split('base64,', 1)
+        extension = _MIME_EXTENSIONS.get(header[5:].rstrip(';').lower())
+    try:
+        data = base64.b64decode(value, validate=False)
+    except (binascii.Error, ValueError):
+        return None, None
+    if not data:
+        return None, None
+    if extension is None:
+        if data.startswith(b'\x89PNG'):
+            extension = '.png'
+        elif data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+            extension = '.webp'
+        else:
+            extension = '.jpg'
+    return data, extension
+
+
+def move_photos_to_storage(apps, schema_editor):
+    """
+    Decode base64 photos into files, BATCH_SIZE rows at a time, so the whole
+    table (and every image in it) is never held in memory at once.
+    """
+    UnauthorizedPerson = apps.get_model('teacher', 'UnauthorizedPerson')
+    pks = list(
+        UnauthorizedPerson.objects.exclude(photo__isnull=True).exclude(photo='')
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    moved = skipped = 0
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = UnauthorizedPerson.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).only('pk', 'photo')
+        updated = []
+        for person in batch:
+            data, extension = _decode_photo(person.photo)
+            if data is None:
+                skipped += 1
+                continue
+            person.photo_file = default_storage.save(
+                f'unauthorized_photos/unauthorized_{person.pk}{extension}', ContentFile(data)
+            )
+            updated.append(person)
+        UnauthorizedPerson.objects.bulk_update(updated, ['photo_file'])
+        moved += len(updated)
+    if moved or skipped:
+        print(f"\n  Moved {moved} unauthorized person photo(s) to storage, skipped {skipped} undecodable")
+
+
+def restore_photos_to_rows(apps, schema_editor):
+    UnauthorizedPerson = apps.get_model('teacher', 'UnauthorizedPerson')
+    pks = list(
+        UnauthorizedPerson.objects.exclude(photo_file__isnull=True).exclude(photo_file='')
+        .order_by('pk').values_list('pk', flat=True)
+    )
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = UnauthorizedPerson.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).only('pk', 'photo_file')
+        updated = []
+        for person in batch:
+            try:
+                with default_storage.open(person.photo_file.name, 'rb') as fh:
+                    person.photo = base64.b64encode(fh.read()).decode('ascii')
+            except (OSError, ValueError):
+                continue
+            updated.append(person)
+        UnauthorizedPerson.objects.bulk_update(updated, ['photo'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teacher', '0002_alter_attendance_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unauthorizedperson',
+            name='photo_file',
+            field=models.ImageField(blank=True, null=True, upload_to='unauthorized_photos/'),
+        ),
+        migrations.RunPython(move_photos_to_storage, restore_photos_to_rows),
+        migrations.RemoveField(
+            model_name='unauthorizedperson',
+            name='photo',
+        ),
+        migrations.RenameField(
+            model_name='unauthorizedperson',
+            old_name='photo_file',
+            new_name='photo',
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def _normalize(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def link_teacher_sections(apps, schema_editor):
+    """Create one Section per distinct (case/whitespace-normalized) teacher section."""
+    Section = apps.get_model('teacher', 'Section')
+    TeacherProfile = apps.get_model('teacher', 'TeacherProfile')
+    sections = {}
+    teachers = list(TeacherProfile.objects.only('pk', 'section').order_by('pk'))
+    for teacher in teachers:
+        key = _normalize(teacher.section)
+        if not key:
+            continue
+        if key not in sections:
+            sections[key], _ = Section.objects.get_or_create(
+                normalized_name=key, defaults={'name': ' '.join(teacher.section.split())[:50]}
+            )
+        teacher.section_ref = sections[key]
+    TeacherProfile.objects.bulk_update(teachers, ['section_ref'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teacher', '0003_unauthorizedperson_photo_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Section',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('normalized_name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='teacherprofile',
+            name='section_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='teachers', to='teacher.section'),
+        ),
+        migrations.RunPython(link_teacher_sections, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _name_key(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def link_students(apps, schema_editor):
+    """
+    Point Attendance.student at the Student with the scanned LRN, or, for rows
+    without a usable LRN, at the teacher's only student with that name.
+    Ambiguous or unknown names are left NULL. Runs BATCH_SIZE rows at a time.
+    """
+    Attendance = apps.get_model('teacher', 'Attendance')
+    Student = apps.get_model('parents', 'Student')
+
+    by_lrn = {lrn.strip(): lrn for lrn in Student.objects.values_list('lrn', flat=True)}
+    by_name = {}
+    for lrn, teacher_id, name in Student.objects.values_list('lrn', 'teacher_id', 'name'):
+        key = (teacher_id, _name_key(name))
+        by_name[key] = None if key in by_name else lrn  # None marks a duplicate name
+
+    pks = list(Attendance.objects.filter(student__isnull=True).order_by('pk').values_list('pk', flat=True))
+    linked = 0
+    for start in range(0, len(pks), BATCH_SIZE):
+        rows = list(
+            Attendance.objects.filter(pk__in=pks[start:start + BATCH_SIZE])
+            .only('pk', 'teacher_id', 'student_lrn', 'student_name')
+        )
+        updated = []
+        for row in rows:
+            student_id = by_lrn.get((row.student_lrn or '').strip())
+            if student_id is None:
+                student_id = by_name.get((row.teacher_id, _name_key(row.student_name)))
+            if student_id is not None:
+                row.student_id = student_id
+                updated.append(row)
+        Attendance.objects.bulk_update(updated, ['student'])
+        linked += len(updated)
+    if pks:
+        print(f"\n  Linked {linked} of {len(pks)} attendance row(s) to a student")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0013_section_ref'),
+        ('teacher', '0004_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendances', to='parents.student'),
+        ),
+        migrations.RunPython(link_students, migrations.RunPython.noop),
+    ]
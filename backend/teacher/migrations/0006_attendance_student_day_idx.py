@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0013_section_ref'),
+        ('teacher', '0005_attendance_student'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'date', '-timestamp'], name='attendance_student_day_idx'),
+        ),
+    ]
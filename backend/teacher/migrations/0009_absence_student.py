@@ -0,0 +1,65 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def _name_key(name):
+    return ' '.join((name or '').split()).casefold()
+
+
+def link_students(apps, schema_editor):
+    """
+    Point existing absences at the teacher's only student with that name
+    (ambiguous or unknown names stay NULL), BATCH_SIZE rows at a time.
+    """
+    Absence = apps.get_model('teacher', 'Absence')
+    Student = apps.get_model('parents', 'Student')
+
+    by_name = {}
+    for lrn, teacher_id, name in Student.objects.values_list('lrn', 'teacher_id', 'name'):
+        key = (teacher_id, _name_key(name))
+        by_name[key] = None if key in by_name else lrn  # None marks a duplicate name
+
+    pks = list(Absence.objects.filter(student__isnull=True).order_by('pk').values_list('pk', flat=True))
+    linked = 0
+    for start in range(0, len(pks), BATCH_SIZE):
+        rows = list(Absence.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).only('pk', 'teacher_id', 'student_name'))
+        updated = []
+        for row in rows:
+            student_id = by_name.get((row.teacher_id, _name_key(row.student_name)))
+            if student_id is not None:
+                row.student_id = student_id
+                updated.append(row)
+        Absence.objects.bulk_update(updated, ['student'])
+        linked += len(updated)
+    if pks:
+        print(f"\n  Linked {linked} of {len(pks)} absence(s) to a student")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0019_schedule_minute_of_week'),
+        ('teacher', '0008_attendance_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='absence',
+            name='generated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='absence',
+            name='student',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='absences', to='parents.student'),
+        ),
+        migrations.AddIndex(
+            model_name='absence',
+            index=models.Index(fields=['student', 'date'], name='absence_student_day_idx'),
+        ),
+        migrations.RunPython(link_students, migrations.RunPython.noop),
+    ]
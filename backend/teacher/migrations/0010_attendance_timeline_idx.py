@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-19 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parents', '0019_schedule_minute_of_week'),
+        ('teacher', '0009_absence_student'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', '-timestamp'], name='attendance_timeline_idx'),
+        ),
+    ]
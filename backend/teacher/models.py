@@ -1,17 +1,65 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class Section(models.Model):
+    """
+    A class section (e.g. "Grade 1 - Rose"). Teachers, students and events keep
+    their free-text `section` for display, and point here through `section_ref`
+    so section-scoped queries are plain integer-key joins instead of iexact scans.
+    """
+    name = models.CharField(max_length=50)
+    normalized_name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    @staticmethod
+    def normalize(name):
+        """Case- and whitespace-insensitive key: '  grade 1 -  ROSE' -> 'grade 1 - rose'"""
+        return ' '.join((name or '').split()).casefold()
+
+    @classmethod
+    def for_name(cls, name):
+        """Return the Section for a free-text name, creating it on first use (None for blank)."""
+        key = cls.normalize(name)
+        if not key:
+            return None
+        section, _ = cls.objects.get_or_create(
+            normalized_name=key,
+            defaults={'name': ' '.join(name.split())[:50]},
+        )
+        return section
+
+    @classmethod
+    def lookup(cls, name):
+        """Existing Section for a free-text name, or None (never creates)."""
+        key = cls.normalize(name)
+        if not key:
+            return None
+        return cls.objects.filter(normalized_name=key).first()
+
 class TeacherProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     age = models.IntegerField()
     gender = models.CharField(max_length=10)
     section = models.CharField(max_length=50)
+    section_ref = models.ForeignKey(
+        Section, on_delete=models.SET_NULL, null=True, blank=True, related_name='teachers'
+    )
     contact = models.CharField(max_length=15)
     address = models.TextField()
 
     def __str__(self):
         return self.user.username
 
+    def save(self, *args, **kwargs):
+        # Keep the normalized section FK in sync with the free-text field
+        self.section_ref = Section.for_name(self.section)
+        super().save(*args, **kwargs)
+
 class Attendance(models.Model):
     STATUS_CHOICES = [
         ('Present', 'Present'),
@@ -34,12 +82,17 @@ class Attendance(models.Model):
     teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name='attendances')
     student_name = models.CharField(max_length=100)
     student_lrn = models.CharField(max_length=50, blank=True, null=True)
+    # Resolved from student_lrn on save; name/LRN/gender above stay as scanned
+    student = models.ForeignKey(
+        'parents.Student', on_delete=models.SET_NULL, null=True, blank=True, related_name='attendances'
+    )
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, default='Male')
     guardian_name = models.CharField(max_length=100, blank=True, null=True)
     date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Present')
     qr_code_data = models.TextField(blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     session = models.CharField(
         max_length=2,
         choices=[('AM', 'Morning'), ('PM', 'Afternoon')],
@@ -55,23 +108,58 @@ class Attendance(models.Model):
     
     class Meta:
         ordering = ['-date', '-timestamp']
+        indexes = [
+            # Latest transaction per student per day (roster state)
+            models.Index(fields=['student', 'date', '-timestamp'], name='attendance_student_day_idx'),
+            # Parent app delta sync (parents/sync.py)
+            models.Index(fields=['student', 'updated_at'], name='attendance_sync_idx'),
+            # Student timeline pages, newest first (parents/timeline.py)
+            models.Index(fields=['student', '-timestamp'], name='attendance_timeline_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student_name} - {self.status} ({self.transaction_type}) - {self.date}"
 
+    def save(self, *args, **kwargs):
+        if self.student_lrn:
+            from .roster import student_pk_for_lrn  # roster imports parents.models
+            self.student_id = student_pk_for_lrn(self.student_lrn)
+        super().save(*args, **kwargs)
+
 class Absence(models.Model):
     teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name='absences')
     student_name = models.CharField(max_length=100)
+    # Resolved from student_name on save when the teacher has exactly one student by that name
+    student = models.ForeignKey(
+        'parents.Student', on_delete=models.SET_NULL, null=True, blank=True, related_name='absences'
+    )
     date = models.DateField()
     reason = models.TextField()
+    # Created by the generate_absences command rather than by the teacher
+    generated = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-date', '-timestamp']
+        indexes = [
+            # "Already absent that day" check of generate_absences (teacher/absences.py)
+            models.Index(fields=['student', 'date'], name='absence_student_day_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student_name} - Absent on {self.date}"
 
+    def save(self, *args, **kwargs):
+        if self.student_id is None and self.teacher_id and self.student_name:
+            from parents.models import Student  # parents.models imports this module
+            matches = list(
+                Student.objects.filter(teacher_id=self.teacher_id, name__iexact=self.student_name.strip())
+                .values_list('lrn', flat=True)[:2]
+            )
+            if len(matches) == 1:
+                self.student_id = matches[0]
+        super().save(*args, **kwargs)
+
 class Dropout(models.Model):
     teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name='dropouts')
     student_name = models.CharField(max_length=100)
@@ -94,11 +182,40 @@ class UnauthorizedPerson(models.Model):
     guardian_name = models.CharField(max_length=100)
     relation = models.CharField(max_length=50)
     contact = models.CharField(max_length=15)
-    photo = models.TextField(blank=True, null=True)  # Base64 encoded image
+    # Stored as a file; the API still accepts base64 uploads (see Base64ImageField)
+    photo = models.ImageField(upload_to='unauthorized_photos/', blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-timestamp']
 
     def __str__(self):
-        return f"{self.name} - {self.student_name}"
\ No newline at end of file
+        return f"{self.name} - {self.student_name}"
+
+
+class RosterChange(models.Model):
+    """
+    Append-only log of roster edits (students, parent QR identities, allowed
+    guardians) per teacher. The id doubles as the roster version: scanners
+    keep the highest id they have seen and ask for changes since it.
+    """
+    KIND_CHOICES = [
+        ('student', 'Student'),
+        ('parent', 'Parent/Guardian account'),
+        ('guardian', 'Guardian'),
+    ]
+
+    teacher = models.ForeignKey(TeacherProfile, on_delete=models.CASCADE, related_name='roster_changes')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['teacher', 'id'], name='roster_change_teacher_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id} ({self.teacher_id})"
+
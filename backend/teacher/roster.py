@@ -0,0 +1,152 @@
+"""
+Roster helpers shared by the attendance views.
+
+LRN -> Student lookup: scans only carry the LRN (and a copied name/gender)
+from the QR payload. The known LRNs are kept in the shared default cache
+(settings.CACHES, seen by every worker) and read through the per-process
+tier of backend/cache.py, so resolving `Attendance.student` costs no query
+per scan and another worker's drop is seen within LOCAL_CACHE_TIMEOUT; the map is dropped whenever a Student is created
+or deleted, and again once a delete commits, so a map rebuilt by another
+request while the delete was in flight does not keep the removed LRN. A
+miss falls back to one primary-key lookup.
+
+Roster state: where each of a teacher's students is today (arrived, picked
+up, not yet arrived...), computed in one query and cached per teacher until
+the next attendance or roster write. The version is bumped when the write
+happens and again when it commits, so a state computed by another worker
+from not-yet-committed data is dropped too. Writes that send no signals
+(queryset.update, raw SQL) show up within ROSTER_STATE_TIMEOUT.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend import cache as tiered
+from parents.models import Student
+
+from .models import Attendance
+
+LRN_MAP_CACHE_KEY = 'roster:lrn_map'
+LRN_MAP_TIMEOUT = 60 * 60
+
+
+def normalize_lrn(value):
+    return (value or '').strip()
+
+
+def lrn_map():
+    """{normalized LRN: Student pk} for every student."""
+    mapping = tiered.get(LRN_MAP_CACHE_KEY)
+    if mapping is None:
+        mapping = {normalize_lrn(lrn): lrn for lrn in Student.objects.values_list('lrn', flat=True)}
+        tiered.set(LRN_MAP_CACHE_KEY, mapping, LRN_MAP_TIMEOUT)
+    return mapping
+
+
+def student_pk_for_lrn(lrn):
+    """Student pk for an LRN string from a scan, or None if no such student."""
+    key = normalize_lrn(lrn)
+    if not key:
+        return None
+    pk = lrn_map().get(key)
+    if pk is None and Student.objects.filter(pk=key).exists():
+        invalidate_lrn_map()
+        pk = key
+    return pk
+
+
+def invalidate_lrn_map():
+    tiered.delete(LRN_MAP_CACHE_KEY)
+
+
+ROSTER_STATE_TIMEOUT = 5 * 60
+
+# Latest transaction of the day -> state shown in the scanner app
+STATE_FOR_STATUS = {
+    'Present': 'present',
+    'Late': 'present',
+    'Drop-off': 'present',
+    'Pick-up': 'picked_up',
+    'Absent': 'absent',
+    'Dropped Out': 'dropped_out',
+}
+NOT_ARRIVED = 'not_arrived'
+STATES = [NOT_ARRIVED, 'present', 'picked_up', 'absent', 'dropped_out']
+
+
+def _state_version_key(teacher_id):
+    return f'roster:state_version:{teacher_id}'
+
+
+def roster_state_cache_key(teacher_id, date):
+    # Versioned per teacher so one write drops the cached state for every date
+    version = tiered.version(_state_version_key(teacher_id))
+    return f'roster:state:{teacher_id}:{version}:{date.isoformat()}'
+
+
+def invalidate_roster_state(teacher_id):
+    tiered.bump(_state_version_key(teacher_id))
+
+
+def compute_roster_state(teacher_id, date):
+    """
+    One query: the teacher's students, each annotated with the status and
+    time of its latest attendance row on `date`.
+    """
+    latest = Attendance.objects.filter(student=OuterRef('pk'), date=date).order_by('-timestamp')
+    rows = (
+        Student.objects.filter(teacher_id=teacher_id)
+        .annotate(
+            last_status=Subquery(latest.values('status')[:1]),
+            last_at=Subquery(latest.values('timestamp')[:1]),
+        )
+        .order_by('name')
+        .values_list('lrn', 'name', 'gender', 'last_status', 'last_at')
+    )
+    students = []
+    counts = dict.fromkeys(STATES, 0)
+    for lrn, name, gender, last_status, last_at in rows:
+        state = STATE_FOR_STATUS.get(last_status, 'present') if last_status else NOT_ARRIVED
+        counts[state] += 1
+        students.append({
+            'lrn': lrn,
+            'name': name,
+            'gender': gender,
+            'state': state,
+            'since': last_at.isoformat() if last_at else None,
+        })
+    return {'date': date.isoformat(), 'counts': counts, 'students': students}
+
+
+def roster_state(teacher_id, date):
+    """Cached `compute_roster_state`; dropped on every attendance/roster write."""
+    key = roster_state_cache_key(teacher_id, date)
+    state = cache.get(key)
+    if state is None:
+        state = compute_roster_state(teacher_id, date)
+        cache.set(key, state, ROSTER_STATE_TIMEOUT)
+    return state
+
+
+@receiver(post_save, sender=Student, dispatch_uid='roster_student_saved')
+def _student_saved(sender, instance, created, **kwargs):
+    # The LRN is the primary key, so only new rows change the map
+    if created:
+        invalidate_lrn_map()
+    invalidate_roster_state(instance.teacher_id)
+
+
+@receiver(post_delete, sender=Student, dispatch_uid='roster_student_deleted')
+def _student_deleted(sender, instance, **kwargs):
+    invalidate_lrn_map()
+    transaction.on_commit(invalidate_lrn_map)
+    invalidate_roster_state(instance.teacher_id)
+
+
+@receiver(post_save, sender=Attendance, dispatch_uid='roster_attendance_saved')
+@receiver(post_delete, sender=Attendance, dispatch_uid='roster_attendance_deleted')
+def _attendance_changed(sender, instance, **kwargs):
+    invalidate_roster_state(instance.teacher_id)
+    transaction.on_commit(lambda: invalidate_roster_state(instance.teacher_id))
@@ -1,7 +1,56 @@
+import base64
+import binascii
+import uuid
+from io import BytesIO
+from urllib.parse import urlsplit
+from PIL import Image
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.db import models
+from backend.serializers import DynamicFieldsMixin
+from backend.thumbnails import get_thumbnail_url
 from .models import TeacherProfile, Attendance, Absence, Dropout, UnauthorizedPerson
 
+
+class Base64ImageField(serializers.ImageField):
+    """
+    ImageField that also accepts a base64 string or data URL, which is what the
+    scanner app sends. The decoded bytes are validated by Pillow like a normal upload
+    and named after the format Pillow detects, so PNG/WebP photos keep their type.
+    Sending back the URL this field returned for the instance keeps the current file.
+    """
+    EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+    def _current_file(self, data):
+        instance = getattr(self.parent, 'instance', None)
+        if not isinstance(instance, models.Model):
+            return None
+        current = getattr(instance, self.source, None)
+        if current and urlsplit(data).path == urlsplit(current.url).path:
+            return current
+        return None
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            if data.startswith(('http://', 'https://', '/')):
+                current = self._current_file(data)
+                if current is None:
+                    raise serializers.ValidationError("Send the image data, not a URL.")
+                return current
+            if 'base64,' in data:
+                data = data.split('base64,', 1)[1]
+            try:
+                decoded = base64.b64decode(data)
+            except (binascii.Error, ValueError):
+                raise serializers.ValidationError("Invalid base64 image data.")
+            try:
+                extension = self.EXTENSIONS.get(Image.open(BytesIO(decoded)).format, 'jpg')
+            except (OSError, Image.DecompressionBombError):
+                extension = 'jpg'  # not an image; rejected by the validation below
+            data = ContentFile(decoded, name=f"{uuid.uuid4().hex}.{extension}")
+        return super().to_internal_value(data)
+
 class TeacherProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(write_only=True)
     password = serializers.CharField(write_only=True)
@@ -29,7 +78,7 @@ class TeacherProfileSerializer(serializers.ModelSerializer):
         teacher_profile = TeacherProfile.objects.create(user=user, **validated_data)
         return teacher_profile
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.user.first_name', read_only=True)
     lrn = serializers.CharField(source='student_lrn', required=False)
     qr_data = serializers.CharField(source='qr_code_data', required=False)  # Alias for qr_code_data
@@ -37,20 +86,20 @@ class AttendanceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Attendance
-        fields = ['id', 'teacher', 'teacher_name', 'student_name', 'student_lrn', 'lrn', 'gender', 
+        fields = ['id', 'teacher', 'teacher_name', 'student', 'student_name', 'student_lrn', 'lrn', 'gender', 
                   'guardian_name', 'parent', 'date', 'status', 'session', 'transaction_type',
                   'qr_code_data', 'qr_data', 'timestamp']
-        read_only_fields = ['timestamp', 'teacher']
+        read_only_fields = ['timestamp', 'teacher', 'student']
 
-class AbsenceSerializer(serializers.ModelSerializer):
+class AbsenceSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.user.first_name', read_only=True)
 
     class Meta:
         model = Absence
-        fields = ['id', 'teacher', 'teacher_name', 'student_name', 'date', 'reason', 'timestamp']
-        read_only_fields = ['timestamp', 'teacher']
+        fields = ['id', 'teacher', 'teacher_name', 'student_name', 'student', 'date', 'reason', 'generated', 'timestamp']
+        read_only_fields = ['timestamp', 'teacher', 'student', 'generated']
 
-class DropoutSerializer(serializers.ModelSerializer):
+class DropoutSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.user.first_name', read_only=True)
 
     class Meta:
@@ -58,11 +107,25 @@ class DropoutSerializer(serializers.ModelSerializer):
         fields = ['id', 'teacher', 'teacher_name', 'student_name', 'date', 'reason', 'timestamp']
         read_only_fields = ['timestamp', 'teacher']
 
-class UnauthorizedPersonSerializer(serializers.ModelSerializer):
+class UnauthorizedPersonSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     teacher_name = serializers.CharField(source='teacher.user.first_name', read_only=True)
+    photo = Base64ImageField(required=False, allow_null=True)
+    photo_thumb_url = serializers.SerializerMethodField()
 
     class Meta:
         model = UnauthorizedPerson
         fields = ['id', 'teacher', 'teacher_name', 'name', 'address', 'age', 'student_name', 
-                  'guardian_name', 'relation', 'contact', 'photo', 'timestamp']
-        read_only_fields = ['timestamp', 'teacher']
\ No newline at end of file
+                  'guardian_name', 'relation', 'contact', 'photo', 'photo_thumb_url', 'timestamp']
+        read_only_fields = ['timestamp', 'teacher']
+        # Columns read by the method fields (see backend/serializers.py)
+        field_sources = {'photo_thumb_url': ('photo',)}
+
+    def get_photo_thumb_url(self, obj):
+        return get_thumbnail_url(obj.photo, 256, self.context.get('request'))
+
+class UnauthorizedPersonListSerializer(UnauthorizedPersonSerializer):
+    """List rows carry only the thumbnail URL, not the full-size photo"""
+
+    class Meta(UnauthorizedPersonSerializer.Meta):
+        fields = ['id', 'teacher', 'teacher_name', 'name', 'address', 'age', 'student_name',
+                  'guardian_name', 'relation', 'contact', 'photo_thumb_url', 'timestamp']
\ No newline at end of file
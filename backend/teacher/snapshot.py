@@ -0,0 +1,168 @@
+"""
+Offline roster for the QR scanner.
+
+A teacher's roster is the students, their parent/guardian QR identities and
+the guardians parents have allowed. Every save/delete of those rows appends
+a RosterChange; its id is the roster version. The scanner downloads
+`build_snapshot()` once, then asks for `build_delta(since=<version>)`, which
+lists what to upsert and what to drop. Both are cached as gzipped JSON per
+(teacher, version) because the version changes whenever the content does.
+"""
+import json
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.text import compress_string
+
+from backend.thumbnails import get_thumbnail_url
+from guardian.models import Guardian
+from parents.models import ParentGuardian, Student
+
+from .models import RosterChange, TeacherProfile
+
+SNAPSHOT_TIMEOUT = 24 * 60 * 60
+
+
+def _student_entry(student):
+    return {'lrn': student.lrn, 'name': student.name, 'gender': student.gender, 'section': student.section}
+
+
+def _parent_entry(parent):
+    return {
+        'id': parent.id,
+        'lrn': parent.student_id,
+        'name': parent.name,
+        'role': parent.role,
+        'qr': parent.qr_code_data,
+        'token': parent.qr_token,
+    }
+
+
+def _guardian_entry(guardian):
+    return {
+        'id': guardian.id,
+        'lrn': guardian.student_id,
+        'name': guardian.name,
+        'relationship': guardian.relationship,
+        'photo': get_thumbnail_url(guardian.photo, 256),
+    }
+
+
+# kind -> (queryset of the teacher's rows that belong in the roster, entry builder)
+SECTIONS = {
+    'student': (
+        lambda teacher_id: Student.objects.filter(teacher_id=teacher_id).order_by('lrn'),
+        _student_entry,
+    ),
+    'parent': (
+        lambda teacher_id: ParentGuardian.objects.filter(teacher_id=teacher_id).only(
+            'id', 'student_id', 'name', 'role', 'qr_code_data', 'qr_token',
+        ).order_by('id'),
+        _parent_entry,
+    ),
+    'guardian': (
+        lambda teacher_id: Guardian.objects.filter(teacher_id=teacher_id, status='allowed').only(
+            'id', 'student_id', 'name', 'relationship', 'photo',
+        ).order_by('id'),
+        _guardian_entry,
+    ),
+}
+KIND_FOR_MODEL = {Student: 'student', ParentGuardian: 'parent', Guardian: 'guardian'}
+
+
+def current_version(teacher_id):
+    return RosterChange.objects.filter(teacher_id=teacher_id).aggregate(v=Max('id'))['v'] or 0
+
+
+def _pack(document):
+    return compress_string(json.dumps(document, separators=(',', ':')).encode())
+
+
+def build_snapshot(teacher_id):
+    """(version, gzipped JSON) of the whole roster."""
+    version = current_version(teacher_id)
+    key = f'roster:snapshot:{teacher_id}:{version}'
+    packed = cache.get(key)
+    if packed is None:
+        document = {'version': version, 'full': True}
+        for kind, (queryset, entry) in SECTIONS.items():
+            document[kind + 's'] = [entry(obj) for obj in queryset(teacher_id)]
+        packed = _pack(document)
+        cache.set(key, packed, SNAPSHOT_TIMEOUT)
+    return version, packed
+
+
+def build_delta(teacher_id, since):
+    """
+    (version, gzipped JSON) of what changed after `since`, or the full
+    snapshot when `since` predates the retained change log.
+    """
+    oldest = RosterChange.objects.aggregate(v=Min('id'))['v']
+    if oldest is not None and since < oldest - 1:
+        return build_snapshot(teacher_id)
+
+    version = current_version(teacher_id)
+    key = f'roster:delta:{teacher_id}:{since}:{version}'
+    packed = cache.get(key)
+    if packed is None:
+        changed = {kind: set() for kind in SECTIONS}
+        for kind, object_id in RosterChange.objects.filter(
+            teacher_id=teacher_id, id__gt=since, id__lte=version
+        ).values_list('kind', 'object_id'):
+            changed[kind].add(object_id)
+
+        document = {'version': version, 'since': since, 'full': False}
+        for kind, (queryset, entry) in SECTIONS.items():
+            ids = changed[kind]
+            current = list(queryset(teacher_id).filter(pk__in=ids)) if ids else []
+            present = {str(obj.pk) for obj in current}
+            document[kind + 's'] = {
+                'upsert': [entry(obj) for obj in current],
+                # deleted, moved to another teacher, or (guardians) no longer allowed
+                'delete': sorted(ids - present),
+            }
+        packed = _pack(document)
+        cache.set(key, packed, SNAPSHOT_TIMEOUT)
+    return version, packed
+
+
+def record_change(instance):
+    RosterChange.objects.create(
+        teacher_id=instance.teacher_id,
+        kind=KIND_FOR_MODEL[type(instance)],
+        object_id=str(instance.pk),
+    )
+
+
+def record_changes(model, rows):
+    """Log (pk, teacher_id) rows changed by a bulk update, which sends no post_save."""
+    RosterChange.objects.bulk_create([
+        RosterChange(teacher_id=teacher_id, kind=KIND_FOR_MODEL[model], object_id=str(pk)) for pk, teacher_id in rows
+    ])
+
+
+@receiver(post_save, sender=Student, dispatch_uid='snapshot_student_saved')
+@receiver(post_save, sender=ParentGuardian, dispatch_uid='snapshot_parent_saved')
+@receiver(post_save, sender=Guardian, dispatch_uid='snapshot_guardian_saved')
+def _roster_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_change(instance)
+
+
+@receiver(post_delete, sender=Student, dispatch_uid='snapshot_student_deleted')
+@receiver(post_delete, sender=ParentGuardian, dispatch_uid='snapshot_parent_deleted')
+@receiver(post_delete, sender=Guardian, dispatch_uid='snapshot_guardian_deleted')
+def _roster_deleted(sender, instance, **kwargs):
+    # Logged once the delete commits, and only if the teacher survived it: a
+    # teacher's own deletion cascades here, and a change row pointing at them
+    # would fail the foreign key at commit
+    teacher_id, kind, object_id = instance.teacher_id, KIND_FOR_MODEL[sender], str(instance.pk)
+
+    def log():
+        if TeacherProfile.objects.filter(pk=teacher_id).exists():
+            RosterChange.objects.create(teacher_id=teacher_id, kind=kind, object_id=object_id)
+
+    transaction.on_commit(log)
@@ -1,3 +1,318 @@
-from django.test import TestCase
+import base64
+import shutil
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from backend import cache as tiered
+from guardian.models import Guardian
+from parents.models import ParentGuardian, Student, SyncTombstone
+
+from .absences import generate_for_day, school_days
+from .models import Absence, Attendance, Dropout, RosterChange, TeacherProfile, UnauthorizedPerson
+from .roster import LRN_MAP_CACHE_KEY, lrn_map, roster_state, roster_state_cache_key, student_pk_for_lrn
+
+
+def make_teacher(username='teacher1', section='Rose'):
+    user = User.objects.create_user(username, password='x', first_name=username.title())
+    return TeacherProfile.objects.create(
+        user=user, age=30, gender='Female', section=section, contact='0917', address='x'
+    )
+
+
+class LrnMapTests(TestCase):
+    def setUp(self):
+        tiered.clear()
+        self.teacher = make_teacher()
+        self.student = Student.objects.create(lrn='1001', name='Ana Cruz', teacher=self.teacher, section='Rose')
+
+    def test_scan_links_student(self):
+        attendance = Attendance.objects.create(
+            teacher=self.teacher, student_name='Ana Cruz', student_lrn=' 1001 ', date='2026-10-19'
+        )
+        self.assertEqual(attendance.student_id, '1001')
+
+    def test_deleted_student_not_resolved_from_map_rebuilt_during_delete(self):
+        self.assertIn('1001', lrn_map())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.delete()
+            # Another request rebuilt the map before the delete committed
+            cache.set(LRN_MAP_CACHE_KEY, {'1001': '1001'})
+        self.assertIsNone(student_pk_for_lrn('1001'))
+        attendance = Attendance.objects.create(
+            teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date='2026-10-19'
+        )
+        self.assertIsNone(attendance.student_id)
+
+
+class RosterStateTests(TestCase):
+    def setUp(self):
+        tiered.clear()
+        self.teacher = make_teacher()
+        Student.objects.create(lrn='1001', name='Ana Cruz', teacher=self.teacher, section='Rose')
+        self.client.force_login(self.teacher.user)
+
+    def _state(self):
+        response = self.client.get('/api/roster/state/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_today_is_the_local_date(self):
+        self.assertEqual(self._state()['date'], timezone.localdate().isoformat())
+
+    def test_scan_invalidates_cached_state(self):
+        self.assertEqual(self._state()['counts']['not_arrived'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(
+                teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date=timezone.localdate()
+            )
+        self.assertEqual(self._state()['counts']['present'], 1)
+
+    def test_state_cached_before_commit_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.create(
+                teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date=timezone.localdate()
+            )
+            # Another worker caches a state computed before this write was visible
+            stale = roster_state(self.teacher.pk, timezone.localdate())
+            stale['counts'] = {'not_arrived': 1}
+            cache.set(roster_state_cache_key(self.teacher.pk, timezone.localdate()), stale, 300)
+        self.assertEqual(self._state()['counts']['present'], 1)
+
+
+class AttendanceDetailTests(TestCase):
+    def setUp(self):
+        self.teacher = make_teacher()
+        self.attendance = Attendance.objects.create(
+            teacher=self.teacher, student_name='Ana Cruz', student_lrn='1001', date='2026-10-19'
+        )
+        self.url = f'/api/attendance/{self.attendance.pk}/'
+
+    def test_owner_can_read(self):
+        self.client.force_login(self.teacher.user)
+        self.assertEqual(self.client.get(self.url).json()['student_name'], 'Ana Cruz')
+
+    def test_other_teacher_gets_404(self):
+        self.client.force_login(make_teacher('teacher2', section='Lily').user)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.patch(self.url, {'student_name': 'Ben'}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.delete(self.url).status_code, 404)
+        self.attendance.refresh_from_db()
+        self.assertEqual((self.attendance.student_name, self.attendance.teacher), ('Ana Cruz', self.teacher))
+
+
+class BulkOperationTests(TestCase):
+    def setUp(self):
+        tiered.clear()
+        self.teacher = make_teacher()
+        Student.objects.create(lrn='1001', name='Ana Cruz', teacher=self.teacher, section='Rose')
+        self.kept = Attendance.objects.create(teacher=self.teacher, student_name='Ana Cruz', date='2026-10-18')
+        self.doomed = Attendance.objects.create(teacher=self.teacher, student_name='Ana Cruz', date='2026-10-17')
+        self.foreign = Attendance.objects.create(
+            teacher=make_teacher('teacher2', section='Lily'), student_name='Ben Reyes', date='2026-10-17'
+        )
+        self.client.force_login(self.teacher.user)
+
+    def _post(self, path, operations, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                path, {'operations': operations, **extra}, content_type='application/json'
+            )
+        return response.status_code, response.json()
+
+    def test_valid_operations_are_applied_and_invalid_ones_reported(self):
+        before = self.kept.updated_at
+        code, body = self._post('/api/attendance/bulk/', [
+            {'op': 'create', 'data': {'student_name': 'Ana Cruz', 'student_lrn': '1001', 'date': '2026-10-19'}},
+            {'op': 'update', 'id': self.kept.pk, 'data': {'student_lrn': '1001', 'status': 'Pick-up'}},
+            {'op': 'delete', 'id': self.doomed.pk},
+            {'op': 'delete', 'id': self.foreign.pk},
+            {'op': 'rename', 'id': self.kept.pk},
+        ])
+        self.assertEqual(code, 207)
+        self.assertEqual([result['status'] for result in body['results']], [201, 200, 204, 404, 400])
+
+        created = Attendance.objects.get(pk=body['results'][0]['id'])
+        self.assertEqual(created.student_id, '1001')
+        self.kept.refresh_from_db()
+        self.assertEqual((self.kept.student_id, self.kept.transaction_type), ('1001', 'pick-up'))
+        self.assertGreater(self.kept.updated_at, before)
+        self.assertFalse(Attendance.objects.filter(pk=self.doomed.pk).exists())
+        self.assertTrue(SyncTombstone.objects.filter(collection='attendance', object_id=str(self.doomed.pk)).exists())
+        self.assertTrue(Attendance.objects.filter(pk=self.foreign.pk).exists())
+
+    def test_atomic_request_applies_nothing_on_error(self):
+        code, body = self._post('/api/attendance/bulk/', [
+            {'op': 'delete', 'id': self.doomed.pk},
+            {'op': 'update', 'id': self.kept.pk, 'data': {'date': 'not a date'}},
+        ], atomic=True)
+        self.assertEqual(code, 400)
+        self.assertEqual([result['status'] for result in body['results']], [424, 400])
+        self.assertTrue(Attendance.objects.filter(pk=self.doomed.pk).exists())
+
+    def test_duplicate_ids_are_rejected(self):
+        code, body = self._post('/api/attendance/bulk/', [
+            {'op': 'delete', 'id': self.doomed.pk},
+            {'op': 'update', 'id': self.doomed.pk, 'data': {'status': 'Late'}},
+        ])
+        self.assertEqual([result['status'] for result in body['results']], [204, 400])
+
+    def test_absence_create_links_student_by_name(self):
+        code, body = self._post('/api/absences/bulk/', [
+            {'op': 'create', 'data': {'student_name': ' ana cruz ', 'date': '2026-10-19', 'reason': 'Sick'}},
+        ])
+        self.assertEqual(code, 200)
+        self.assertEqual(Absence.objects.get(pk=body['results'][0]['id']).student_id, '1001')
+
+    def test_roster_state_is_refreshed(self):
+        self.assertEqual(roster_state(self.teacher.pk, timezone.localdate())['counts']['not_arrived'], 1)
+        self._post('/api/attendance/bulk/', [
+            {'op': 'create', 'data': {
+                'student_name': 'Ana Cruz', 'student_lrn': '1001', 'date': timezone.localdate().isoformat()
+            }},
+        ])
+        self.assertEqual(self.client.get('/api/roster/state/').json()['counts']['present'], 1)
+
+    @override_settings(BULK_MAX_OPERATIONS=1)
+    def test_operation_limit(self):
+        code, _ = self._post('/api/attendance/bulk/', [{'op': 'delete', 'id': self.kept.pk}] * 2)
+        self.assertEqual(code, 400)
+
+
+class UnauthorizedPhotoTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        media_root = override_settings(MEDIA_ROOT=root)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.teacher = make_teacher()
+        self.client.force_login(self.teacher.user)
+
+    def _photo(self, fmt):
+        buffer = BytesIO()
+        Image.new('RGB', (40, 40), 'red').save(buffer, format=fmt)
+        return 'data:image/*;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+    def _create(self, photo):
+        return self.client.post('/api/unauthorized/', {
+            'name': 'Stranger', 'address': 'Somewhere', 'age': 40, 'student_name': 'Ana Cruz',
+            'guardian_name': 'Maria Cruz', 'relation': 'None', 'contact': '0917', 'photo': photo,
+        }, content_type='application/json')
+
+    def test_extension_follows_the_decoded_format(self):
+        for fmt, extension in (('PNG', '.png'), ('WEBP', '.webp'), ('JPEG', '.jpg')):
+            response = self._create(self._photo(fmt))
+            self.assertEqual(response.status_code, 201, response.content)
+            self.assertTrue(UnauthorizedPerson.objects.get(pk=response.json()['id']).photo.name.endswith(extension))
+
+    def test_get_then_put_keeps_the_photo(self):
+        person = UnauthorizedPerson.objects.get(pk=self._create(self._photo('PNG')).json()['id'])
+        url = f'/api/unauthorized/{person.pk}/'
+        body = self.client.get(url).json()
+        body['name'] = 'Known stranger'
+        response = self.client.put(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['photo'], body['photo'])
+        updated = UnauthorizedPerson.objects.get(pk=person.pk)
+        self.assertEqual((updated.name, updated.photo.name), ('Known stranger', person.photo.name))
+
+    def test_other_urls_are_rejected(self):
+        person = UnauthorizedPerson.objects.get(pk=self._create(self._photo('PNG')).json()['id'])
+        response = self.client.patch(
+            f'/api/unauthorized/{person.pk}/', {'photo': 'https://example.com/other.png'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._create('https://example.com/other.png').status_code, 400)
+        self.assertEqual(self._create('bm90IGFuIGltYWdl').status_code, 400)
+
+
+class TeacherDeleteTests(TransactionTestCase):
+    def test_deleting_a_teacher_with_a_roster(self):
+        teacher = make_teacher()
+        student = Student.objects.create(lrn='1001', name='Ana Cruz', teacher=teacher, section='Rose')
+        parent = ParentGuardian.objects.create(student=student, teacher=teacher, name='Maria Cruz', role='Parent1')
+        Guardian.objects.create(
+            teacher=teacher, student=student, parent_guardian=parent, name='Lola', age=70, student_name='Ana Cruz'
+        )
+        other = make_teacher('teacher2', section='Lily')
+
+        teacher.user.delete()
+
+        self.assertFalse(TeacherProfile.objects.filter(pk=teacher.pk).exists())
+        self.assertFalse(RosterChange.objects.filter(teacher_id=teacher.pk).exists())
+        # Deletes for a teacher that is still there are still logged
+        Student.objects.create(lrn='1002', name='Ben Reyes', teacher=other, section='Lily').delete()
+        self.assertEqual(
+            list(RosterChange.objects.filter(teacher=other).values_list('kind', 'object_id')),
+            [('student', '1002'), ('student', '1002')],
+        )
+
+
+@override_settings(SCHOOL_DAYS=(0, 1, 2, 3, 4), SCHOOL_HOLIDAYS=('2026-10-15',))
+class GenerateAbsencesTests(TestCase):
+    day = date(2026, 10, 14)  # a Wednesday
+
+    def setUp(self):
+        self.teacher = make_teacher()
+        self.ana = Student.objects.create(lrn='1001', name='Ana Cruz', teacher=self.teacher, section='Rose')
+        self.ben = Student.objects.create(lrn='1002', name='Ben Reyes', teacher=self.teacher, section='Rose')
+        Student.objects.update(created_at=timezone.now() - timedelta(days=30))
+
+    def _scan(self, **fields):
+        return Attendance.objects.create(teacher=self.teacher, date=self.day, **fields)
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command('generate_absences', *args, stdout=out)
+        return out.getvalue()
+
+    def test_marks_unscanned_students_once(self):
+        self._scan(student_name='Ana Cruz', student_lrn='1001')
+        self.assertIn('Created 1 absence(s)', self._run('--date', '2026-10-14'))
+        absence = Absence.objects.get()
+        self.assertEqual((absence.student_id, absence.date, absence.generated), ('1002', self.day, True))
+        # Re-running the same day is a no-op
+        self.assertIn('Created 0 absence(s)', self._run('--date', '2026-10-14'))
+        self.assertEqual(Absence.objects.count(), 1)
+
+    def test_absent_scan_does_not_count(self):
+        self._scan(student_name='Ana Cruz', student_lrn='1001', status='Absent')
+        self.assertEqual(generate_for_day(self.day), Counter({self.teacher.pk: 2}))
+
+    def test_unlinked_scans_count(self):
+        # Typed by hand with no LRN, and an LRN that did not resolve when scanned
+        self._scan(student_name='ana cruz')
+        self._scan(student_name='B. Reyes', student_lrn='1002')
+        Attendance.objects.update(student=None)
+        self.assertEqual(generate_for_day(self.day), Counter())
+
+    def test_weekends_and_holidays_are_skipped(self):
+        self.assertEqual(generate_for_day(date(2026, 10, 17)), Counter())
+        self.assertEqual(generate_for_day(date(2026, 10, 15)), Counter())
+        self.assertEqual(
+            school_days(date(2026, 10, 14), date(2026, 10, 19)), [self.day, date(2026, 10, 16), date(2026, 10, 19)]
+        )
+        self.assertIn('Created 2 absence(s)', self._run('--since', '2026-10-14', '--date', '2026-10-18'))
+        self.assertEqual(Absence.objects.count(), 4)
+
+    def test_dropouts_are_skipped(self):
+        Dropout.objects.create(
+            teacher=self.teacher, student_name='ANA CRUZ', date=self.day - timedelta(days=1), reason='Moved'
+        )
+        self.assertEqual(generate_for_day(self.day), Counter({self.teacher.pk: 1}))
+        self.assertEqual(list(Absence.objects.values_list('student_id', flat=True)), ['1002'])
+
+    def test_dry_run_saves_nothing(self):
+        self.assertIn('Would create 2 absence(s)', self._run('--date', '2026-10-14', '--dry-run'))
+        self.assertFalse(Absence.objects.exists())
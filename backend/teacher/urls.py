@@ -8,15 +8,22 @@ from .views import (
     # Attendance
     AttendanceView,
     attendance_detail,
+    AttendanceBulkView,
     PublicAttendanceListView,
 
+    # Roster state
+    RosterStateView,
+    RosterSnapshotView,
+
     # Absences
     AbsenceView,
     absence_detail,
+    AbsenceBulkView,
 
     # Dropouts
     DropoutView,
     dropout_detail,
+    DropoutBulkView,
 
     # Unauthorized Persons
     UnauthorizedPersonView,
@@ -42,9 +49,21 @@ urlpatterns = [
     # Retrieve, update, or delete specific attendance record (GET, PUT, PATCH, DELETE)
     path('attendance/<int:pk>/', attendance_detail, name='attendance-detail'),
 
+    # Create, update and delete many attendance records in one transaction (POST only)
+    path('attendance/bulk/', AttendanceBulkView.as_view(), name='attendance-bulk'),
+
     # Public attendance list - no authentication required (GET only)
     path('attendance/public/', PublicAttendanceListView.as_view(), name='public-attendance'),
 
+    # ========================================
+    # ROSTER STATE ENDPOINT
+    # ========================================
+    # Current per-student state for the teacher's class (GET only)
+    path('roster/state/', RosterStateView.as_view(), name='roster-state'),
+
+    # Offline roster for the scanner: full snapshot, or changes with ?since=<version> (GET only)
+    path('roster/snapshot/', RosterSnapshotView.as_view(), name='roster-snapshot'),
+
     # ========================================
     # ABSENCE ENDPOINTS
     # ========================================
@@ -54,6 +73,9 @@ urlpatterns = [
     # Retrieve, update, or delete specific absence record (GET, PUT, PATCH, DELETE)
     path('absences/<int:pk>/', absence_detail, name='absence-detail'),
 
+    # Create, update and delete many absence records in one transaction (POST only)
+    path('absences/bulk/', AbsenceBulkView.as_view(), name='absence-bulk'),
+
     # ========================================
     # DROPOUT ENDPOINTS
     # ========================================
@@ -63,6 +85,9 @@ urlpatterns = [
     # Retrieve, update, or delete specific dropout record (GET, PUT, PATCH, DELETE)
     path('dropouts/<int:pk>/', dropout_detail, name='dropout-detail'),
 
+    # Create, update and delete many dropout records in one transaction (POST only)
+    path('dropouts/bulk/', DropoutBulkView.as_view(), name='dropout-bulk'),
+
     # ========================================
     # UNAUTHORIZED PERSON ENDPOINTS
     # ========================================
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.db import IntegrityError
-from django.http import FileResponse
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, permissions, status
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
@@ -13,8 +15,13 @@ from .serializers import (
     AttendanceSerializer,
     AbsenceSerializer,
     DropoutSerializer,
-    UnauthorizedPersonSerializer
+    UnauthorizedPersonSerializer,
+    UnauthorizedPersonListSerializer,
 )
+from .bulk import DEFAULT_MAX_OPERATIONS, AbsenceOperations, AttendanceOperations, DropoutOperations, apply_operations
+from .roster import roster_state
+from .snapshot import build_delta, build_snapshot
+from parents.qr import InvalidToken, is_token, resolve_token
 from openpyxl import load_workbook
 from openpyxl.styles import PatternFill, Alignment, Font
 from openpyxl.drawing.fill import GradientFillProperties, GradientStop
@@ -22,6 +29,7 @@ from datetime import datetime
 from collections import defaultdict
 from calendar import monthrange
 from zoneinfo import ZoneInfo
+import gzip
 import io
 import json
 import re
@@ -133,13 +141,17 @@ class AttendanceView(APIView):
             # Apply filters
             date = request.query_params.get('date')
             student = request.query_params.get('student')
+            lrn = request.query_params.get('lrn')
             status_filter = request.query_params.get('status')
             transaction_type = request.query_params.get('transaction_type')
 
-            queryset = Attendance.objects.filter(teacher=teacher_profile)
+            queryset = Attendance.objects.filter(teacher=teacher_profile).select_related('teacher__user')
 
             if date:
                 queryset = queryset.filter(date=date)
+            if lrn:
+                # Indexed FK lookup; covers the student's rows under any scanned name
+                queryset = queryset.filter(student_id=lrn.strip())
             if student:
                 queryset = queryset.filter(student_name__icontains=student)
             if status_filter:
@@ -147,8 +159,8 @@ class AttendanceView(APIView):
             if transaction_type:
                 queryset = queryset.filter(transaction_type=transaction_type)
 
-            attendances = queryset.order_by('-date', '-timestamp')
-            serializer = AttendanceSerializer(attendances, many=True)
+            attendances = AttendanceSerializer.sparse_queryset(queryset.order_by('-date', '-timestamp'), request)
+            serializer = AttendanceSerializer(attendances, many=True, context={'request': request})
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -166,6 +178,17 @@ class AttendanceView(APIView):
             data = request.data.copy()
             qr_data = data.get('qr_data', '')
 
+            # Signed compact token: verified and resolved without parsing or a DB query
+            if qr_data and is_token(qr_data):
+                try:
+                    identity = resolve_token(qr_data)
+                except InvalidToken as e:
+                    return Response(
+                        {"error": str(e)},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                qr_data = json.dumps({key: identity[key] for key in ('lrn', 'student', 'gender', 'role', 'name')})
+
             # Parse QR code data if provided
             if qr_data:
                 try:
@@ -194,7 +217,7 @@ class AttendanceView(APIView):
 
             # Set default date if not provided
             if not data.get('date'):
-                data['date'] = datetime.now().date()
+                data['date'] = timezone.localdate()
 
             # Determine session based on Philippine Time if not provided
             if not data.get('session'):
@@ -234,7 +257,8 @@ def attendance_detail(request, pk):
     """Retrieve, update, or delete a specific attendance record"""
     try:
         teacher_profile = TeacherProfile.objects.get(user=request.user)
-        attendance = get_object_or_404(Attendance, pk=pk)
+        # Another teacher's record is as good as missing
+        attendance = get_object_or_404(Attendance, pk=pk, teacher=teacher_profile)
 
         if request.method == 'GET':
             serializer = AttendanceSerializer(attendance)
@@ -284,11 +308,108 @@ def attendance_detail(request, pk):
 # ========================================
 class PublicAttendanceListView(generics.ListAPIView):
     """Public endpoint to view all attendance records (no authentication required)"""
-    queryset = Attendance.objects.all().order_by('-timestamp')
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
 
+    def get_queryset(self):
+        queryset = Attendance.objects.select_related('teacher__user').order_by('-timestamp')
+        lrn = self.request.query_params.get('lrn')
+        if lrn:
+            queryset = queryset.filter(student_id=lrn.strip())
+        return queryset
+
+# ========================================
+# ROSTER STATE
+# ========================================
+class RosterStateView(APIView):
+    """
+    Where each of the teacher's students is today: not_arrived, present,
+    picked_up, absent or dropped_out, from their latest attendance row.
+    Optional ?date=YYYY-MM-DD for another day.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            teacher_profile = TeacherProfile.objects.filter(user=request.user).only('id').first()
+            if not teacher_profile:
+                return Response(
+                    {"error": "Teacher profile not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            date_param = request.query_params.get('date')
+            try:
+                day = datetime.strptime(date_param, '%Y-%m-%d').date() if date_param else timezone.localdate()
+            except ValueError:
+                return Response(
+                    {"error": "Invalid date, expected YYYY-MM-DD"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            return Response(roster_state(teacher_profile.id, day), status=status.HTTP_200_OK)
+
+        except Exception as e:
+            return Response(
+                {"error": f"Error fetching roster state: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+# ========================================
+# OFFLINE ROSTER SNAPSHOT
+# ========================================
+class RosterSnapshotView(APIView):
+    """
+    Roster for offline QR checks: students, parent QR identities and allowed
+    guardians, as gzipped JSON with a version number.
+    ?since=<version> returns only the upserts/deletes after that version
+    (or the full roster, flagged "full": true, if it is too old).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            teacher_profile = TeacherProfile.objects.filter(user=request.user).only('id').first()
+            if not teacher_profile:
+                return Response(
+                    {"error": "Teacher profile not found"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            since = request.query_params.get('since')
+            if since is not None:
+                try:
+                    since = int(since)
+                except ValueError:
+                    return Response(
+                        {"error": "since must be a version number"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                version, packed = build_delta(teacher_profile.id, since)
+            else:
+                version, packed = build_snapshot(teacher_profile.id)
+
+            etag = f'"roster-{teacher_profile.id}-{since if since is not None else "full"}-{version}"'
+            if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+                response = HttpResponseNotModified()
+            elif 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+                response = HttpResponse(packed, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(gzip.decompress(packed), content_type='application/json')
+            response['ETag'] = etag
+            response['X-Roster-Version'] = str(version)
+            response['Cache-Control'] = 'private, no-cache'
+            response['Vary'] = 'Accept-Encoding'
+            return response
+
+        except Exception as e:
+            return Response(
+                {"error": f"Error building roster snapshot: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 # ========================================
 # ABSENCE VIEWS
 # ========================================
@@ -300,8 +421,9 @@ class AbsenceView(APIView):
         """Get all absence records for the authenticated teacher"""
         try:
             teacher_profile = TeacherProfile.objects.get(user=request.user)
-            absences = Absence.objects.filter(teacher=teacher_profile).order_by('-date')
-            serializer = AbsenceSerializer(absences, many=True)
+            absences = Absence.objects.filter(teacher=teacher_profile).select_related('teacher__user').order_by('-date')
+            absences = AbsenceSerializer.sparse_queryset(absences, request)
+            serializer = AbsenceSerializer(absences, many=True, context={'request': request})
             return Response(serializer.data)
         except TeacherProfile.DoesNotExist:
             return Response(
@@ -374,8 +496,9 @@ class DropoutView(APIView):
         """Get all dropout records for the authenticated teacher"""
         try:
             teacher_profile = TeacherProfile.objects.get(user=request.user)
-            dropouts = Dropout.objects.filter(teacher=teacher_profile).order_by('-date')
-            serializer = DropoutSerializer(dropouts, many=True)
+            dropouts = Dropout.objects.filter(teacher=teacher_profile).select_related('teacher__user').order_by('-date')
+            dropouts = DropoutSerializer.sparse_queryset(dropouts, request)
+            serializer = DropoutSerializer(dropouts, many=True, context={'request': request})
             return Response(serializer.data)
         except TeacherProfile.DoesNotExist:
             return Response(
@@ -450,8 +573,11 @@ class UnauthorizedPersonView(APIView):
             teacher_profile = TeacherProfile.objects.get(user=request.user)
             persons = UnauthorizedPerson.objects.filter(
                 teacher=teacher_profile
-            ).order_by('-timestamp')
-            serializer = UnauthorizedPersonSerializer(persons, many=True)
+            ).select_related('teacher__user').order_by('-timestamp')
+            persons = UnauthorizedPersonListSerializer.sparse_queryset(persons, request)
+            serializer = UnauthorizedPersonListSerializer(
+                persons, many=True, context={'request': request}
+            )
             return Response(serializer.data)
         except TeacherProfile.DoesNotExist:
             return Response(
@@ -463,7 +589,7 @@ class UnauthorizedPersonView(APIView):
         """Create a new unauthorized person record"""
         try:
             teacher_profile = TeacherProfile.objects.get(user=request.user)
-            serializer = UnauthorizedPersonSerializer(data=request.data)
+            serializer = UnauthorizedPersonSerializer(data=request.data, context={'request': request})
             if serializer.is_valid():
                 serializer.save(teacher=teacher_profile)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -487,7 +613,7 @@ def unauthorized_person_detail(request, pk):
         )
 
         if request.method == 'GET':
-            serializer = UnauthorizedPersonSerializer(person)
+            serializer = UnauthorizedPersonSerializer(person, context={'request': request})
             return Response(serializer.data)
 
         elif request.method in ['PUT', 'PATCH']:
@@ -495,7 +621,8 @@ def unauthorized_person_detail(request, pk):
             serializer = UnauthorizedPersonSerializer(
                 person,
                 data=request.data,
-                partial=partial
+                partial=partial,
+                context={'request': request}
             )
             if serializer.is_valid():
                 serializer.save()
@@ -517,6 +644,51 @@ def unauthorized_person_detail(request, pk):
             status=status.HTTP_404_NOT_FOUND
         )
 
+# ========================================
+# BULK OPERATIONS
+# ========================================
+class BulkOperationsView(APIView):
+    """
+    Create, update and delete many of the teacher's records in one request
+    and one transaction (see teacher/bulk.py); returns a result per operation.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    operations_class = None
+
+    def post(self, request):
+        try:
+            teacher_profile = TeacherProfile.objects.get(user=request.user)
+        except TeacherProfile.DoesNotExist:
+            return Response(
+                {"error": "Teacher profile not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        operations = request.data.get('operations') if isinstance(request.data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            return Response({"error": "operations must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        max_operations = getattr(settings, 'BULK_MAX_OPERATIONS', DEFAULT_MAX_OPERATIONS)
+        if len(operations) > max_operations:
+            return Response(
+                {"error": f"At most {max_operations} operations per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        atomic = request.data.get('atomic') in (True, 'true', '1', 1)
+        teacher_profile.user = request.user  # for teacher_name in the results
+        results, code = apply_operations(self.operations_class, teacher_profile, operations, atomic=atomic)
+        return Response({"results": results}, status=code)
+
+
+class AttendanceBulkView(BulkOperationsView):
+    operations_class = AttendanceOperations
+
+
+class AbsenceBulkView(BulkOperationsView):
+    operations_class = AbsenceOperations
+
+
+class DropoutBulkView(BulkOperationsView):
+    operations_class = DropoutOperations
+
 # ========================================
 # SF2 EXCEL REPORT GENERATION
 # ========================================
@@ -592,7 +764,7 @@ def generate_sf2_excel(request):
             teacher=teacher_profile,
             date__year=year,
             date__month=month
-        ).order_by('date', 'timestamp')
+        ).select_related('student').order_by('date', 'timestamp')
 
         print(f"📊 Fetching attendance for: {month_names[month-1]} {year}")
         print(f"📝 Found {attendances.count()} attendance records")
@@ -603,16 +775,22 @@ def generate_sf2_excel(request):
         )
 
         # Set to collect all unique students with gender
-        students_dict = {}  # {name: gender}
+        students_dict = {}  # {student key: gender}
+        display_names = {}  # {student key: name written to the sheet}
 
-        # Process each attendance record
+        # Process each attendance record. Rows linked to a Student are grouped by
+        # its LRN (so a renamed student keeps one row); unlinked rows by name.
         for att in attendances:
-            student_name = att.student_name
+            student_key = att.student_id or f"name:{att.student_name}"
             day = att.date.day
 
-            # Store student gender if we don't have it yet
-            if student_name not in students_dict:
-                students_dict[student_name] = att.gender if hasattr(att, 'gender') and att.gender else 'Male'
+            # Store student gender and name if we don't have them yet
+            if student_key not in students_dict:
+                if att.student and att.student.gender:
+                    students_dict[student_key] = att.student.get_gender_display()
+                else:
+                    students_dict[student_key] = att.gender if hasattr(att, 'gender') and att.gender else 'Male'
+                display_names[student_key] = att.student.name if att.student else att.student_name
 
             # Determine session with better fallback logic
             if hasattr(att, 'session') and att.session:
@@ -627,18 +805,18 @@ def generate_sf2_excel(request):
             # Mark attendance only if status is NOT 'Absent'
             if att.status and att.status.lower() != 'absent':
                 if session == 'AM':
-                    attendance_data[student_name]['days'][day]['am'] = True
+                    attendance_data[student_key]['days'][day]['am'] = True
                 elif session == 'PM':
-                    attendance_data[student_name]['days'][day]['pm'] = True
+                    attendance_data[student_key]['days'][day]['pm'] = True
 
             # Store gender
-            attendance_data[student_name]['gender'] = students_dict[student_name]
+            attendance_data[student_key]['gender'] = students_dict[student_key]
 
         # Separate students by gender and sort alphabetically
-        boys = sorted([name for name, gender in students_dict.items() 
-                      if gender and gender.lower() == 'male'])
-        girls = sorted([name for name, gender in students_dict.items() 
-                       if gender and gender.lower() == 'female'])
+        boys = sorted([key for key, gender in students_dict.items()
+                      if gender and gender.lower() == 'male'], key=display_names.get)
+        girls = sorted([key for key, gender in students_dict.items()
+                       if gender and gender.lower() == 'female'], key=display_names.get)
 
         print(f"👦 Boys: {len(boys)} students")
         print(f"👧 Girls: {len(girls)} students")
@@ -769,7 +947,8 @@ def generate_sf2_excel(request):
         # Helper function to fill attendance for a list of students
         def fill_student_attendance(students_list, start_row):
             filled_count = 0
-            for idx, name in enumerate(students_list):
+            for idx, key in enumerate(students_list):
+                name = display_names[key]
                 row_num = start_row + idx
                 print(f"  Processing student: {name} at row {row_num}")
 
@@ -791,8 +970,8 @@ def generate_sf2_excel(request):
                         cell = ws.cell(row=row_num, column=col_idx)
 
                         # Get attendance status
-                        has_am = attendance_data[name]['days'][day]['am']
-                        has_pm = attendance_data[name]['days'][day]['pm']
+                        has_am = attendance_data[key]['days'][day]['am']
+                        has_pm = attendance_data[key]['days'][day]['pm']
 
                         # Clear existing content and reset formatting
                         cell.value = None